@@ -0,0 +1,132 @@
+"""
+Background vs interactive DynamoDB contention.
+Purpose: Run a full dev-startup-matcher pass (background) while api-handler
+serves GET /investors/{id} (interactive) at a fixed rate against a
+throughput-limited investors table, with and without client-side pacing
+(capacity.py), and report how many API requests were throttled
+
+The stand-in table throttles above --table-capacity requests per second and
+retries throttled requests like botocore (--retries), so a throttle costs
+latency first and an error only once retries run out ("API thr" counts
+throttled attempts). Without pacing, the matcher's writes compete with API
+reads and both get throttled. With pacing, the matcher stays within
+--background-wcu and halves its rate on every throttle or retry, so the API
+keeps its headroom and the matcher simply takes longer.
+
+Usage:
+    python benchmarks/capacity_contention.py
+    python benchmarks/capacity_contention.py --investors 2000 --table-capacity 400 --rps 150
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from harness import INVESTORS_TABLE, PREFERENCES_TABLE, STARTUPS_TABLE, load_handler, quiet
+from local_aws import LocalAWS, LocalDynamoDB, LocalSES
+from synthetic_data import investor_id_for, iter_investors, iter_startups
+
+# Shared Lambda module (harness puts lambda-functions/shared on sys.path)
+import capacity
+
+
+def run(mode, args):
+    aws = LocalAWS(dynamodb=LocalDynamoDB(capacity_per_second=args.table_capacity, retry_attempts=args.retries),
+                   ses=LocalSES(keep_messages=False))
+    db = aws.dynamodb
+    db.create_table_from_schema('startups-table.json', STARTUPS_TABLE).load(iter_startups(args.startups, args.seed))
+    db.create_table_from_schema('investors-table.json', INVESTORS_TABLE).load(iter_investors(args.investors, args.seed))
+    db.create_table(PREFERENCES_TABLE, 'investor_id')
+
+    # Budgets are read per container at import; set them directly for this run
+    capacity.BACKGROUND_RCU_PER_SECOND = args.background_rcu if mode == 'paced' else 0
+    capacity.BACKGROUND_WCU_PER_SECOND = args.background_wcu if mode == 'paced' else 0
+    capacity._buckets.clear()
+
+    # quiet() swaps stdout process-wide, so it wraps both threads from here
+    with quiet():
+        matcher = load_handler('dev-startup-matcher', aws, silent=False).lambda_handler
+        api = load_handler('api-handler', aws, silent=False).lambda_handler
+
+        finished = threading.Event()
+        matcher_result = {}
+
+        def background():
+            started = time.perf_counter()
+            try:
+                matcher({}, None)
+                matcher_result['ok'] = True
+            except Exception as e:
+                # A throttled scan aborts the whole run
+                matcher_result['error'] = type(e).__name__
+            finally:
+                matcher_result['seconds'] = time.perf_counter() - started
+                finished.set()
+
+        db.reset_counters()
+        thread = threading.Thread(target=background)
+        thread.start()
+
+        statuses = {}
+        interval = 1.0 / args.rps
+        next_at = time.perf_counter()
+        i = 0
+        while not finished.is_set():
+            investor_id = investor_id_for((i * 7919) % args.investors)
+            response = api({'httpMethod': 'GET', 'path': f'/investors/{investor_id}',
+                            'resource': '/investors/{id}', 'pathParameters': {'id': investor_id}}, None)
+            statuses[response['statusCode']] = statuses.get(response['statusCode'], 0) + 1
+            i += 1
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        thread.join()
+
+    counters = db.counters
+    return {
+        'mode': mode,
+        'matcher_s': round(matcher_result['seconds'], 2),
+        'matcher': 'ok' if matcher_result.get('ok') else matcher_result.get('error'),
+        'api_requests': sum(statuses.values()),
+        'api_throttled': counters.get('dynamodb.GetItem.throttled', 0),
+        'api_errors': sum(count for status, count in statuses.items() if status != 200),
+        'matcher_throttled': counters.get('dynamodb.UpdateItem.throttled', 0) + counters.get('dynamodb.Scan.throttled', 0),
+        'updates': counters.get('dynamodb.UpdateItem', 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--investors', type=int, default=1000)
+    parser.add_argument('--startups', type=int, default=500)
+    parser.add_argument('--table-capacity', type=int, default=300, help='stand-in requests/s per table')
+    parser.add_argument('--rps', type=float, default=100, help='API request rate while the matcher runs')
+    parser.add_argument('--background-rcu', type=float, default=200, help='paced run: RCU/s budget')
+    parser.add_argument('--background-wcu', type=float, default=150, help='paced run: WCU/s budget')
+    parser.add_argument('--retries', type=int, default=4, help='botocore-style retries of throttled requests')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"Matcher ({args.investors} investors) vs GET /investors/{{id}} at {args.rps:g} rps, "
+          f"table limit {args.table_capacity} req/s\n")
+    print(f"{'mode':>8} {'matcher':>10} {'matcher s':>10} {'updates':>8} {'matcher thr':>12} "
+          f"{'API reqs':>9} {'API thr':>8} {'API thr %':>10} {'API err':>8}")
+    print('-' * 92)
+    results = [run(mode, args) for mode in ('unpaced', 'paced')]
+    for r in results:
+        share = r['api_throttled'] / r['api_requests'] if r['api_requests'] else 0
+        print(f"{r['mode']:>8} {r['matcher']:>10} {r['matcher_s']:>10} {r['updates']:>8} {r['matcher_throttled']:>12} "
+              f"{r['api_requests']:>9} {r['api_throttled']:>8} {share:>10.1%} {r['api_errors']:>8}")
+
+    unpaced, paced = results
+    if paced['api_throttled'] > unpaced['api_throttled']:
+        print("\n❌ Pacing did not reduce API throttling")
+        return 1
+    print("\n✅ Background pacing kept interactive throttling at or below the unpaced run")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
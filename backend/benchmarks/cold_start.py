@@ -0,0 +1,147 @@
+"""
+Cold-start measurement for the Lambda functions.
+Purpose: Report import time, client construction time and first/warm request
+latency for every function, each measured in a fresh Python process
+
+Phases per function (milliseconds):
+  import_ms        - executing index.py (what Lambda bills as the init phase)
+  client_init_ms   - building the real boto3 session/clients the function uses (no network)
+  first_request_ms - client_init_ms + first invocation against local stand-ins
+  warm_request_ms  - second invocation in the same process
+
+Usage:
+    python benchmarks/cold_start.py               # all functions, median of 5 runs
+    python benchmarks/cold_start.py --runs 10 --functions api-handler
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# function dir -> (services it constructs, event builder)
+FUNCTIONS = {
+    'api-handler': (
+        [('resource', 'dynamodb')],
+        lambda: {'httpMethod': 'GET', 'path': '/startups', 'resource': '/startups',
+                 'queryStringParameters': {'limit': '25'}},
+    ),
+    'dev-startup-matcher': (
+        [('resource', 'dynamodb'), ('client', 'ses')],
+        lambda: {'body': json.dumps({'investor_id': 'investor-0000001'})},
+    ),
+    'send-email-notif': (
+        [('resource', 'dynamodb'), ('client', 'ses')],
+        lambda: {'investor_id': 'investor-0000001', 'email': 'investor-0000001@example.com',
+                 'matches': [f'startup-{i:07d}' for i in range(5)]},
+    ),
+    'batch-processor': (
+        [('resource', 'dynamodb'), ('client', 'stepfunctions')],
+        lambda: {'source': 'aws.events', 'detail-type': 'Scheduled Event'},
+    ),
+    'dev-trigger-workflow': (
+        [('client', 'stepfunctions')],
+        lambda: {'body': json.dumps({'investor_id': 'investor-0000001',
+                                     'email': 'investor-0000001@example.com'})},
+    ),
+}
+
+
+def measure_child(function_dir):
+    """Runs inside a fresh interpreter; prints one JSON line of timings"""
+    import importlib.util
+
+    sys.path.insert(0, HERE)
+    from harness import LAMBDA_DIR, configure_environment, quiet
+
+    configure_environment()
+    services, build_event = FUNCTIONS[function_dir]
+    path = os.path.join(LAMBDA_DIR, function_dir, 'index.py')
+
+    started = time.perf_counter()
+    spec = importlib.util.spec_from_file_location('index', path)
+    module = importlib.util.module_from_spec(spec)
+    with quiet():
+        spec.loader.exec_module(module)
+    import_ms = (time.perf_counter() - started) * 1000
+    boto3_at_init = 'boto3' in sys.modules
+
+    import aws_clients
+
+    started = time.perf_counter()
+    for kind, service in services:
+        getattr(aws_clients, kind)(service)
+    client_init_ms = (time.perf_counter() - started) * 1000
+
+    # Serve the requests from the stand-ins so no network is involved
+    from harness import INVESTORS_TABLE, PREFERENCES_TABLE, STARTUPS_TABLE
+    from local_aws import LocalAWS
+    from synthetic_data import iter_investors, iter_startups
+
+    aws = LocalAWS()
+    aws.dynamodb.create_table_from_schema('startups-table.json', STARTUPS_TABLE).load(iter_startups(200))
+    aws.dynamodb.create_table_from_schema('investors-table.json', INVESTORS_TABLE).load(iter_investors(50))
+    aws.dynamodb.create_table(PREFERENCES_TABLE, 'investor_id')
+    aws_clients.set_factory(aws)
+
+    timings = []
+    for _ in range(2):
+        started = time.perf_counter()
+        with quiet():
+            module.lambda_handler(build_event(), None)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(json.dumps({
+        'import_ms': import_ms,
+        'client_init_ms': client_init_ms,
+        'first_request_ms': client_init_ms + timings[0],
+        'warm_request_ms': timings[1],
+        'boto3_at_init': boto3_at_init,
+    }))
+
+
+def run_once(function_dir):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', function_dir],
+        capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Lambda cold-start phases')
+    parser.add_argument('--functions', help='comma-separated function directories')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help='write results JSON to this file')
+    args = parser.parse_args()
+
+    if args.child:
+        measure_child(args.child)
+        return
+
+    names = args.functions.split(',') if args.functions else list(FUNCTIONS)
+    metrics = ('import_ms', 'client_init_ms', 'first_request_ms', 'warm_request_ms')
+    results = {}
+    for name in names:
+        runs = [run_once(name) for _ in range(args.runs)]
+        results[name] = {m: round(statistics.median(r[m] for r in runs), 2) for m in metrics}
+        results[name]['boto3_at_init'] = runs[0]['boto3_at_init']
+
+    header = f"{'function':<24}" + ''.join(f"{m:>18}" for m in metrics) + '  boto3 at init'
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        print(f"{name:<24}" + ''.join(f"{r[m]:>18}" for m in metrics) + f"  {r['boto3_at_init']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
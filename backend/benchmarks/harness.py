@@ -0,0 +1,144 @@
+"""
+Benchmark harness helpers.
+Purpose: Load Lambda handlers in-process against the local stand-ins and
+measure latency, throughput, peak memory and AWS request counts
+"""
+
+import gc
+import importlib.util
+import math
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+LAMBDA_DIR = os.path.join(BACKEND_DIR, 'lambda-functions')
+SHARED_DIR = os.path.join(LAMBDA_DIR, 'shared')
+
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+import aws_clients  # noqa: E402
+
+STARTUPS_TABLE = 'startup-investor-platform-dev-startups'
+INVESTORS_TABLE = 'startup-investor-platform-dev-investors'
+PREFERENCES_TABLE = 'startup-investor-platform-dev-investor-preferences'
+EVENTS_TABLE = 'startup-investor-platform-dev-events'
+COUNTERS_TABLE = 'startup-investor-platform-dev-startup-counters'
+STATE_MACHINE_ARN = 'arn:aws:states:eu-north-1:000000000000:stateMachine:startup-investor-platform-dev-startup-matcher'
+MATCHER_FUNCTION = 'startup-investor-platform-dev-startup-matcher'
+
+DEFAULT_ENV = {
+    'AWS_DEFAULT_REGION': 'eu-north-1',
+    'STARTUPS_TABLE': STARTUPS_TABLE,
+    'INVESTORS_TABLE': INVESTORS_TABLE,
+    'PREFERENCES_TABLE': PREFERENCES_TABLE,
+    'EVENTS_TABLE': EVENTS_TABLE,
+    'COUNTERS_TABLE': COUNTERS_TABLE,
+    'STATE_MACHINE_ARN': STATE_MACHINE_ARN,
+    'SENDER_EMAIL': 'benchmarks@example.com',
+    'SNAPSHOT_BUCKET': 'startup-investor-platform-dev-assets',
+    # Measure compute, not SES quota pacing
+    'SES_MAX_SEND_RATE': '0',
+    # ... and not client-side DynamoDB pacing (capacity_contention.py covers that)
+    'DDB_BACKGROUND_RCU_PER_SECOND': '0',
+    'DDB_BACKGROUND_WCU_PER_SECOND': '0',
+}
+
+
+def configure_environment(overrides=None):
+    for name, value in DEFAULT_ENV.items():
+        os.environ.setdefault(name, value)
+    for name, value in (overrides or {}).items():
+        os.environ[name] = value
+
+
+def load_handler(function_dir, aws, module_name=None, silent=True):
+    """
+    Import lambda-functions/<function_dir>/index.py as a fresh module and
+    point its AWS clients at the local stand-ins.
+
+    Pass silent=False when the caller already silences stdout (quiet() swaps
+    sys.stdout globally, so it must not be nested across threads).
+    """
+    configure_environment()
+    install_stand_ins(aws)
+    path = os.path.join(LAMBDA_DIR, function_dir, 'index.py')
+    module_name = module_name or f"lambda_{function_dir.replace('-', '_')}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    with quiet(silent):
+        spec.loader.exec_module(module)
+    return module
+
+
+def install_stand_ins(aws):
+    """Route the shared client registry to the local stand-ins"""
+    aws_clients.set_factory(aws)
+
+
+@contextmanager
+def quiet(enabled=True):
+    """Silence handler print() logging while measuring"""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        yield
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def time_operations(operation, iterations, reset=None, warmup=1):
+    """Run operation() repeatedly; returns (latencies_ms, wall_seconds)"""
+    for i in range(warmup):
+        if reset:
+            reset()
+        operation(i)
+    latencies = []
+    wall = 0.0
+    for i in range(iterations):
+        if reset:
+            reset()
+        start = time.perf_counter()
+        operation(i)
+        elapsed = time.perf_counter() - start
+        wall += elapsed
+        latencies.append(elapsed * 1000.0)
+    return latencies, wall
+
+
+def peak_memory(operation, reset=None):
+    """Peak traced allocation (bytes) for a single operation() call"""
+    if reset:
+        reset()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        operation(0)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - baseline)
+
+
+def summarize(latencies, wall, iterations):
+    ordered = sorted(latencies)
+    return {
+        'iterations': iterations,
+        'throughput_ops': round(iterations / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p95_ms': round(percentile(ordered, 95), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+    }
+
@@ -0,0 +1,525 @@
+"""
+Load-testing harness for the API Gateway + api-handler path.
+Purpose: Replay a realistic request mix against api-handler at a fixed
+arrival rate (open loop) and report latency histograms, error rates,
+cold starts, throttling and the throughput saturation point
+
+Requests either call the handler in-process or go over HTTP to a local
+API Gateway shim (`serve`) or any real stage URL. In-process, the handler
+runs inside a pool of simulated Lambda execution environments: a new
+environment (a fresh import of index.py plus --init-ms) is created when
+none is idle, up to --concurrency; beyond that requests are throttled.
+DynamoDB, SES and the synchronous matcher invoke use the local stand-ins.
+
+Usage:
+    python benchmarks/load_test.py --rps 10,25,50,100 --duration 10
+    python benchmarks/load_test.py --rps 50 --ddb-capacity 200 --matcher-concurrency 5
+    python benchmarks/load_test.py serve --port 8080
+    python benchmarks/load_test.py --target http://127.0.0.1:8080 --rps 20,40
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stderr
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from harness import (INVESTORS_TABLE, MATCHER_FUNCTION, PREFERENCES_TABLE, STARTUPS_TABLE,
+                     load_handler, percentile, quiet)
+from local_aws import LocalAWS, LocalDynamoDB, LocalLambda
+from synthetic_data import INDUSTRIES, investor_id_for, iter_investors, iter_startups, startup_id_for
+
+DEFAULT_MIX = 'get_startups=45,get_startup=35,save_investor=15,match_startups=5'
+
+# Upper bounds (ms) of the latency histogram buckets
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf')]
+
+
+@contextmanager
+def silenced():
+    """quiet() plus stderr, where handlers print tracebacks of expected errors"""
+    with quiet(), open(os.devnull, 'w') as devnull, redirect_stderr(devnull):
+        yield
+
+
+# =========================================================================
+# Request mix
+# =========================================================================
+
+class RequestMix:
+    """Weighted generator of API Gateway proxy events"""
+
+    def __init__(self, weights, startups, investors, seed=7):
+        unknown = [name for name in weights if not hasattr(self, f'_{name}')]
+        if unknown:
+            raise ValueError(f"Unknown request types: {', '.join(unknown)}")
+        self.names = list(weights)
+        self.weights = [weights[name] for name in self.names]
+        self.startups = startups
+        self.investors = investors
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, text, startups, investors, seed=7):
+        weights = {}
+        for part in text.split(','):
+            name, _, weight = part.partition('=')
+            weights[name.strip()] = float(weight or 1)
+        return cls(weights, startups, investors, seed)
+
+    def next(self):
+        """Returns (request type, event)"""
+        with self.lock:
+            name = self.rng.choices(self.names, self.weights)[0]
+            return name, getattr(self, f'_{name}')()
+
+    def _get_startups(self):
+        query = {'limit': '25'}
+        # A share of listing traffic filters by industry (IndustryIndex query)
+        if self.rng.random() < 0.3:
+            query['industry'] = self.rng.choice(INDUSTRIES)
+        return api_event('GET', '/startups', query=query)
+
+    def _get_startup(self):
+        startup_id = startup_id_for(self.rng.randrange(self.startups))
+        return api_event('GET', f'/startups/{startup_id}', '/startups/{id}', {'id': startup_id})
+
+    def _save_investor(self):
+        investor_id = investor_id_for(self.rng.randrange(self.investors))
+        return api_event('POST', '/investors', body={
+            'investor_id': investor_id,
+            'email': f'{investor_id}@example.com',
+            'preferred_industries': self.rng.sample(INDUSTRIES, 2),
+            'preferred_funding_stages': ['Seed', 'Series A'],
+        })
+
+    def _match_startups(self):
+        investor_id = investor_id_for(self.rng.randrange(self.investors))
+        return api_event('POST', '/match-startups', body={'investor_id': investor_id})
+
+    def _get_investor(self):
+        investor_id = investor_id_for(self.rng.randrange(self.investors))
+        return api_event('GET', f'/investors/{investor_id}', '/investors/{id}', {'id': investor_id})
+
+
+def api_event(method, path, resource=None, path_parameters=None, query=None, body=None):
+    return {
+        'httpMethod': method,
+        'path': path,
+        'resource': resource or path,
+        'pathParameters': path_parameters,
+        'queryStringParameters': query,
+        'body': json.dumps(body) if body is not None else None,
+    }
+
+
+# =========================================================================
+# Simulated Lambda service for api-handler
+# =========================================================================
+
+class LambdaSimulator:
+    """
+    Pool of api-handler execution environments with Lambda's scaling rules:
+    reuse an idle environment, otherwise cold-start a new one, otherwise
+    throttle once the concurrency limit is reached.
+    """
+
+    def __init__(self, aws, concurrency=100, init_ms=0.0):
+        self.aws = aws
+        self.concurrency = concurrency
+        self.init_ms = init_ms
+        self.idle = []
+        self.total = 0
+        self.cold_start_ms = []
+        self.lock = threading.Lock()
+
+    def _acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), False
+            if self.total >= self.concurrency:
+                return None, False
+            self.total += 1
+            index = self.total
+        try:
+            started = time.perf_counter()
+            module = load_handler('api-handler', self.aws, module_name=f'lambda_api_handler_env{index}',
+                                  silent=False)
+            if self.init_ms:
+                time.sleep(self.init_ms / 1000.0)
+        except Exception:
+            with self.lock:
+                self.total -= 1
+            raise
+        with self.lock:
+            self.cold_start_ms.append((time.perf_counter() - started) * 1000.0)
+        return module, True
+
+    def invoke(self, event):
+        """Returns (API Gateway response dict, cold_start, throttled)"""
+        module, cold = self._acquire()
+        if module is None:
+            return {'statusCode': 429, 'body': json.dumps({'message': 'Rate Exceeded.'})}, False, True
+        try:
+            return module.lambda_handler(event, None), cold, False
+        except Exception as e:
+            # Unhandled handler errors surface as 502 through the proxy integration
+            return {'statusCode': 502, 'body': json.dumps({'message': str(e)})}, cold, False
+        finally:
+            with self.lock:
+                self.idle.append(module)
+
+
+def build_local_stack(startups, investors, ddb_capacity=None, ddb_latency_ms=0.0,
+                      matcher_concurrency=None, seed=42):
+    """Local AWS stand-ins seeded with synthetic data, with the matcher registered"""
+    aws = LocalAWS(
+        dynamodb=LocalDynamoDB(latency_ms=ddb_latency_ms, capacity_per_second=ddb_capacity),
+        lambda_=LocalLambda(concurrency_limit=matcher_concurrency),
+    )
+    db = aws.dynamodb
+    db.create_table_from_schema('startups-table.json', STARTUPS_TABLE).load(iter_startups(startups, seed))
+    db.create_table_from_schema('investors-table.json', INVESTORS_TABLE).load(iter_investors(investors, seed))
+    db.create_table(PREFERENCES_TABLE, 'investor_id')
+    matcher = load_handler('dev-startup-matcher', aws)
+    aws.lambda_.register(MATCHER_FUNCTION, matcher.lambda_handler)
+    return aws
+
+
+# =========================================================================
+# Transports
+# =========================================================================
+
+class InProcessTransport:
+    def __init__(self, simulator):
+        self.simulator = simulator
+
+    def send(self, event):
+        """Returns (status code, cold_start, throttled)"""
+        response, cold, throttled = self.simulator.invoke(event)
+        return response['statusCode'], cold, throttled
+
+
+class HttpTransport:
+    """Sends each event as a real HTTP request (shim or deployed API stage)"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def send(self, event):
+        url = self.base_url + event['path']
+        if event.get('queryStringParameters'):
+            url += '?' + '&'.join(f'{k}={v}' for k, v in event['queryStringParameters'].items())
+        data = event['body'].encode('utf-8') if event.get('body') else None
+        request = urllib.request.Request(url, data=data, method=event['httpMethod'],
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                status, headers = response.status, response.headers
+        except urllib.error.HTTPError as e:
+            e.read()
+            status, headers = e.code, e.headers
+        except (urllib.error.URLError, OSError):
+            return 599, False, False
+        return status, headers.get('X-Local-Cold-Start') == '1', status == 429
+
+
+# =========================================================================
+# Local API Gateway shim
+# =========================================================================
+
+# Path templates the shim maps onto API Gateway resources
+ROUTES = [
+    ('/startups/{id}', 2),
+    ('/investors/{id}', 2),
+    ('/bookmarks/{userId}/{startupId}', 3),
+    ('/bookmarks/{userId}', 2),
+]
+
+
+def to_event(method, raw_path, body):
+    """Translate an HTTP request into an API Gateway proxy event"""
+    parts = urlsplit(raw_path)
+    segments = [s for s in parts.path.split('/') if s]
+    resource, path_parameters = parts.path, None
+    for template, length in ROUTES:
+        names = [s for s in template.split('/') if s]
+        if len(segments) == length and segments[0] == names[0]:
+            resource = template
+            path_parameters = {n[1:-1]: v for n, v in zip(names[1:], segments[1:])}
+            break
+    return {
+        'httpMethod': method,
+        'path': parts.path,
+        'resource': resource,
+        'pathParameters': path_parameters,
+        'queryStringParameters': dict(parse_qsl(parts.query)) or None,
+        'body': body or None,
+    }
+
+
+def make_shim(simulator, host='127.0.0.1', port=8080):
+    class ShimHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _handle(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length).decode('utf-8') if length else None
+            response, cold, _ = simulator.invoke(to_event(self.command, self.path, body))
+            payload = (response.get('body') or '').encode('utf-8')
+            self.send_response(response['statusCode'])
+            for name, value in (response.get('headers') or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(payload)))
+            self.send_header('X-Local-Cold-Start', '1' if cold else '0')
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_DELETE = do_OPTIONS = _handle
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), ShimHandler)
+    server.daemon_threads = True
+    return server
+
+
+# =========================================================================
+# Open-loop load generation
+# =========================================================================
+
+class StageResult:
+    def __init__(self, target_rps, duration):
+        self.target_rps = target_rps
+        self.duration = duration
+        self.latencies = []
+        self.by_type = {}
+        self.statuses = Counter()
+        self.cold_starts = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+        self.issued = 0
+        self.wall = 0.0
+
+    def record(self, name, status, latency_ms, cold, throttled):
+        with self.lock:
+            self.latencies.append(latency_ms)
+            self.by_type.setdefault(name, []).append((latency_ms, status))
+            self.statuses[status] += 1
+            self.cold_starts += cold
+            self.throttled += throttled
+
+    def summary(self):
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        errors = sum(n for status, n in self.statuses.items() if status >= 500 or status == 429)
+        by_type = {}
+        for name, samples in sorted(self.by_type.items()):
+            latencies = sorted(s[0] for s in samples)
+            by_type[name] = {
+                'requests': len(samples),
+                'errors': sum(1 for s in samples if s[1] >= 500 or s[1] == 429),
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+            }
+        return {
+            'target_rps': self.target_rps,
+            'offered_rps': round(self.issued / self.duration, 2),
+            'achieved_rps': round(count / self.wall, 2) if self.wall else 0.0,
+            'requests': count,
+            'error_rate': round(errors / count, 4) if count else 0.0,
+            'statuses': {str(k): v for k, v in sorted(self.statuses.items())},
+            'cold_starts': self.cold_starts,
+            'throttled': self.throttled,
+            'p50_ms': round(percentile(ordered, 50), 2),
+            'p90_ms': round(percentile(ordered, 90), 2),
+            'p99_ms': round(percentile(ordered, 99), 2),
+            'max_ms': round(ordered[-1], 2) if ordered else 0.0,
+            'histogram': histogram(ordered),
+            'by_type': by_type,
+        }
+
+
+def histogram(ordered_latencies):
+    counts = [0] * len(HISTOGRAM_BUCKETS_MS)
+    bucket = 0
+    for value in ordered_latencies:
+        while value > HISTOGRAM_BUCKETS_MS[bucket]:
+            bucket += 1
+        counts[bucket] += 1
+    return {('+inf' if b == float('inf') else f'<={b:g}'): c for b, c in zip(HISTOGRAM_BUCKETS_MS, counts)}
+
+
+def run_stage(transport, mix, target_rps, duration, workers, arrivals='poisson', seed=11):
+    """
+    Issue requests at target_rps for duration seconds regardless of how fast
+    responses come back. Latency is measured from each request's scheduled
+    arrival time, so queueing behind a saturated client counts (no
+    coordinated omission).
+    """
+    result = StageResult(target_rps, duration)
+    rng = random.Random(seed)
+
+    def fire(name, event, scheduled):
+        try:
+            status, cold, throttled = transport.send(event)
+        except Exception:
+            status, cold, throttled = 599, False, False
+        result.record(name, status, (time.perf_counter() - scheduled) * 1000.0, cold, throttled)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        scheduled = started
+        while True:
+            if arrivals == 'poisson':
+                scheduled += rng.expovariate(target_rps)
+            else:
+                scheduled += 1.0 / target_rps
+            if scheduled - started >= duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            name, event = mix.next()
+            pool.submit(fire, name, event, scheduled)
+            result.issued += 1
+    # Includes draining the backlog, so a saturated stage completes below the offered rate
+    result.wall = time.perf_counter() - started
+    return result.summary()
+
+
+def is_saturated(stage, slo_ms, max_error_rate):
+    return (stage['achieved_rps'] < 0.9 * stage['offered_rps']
+            or stage['error_rate'] > max_error_rate
+            or stage['p99_ms'] > slo_ms)
+
+
+def print_report(stages, slo_ms, max_error_rate, cold_start_ms, counters):
+    header = (f"{'target':>7} {'offered':>8} {'achieved':>9} {'reqs':>6} {'err %':>6} {'cold':>5} {'thrott':>6} "
+              f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>9} {'max ms':>9}")
+    print(header)
+    print('-' * len(header))
+    for s in stages:
+        print(f"{s['target_rps']:>7g} {s['offered_rps']:>8} {s['achieved_rps']:>9} {s['requests']:>6} "
+              f"{s['error_rate'] * 100:>6.2f} {s['cold_starts']:>5} {s['throttled']:>6} "
+              f"{s['p50_ms']:>8} {s['p90_ms']:>8} {s['p99_ms']:>9} {s['max_ms']:>9}"
+              f"{'  ⚠️ saturated' if is_saturated(s, slo_ms, max_error_rate) else ''}")
+
+    last = stages[-1]
+    print(f"\nLatency histogram at {last['target_rps']:g} rps:")
+    peak = max(last['histogram'].values()) or 1
+    for bucket, count in last['histogram'].items():
+        print(f"  {bucket:>7} ms {count:>7}  {'#' * int(40 * count / peak)}")
+
+    print(f"\nPer request type at {last['target_rps']:g} rps:")
+    for name, t in last['by_type'].items():
+        print(f"  {name:<16} {t['requests']:>6} reqs  {t['errors']:>5} errors  "
+              f"p50 {t['p50_ms']:>8} ms  p99 {t['p99_ms']:>9} ms")
+
+    if cold_start_ms:
+        ordered = sorted(cold_start_ms)
+        print(f"\nCold starts: {len(ordered)} environments, init p50 {percentile(ordered, 50):.1f} ms, "
+              f"max {ordered[-1]:.1f} ms")
+    throttles = {k: v for k, v in counters.items() if k.endswith('.throttled')}
+    if throttles:
+        print(f"Downstream throttling: {', '.join(f'{k}={v}' for k, v in sorted(throttles.items()))}")
+
+    saturated = [s for s in stages if is_saturated(s, slo_ms, max_error_rate)]
+    healthy = [s for s in stages if not is_saturated(s, slo_ms, max_error_rate)]
+    if saturated:
+        print(f"\n❌ Saturation at {saturated[0]['target_rps']:g} rps "
+              f"(p99 SLO {slo_ms:g} ms, max error rate {max_error_rate * 100:g}%)")
+    else:
+        print(f"\n✅ No saturation up to {stages[-1]['target_rps']:g} rps")
+    if healthy:
+        print(f"   Highest sustained rate: {max(s['target_rps'] for s in healthy):g} rps")
+
+
+def serve(args):
+    print(f"Seeding {args.startups} startups and {args.investors} investors...")
+    aws = build_local_stack(args.startups, args.investors, args.ddb_capacity, args.ddb_latency_ms,
+                            args.matcher_concurrency)
+    simulator = LambdaSimulator(aws, args.concurrency, args.init_ms)
+    server = make_shim(simulator, args.host, args.port)
+    print(f"✅ Local API Gateway shim on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    with silenced():
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    server.server_close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Open-loop load test for api-handler')
+    parser.add_argument('mode', nargs='?', choices=['run', 'serve'], default='run')
+    parser.add_argument('--rps', default='10,25,50', help='comma-separated target rates, one stage each')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per stage')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='weighted request types')
+    parser.add_argument('--arrivals', choices=['poisson', 'uniform'], default='poisson')
+    parser.add_argument('--workers', type=int, default=256, help='client threads (in-flight request cap)')
+    parser.add_argument('--target', help='base URL to load over HTTP instead of in-process')
+    parser.add_argument('--startups', type=int, default=1000)
+    parser.add_argument('--investors', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=100, help='api-handler concurrency limit')
+    parser.add_argument('--init-ms', type=float, default=200.0,
+                        help='simulated runtime init per cold start, on top of the real import')
+    parser.add_argument('--ddb-capacity', type=int, help='DynamoDB requests/second per table before throttling')
+    parser.add_argument('--ddb-latency-ms', type=float, default=0.0, help='simulated DynamoDB latency')
+    parser.add_argument('--matcher-concurrency', type=int, help='matcher Lambda concurrency limit')
+    parser.add_argument('--slo-ms', type=float, default=1000.0, help='p99 latency objective')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--output', help='write results JSON to this file')
+    args = parser.parse_args()
+
+    if args.mode == 'serve':
+        return serve(args)
+
+    rates = [float(r) for r in args.rps.split(',')]
+    mix = RequestMix.parse(args.mix, args.startups, args.investors)
+    simulator = None
+    if args.target:
+        transport = HttpTransport(args.target)
+        print(f"Target: {args.target}")
+    else:
+        print(f"Seeding {args.startups} startups and {args.investors} investors...")
+        aws = build_local_stack(args.startups, args.investors, args.ddb_capacity, args.ddb_latency_ms,
+                                args.matcher_concurrency)
+        simulator = LambdaSimulator(aws, args.concurrency, args.init_ms)
+        transport = InProcessTransport(simulator)
+
+    stages = []
+    for rate in rates:
+        print(f"▶ {rate:g} rps for {args.duration:g}s")
+        with silenced():
+            stages.append(run_stage(transport, mix, rate, args.duration, args.workers, args.arrivals))
+
+    print()
+    cold_start_ms = simulator.cold_start_ms if simulator else []
+    counters = simulator.aws.counters() if simulator else {}
+    print_report(stages, args.slo_ms, args.max_error_rate, cold_start_ms, counters)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'stages': stages, 'downstream': counters}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1113 @@
+"""
+Local stand-ins for the AWS services used by the Lambda functions.
+Purpose: Run handlers offline (benchmarks, load tests) without touching AWS
+
+The stand-ins mimic the subset of the boto3 resource/client APIs the
+handlers call, keep per-operation request counters, and raise the same
+botocore ClientError codes the real services return.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from botocore.exceptions import ClientError
+
+SCHEMAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dynamodb-schemas')
+
+# DynamoDB returns at most 1 MB of data per Scan/Query page
+MAX_PAGE_BYTES = 1024 * 1024
+# Backoff between retries of throttled requests (seconds), see LocalDynamoDB.retry_attempts
+RETRY_BASE_DELAY = 0.025
+RETRY_MAX_BACKOFF = 1.0
+
+
+def client_error(code, message, operation):
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+def _normalize(value):
+    """Convert a Python value to the shape DynamoDB would store (ints -> Decimal)"""
+    if isinstance(value, bool) or value is None or isinstance(value, (str, Decimal, bytes)):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        raise TypeError('Float types are not supported. Use Decimal types instead.')
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        if not value:
+            raise client_error('ValidationException', 'An string set may not be empty', 'PutItem')
+        return {_normalize(v) for v in value}
+    if isinstance(value, bytearray):
+        return bytes(value)
+    raise TypeError(f'Unsupported type "{type(value)}" for value "{value}"')
+
+
+def _clone(value):
+    """Cheap deep copy for the container types DynamoDB items can hold"""
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+
+def item_size(item):
+    """Approximate DynamoDB item size in bytes (attribute names + values)"""
+    size = 0
+    for name, value in item.items():
+        size += len(name.encode('utf-8')) + _value_size(value)
+    return size
+
+
+def _value_size(value):
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, Decimal):
+        return 1 + (len(value.as_tuple().digits) + 1) // 2
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode('utf-8')) + _value_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, set)):
+        return 3 + sum(_value_size(v) + 1 for v in value)
+    return len(str(value))
+
+
+def _get_path(item, path):
+    """Resolve a dotted attribute path (e.g. 'a.b') against an item"""
+    current = item
+    for part in path.split('.'):
+        if not isinstance(current, dict) or part not in current:
+            return None, False
+        current = current[part]
+    return current, True
+
+
+# =========================================================================
+# Condition evaluation (boto3.dynamodb.conditions objects)
+# =========================================================================
+
+def _operand(value, item):
+    """Resolve a condition operand: attribute references are looked up on the item"""
+    name = getattr(value, 'name', None)
+    if name is not None and type(value).__name__ in ('Attr', 'Key'):
+        return _get_path(item, name)[0]
+    if type(value).__name__ == 'Size':
+        target = _operand(value._values[0], item)
+        return Decimal(len(target)) if target is not None else None
+    return _normalize(value)
+
+
+def _compare(left, right, op):
+    if left is None or right is None:
+        return False
+    try:
+        return op(left, right)
+    except TypeError:
+        return False
+
+
+def evaluate_condition(condition, item):
+    """Evaluate a boto3 condition object against a (possibly missing) item"""
+    item = item or {}
+    op = condition.expression_operator
+    values = condition._values
+
+    if op == 'AND':
+        return evaluate_condition(values[0], item) and evaluate_condition(values[1], item)
+    if op == 'OR':
+        return evaluate_condition(values[0], item) or evaluate_condition(values[1], item)
+    if op == 'NOT':
+        return not evaluate_condition(values[0], item)
+    if op == 'attribute_exists':
+        return _get_path(item, values[0].name)[1]
+    if op == 'attribute_not_exists':
+        return not _get_path(item, values[0].name)[1]
+
+    left = _operand(values[0], item)
+    if op == '=':
+        return left is not None and left == _operand(values[1], item)
+    if op == '<>':
+        return left != _operand(values[1], item)
+    if op == '<':
+        return _compare(left, _operand(values[1], item), lambda a, b: a < b)
+    if op == '<=':
+        return _compare(left, _operand(values[1], item), lambda a, b: a <= b)
+    if op == '>':
+        return _compare(left, _operand(values[1], item), lambda a, b: a > b)
+    if op == '>=':
+        return _compare(left, _operand(values[1], item), lambda a, b: a >= b)
+    if op == 'BETWEEN':
+        low, high = _operand(values[1], item), _operand(values[2], item)
+        return _compare(left, low, lambda a, b: a >= b) and _compare(left, high, lambda a, b: a <= b)
+    if op == 'IN':
+        return left in [_operand(v, item) for v in values[1]]
+    if op == 'begins_with':
+        return isinstance(left, (str, bytes)) and left.startswith(_operand(values[1], item))
+    if op == 'contains':
+        needle = _operand(values[1], item)
+        if isinstance(left, str):
+            return isinstance(needle, str) and needle in left
+        return left is not None and needle in left
+    if op == 'attribute_type':
+        return True
+    raise ValueError(f'Unsupported condition operator: {op}')
+
+
+# =========================================================================
+# String expressions (UpdateExpression / ConditionExpression)
+# =========================================================================
+
+_CLAUSE_RE = re.compile(r'\b(SET|REMOVE|ADD|DELETE)\b', re.IGNORECASE)
+
+
+def _split_top_level(text, sep=','):
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+
+class _Expression:
+    """Shared placeholder resolution for string expressions"""
+
+    def __init__(self, names, values):
+        self.names = names or {}
+        self.values = {k: _normalize(v) for k, v in (values or {}).items()}
+
+    def name(self, token):
+        token = token.strip()
+        return '.'.join(self.names.get(part, part) for part in token.split('.'))
+
+    def value(self, token, item):
+        token = token.strip()
+        if token.startswith(':'):
+            if token not in self.values:
+                raise client_error('ValidationException', f'Missing value for {token}', 'UpdateItem')
+            return self.values[token]
+        match = re.match(r'^(if_not_exists|list_append)\((.*)\)$', token)
+        if match:
+            func, args = match.group(1), _split_top_level(match.group(2))
+            if func == 'if_not_exists':
+                current, found = _get_path(item, self.name(args[0]))
+                return current if found else self.value(args[1], item)
+            return list(self.value(args[0], item) or []) + list(self.value(args[1], item) or [])
+        return _get_path(item, self.name(token))[0]
+
+
+def apply_update_expression(item, expression, names=None, values=None):
+    """Apply an UpdateExpression to an item in place; returns the set of touched attributes"""
+    expr = _Expression(names, values)
+    touched = set()
+    pieces = _CLAUSE_RE.split(expression)
+    # pieces: ['', 'SET', ' a = :a, b = :b ', 'ADD', ' c :c']
+    for i in range(1, len(pieces), 2):
+        clause, body = pieces[i].upper(), pieces[i + 1]
+        for action in _split_top_level(body):
+            if clause == 'SET':
+                target, rhs = action.split('=', 1)
+                target = expr.name(target)
+                terms = re.split(r'\s([+-])\s', rhs.strip())
+                result = expr.value(terms[0], item)
+                for j in range(1, len(terms), 2):
+                    operand = expr.value(terms[j + 1], item)
+                    result = result + operand if terms[j] == '+' else result - operand
+                _set_path(item, target, _clone(result))
+            elif clause == 'REMOVE':
+                target = expr.name(action)
+                _remove_path(item, target)
+            else:
+                target, token = action.split(None, 1)
+                target = expr.name(target)
+                operand = expr.value(token, item)
+                current, found = _get_path(item, target)
+                if found and isinstance(operand, set) != isinstance(current, set):
+                    raise client_error('ValidationException',
+                                       'An operand in the update expression has an incorrect data type',
+                                       'UpdateItem')
+                if clause == 'ADD':
+                    if isinstance(operand, set):
+                        _set_path(item, target, (set(current) if found else set()) | operand)
+                    else:
+                        _set_path(item, target, (current if found else Decimal(0)) + operand)
+                elif found:
+                    remaining = set(current) - operand
+                    if remaining:
+                        _set_path(item, target, remaining)
+                    else:
+                        _remove_path(item, target)
+            touched.add(target.split('.')[0])
+    return touched
+
+
+def _set_path(item, path, value):
+    parts = path.split('.')
+    current = item
+    for part in parts[:-1]:
+        current = current.setdefault(part, {})
+    current[parts[-1]] = value
+
+
+def _remove_path(item, path):
+    parts = path.split('.')
+    current = item
+    for part in parts[:-1]:
+        current = current.get(part, {})
+    current.pop(parts[-1], None)
+
+
+def evaluate_string_condition(expression, item, names=None, values=None):
+    """Evaluate the ConditionExpression subset used by the handlers"""
+    expr = _Expression(names, values)
+    item = item or {}
+    for clause in re.split(r'\s+AND\s+', expression.strip(), flags=re.IGNORECASE):
+        clause = clause.strip().strip('()') if clause.count('(') != clause.count(')') else clause.strip()
+        match = re.match(r'^(attribute_exists|attribute_not_exists)\((.+)\)$', clause)
+        if match:
+            exists = _get_path(item, expr.name(match.group(2)))[1]
+            if exists != (match.group(1) == 'attribute_exists'):
+                return False
+            continue
+        match = re.match(r'^(.+?)\s*(=|<>|<=|>=|<|>)\s*(.+)$', clause)
+        if not match:
+            raise ValueError(f'Unsupported condition expression: {clause}')
+        left = expr.value(match.group(1), item)
+        right = expr.value(match.group(3), item)
+        op = match.group(2)
+        if op == '=' and left != right:
+            return False
+        if op == '<>' and left == right:
+            return False
+        if op in ('<', '<=', '>', '>=') and not _compare(left, right, {
+            '<': lambda a, b: a < b, '<=': lambda a, b: a <= b,
+            '>': lambda a, b: a > b, '>=': lambda a, b: a >= b}[op]):
+            return False
+    return True
+
+
+def _check_condition(condition, item, kwargs, operation):
+    if condition is None:
+        return
+    if isinstance(condition, str):
+        ok = evaluate_string_condition(condition, item,
+                                       kwargs.get('ExpressionAttributeNames'),
+                                       kwargs.get('ExpressionAttributeValues'))
+    else:
+        ok = evaluate_condition(condition, item)
+    if not ok:
+        raise client_error('ConditionalCheckFailedException', 'The conditional request failed', operation)
+
+
+def _projection_paths(projection, names):
+    expr = _Expression(names, None)
+    return [expr.name(token) for token in projection.split(',')]
+
+
+def _project(item, projection, names, paths=None):
+    """paths: _projection_paths() resolved once for a page of items"""
+    if not projection:
+        return item
+    result = {}
+    for name in paths or _projection_paths(projection, names):
+        value, found = _get_path(item, name)
+        if found:
+            _set_path(result, name, value)
+    return result
+
+
+# =========================================================================
+# DynamoDB
+# =========================================================================
+
+class LocalTable:
+    """In-memory DynamoDB table with primary key and GSI lookups"""
+
+    def __init__(self, service, name, hash_key, range_key=None, indexes=None):
+        self.service = service
+        self.name = name
+        self.table_name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        # index name -> (hash attribute, range attribute)
+        self.indexes = dict(indexes or {})
+        self._items = {}
+        self._order = []
+        self._position = {}
+        self._lock = threading.RLock()
+        # index name -> hash value -> set of primary keys
+        self._partitions = {name: defaultdict(set) for name in self.indexes}
+        if range_key:
+            self._partitions[None] = defaultdict(set)
+
+    # -- key helpers --------------------------------------------------------
+
+    def _key_of(self, item, operation='GetItem'):
+        if self.hash_key not in item or (self.range_key and self.range_key not in item):
+            raise client_error('ValidationException',
+                               'The provided key element does not match the schema', operation)
+        if self.range_key:
+            return (item[self.hash_key], item[self.range_key])
+        return (item[self.hash_key],)
+
+    def _index_keys(self, index_name):
+        if index_name is None:
+            return self.hash_key, self.range_key
+        if index_name not in self.indexes:
+            raise client_error('ValidationException',
+                               f'The table does not have the specified index: {index_name}', 'Query')
+        return self.indexes[index_name]
+
+    def _key_dict(self, item, index_name=None):
+        key = {self.hash_key: item[self.hash_key]}
+        if self.range_key:
+            key[self.range_key] = item[self.range_key]
+        if index_name:
+            for attr in self.indexes[index_name]:
+                if attr and attr in item:
+                    key[attr] = item[attr]
+        return key
+
+    def _indexed(self, index_name, item):
+        """GSIs are sparse: an item is in one only if it has all of its key attributes"""
+        if index_name is None:
+            return True
+        hash_attr, range_attr = self.indexes[index_name]
+        return hash_attr in item and (range_attr is None or range_attr in item)
+
+    def _store(self, key, item):
+        old = self._items.get(key)
+        if old is not None:
+            self._unindex(key, old)
+        else:
+            self._position[key] = len(self._order)
+            self._order.append(key)
+        self._items[key] = item
+        for index_name, partitions in self._partitions.items():
+            hash_attr = self.hash_key if index_name is None else self.indexes[index_name][0]
+            if self._indexed(index_name, item):
+                partitions[item[hash_attr]].add(key)
+
+    def _unindex(self, key, item):
+        for index_name, partitions in self._partitions.items():
+            hash_attr = self.hash_key if index_name is None else self.indexes[index_name][0]
+            if self._indexed(index_name, item):
+                partitions[item[hash_attr]].discard(key)
+
+    def _drop(self, key):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._unindex(key, old)
+            self._order[self._position.pop(key)] = None
+        return old
+
+    def __len__(self):
+        return len(self._items)
+
+    def load(self, items):
+        """Bulk-load items without counting requests (used to seed benchmarks)"""
+        with self._lock:
+            for item in items:
+                item = _normalize(item)
+                self._store(self._key_of(item, 'PutItem'), item)
+
+    def items(self):
+        return [_clone(item) for item in self._items.values()]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._order.clear()
+            self._position.clear()
+            for partitions in self._partitions.values():
+                partitions.clear()
+
+    # -- boto3 Table API ----------------------------------------------------
+
+    def get_item(self, Key, ProjectionExpression=None, ExpressionAttributeNames=None, **kwargs):
+        self.service.admit('GetItem', self.name)
+        key = self._key_of(_normalize(Key))
+        with self._lock:
+            item = self._items.get(key)
+        size = item_size(item) if item else 0
+        self.service.record('GetItem', self.name, read_bytes=size, consistent=kwargs.get('ConsistentRead', False))
+        response = self.service.response(self.name, 'GetItem', kwargs, size=size)
+        if item is not None:
+            response['Item'] = _clone(_project(item, ProjectionExpression, ExpressionAttributeNames))
+        return response
+
+    def put_item(self, Item, ConditionExpression=None, ReturnValues='NONE', **kwargs):
+        self.service.admit('PutItem', self.name)
+        item = _normalize(Item)
+        key = self._key_of(item, 'PutItem')
+        with self._lock:
+            old = self._items.get(key)
+            size = max(item_size(item), item_size(old or {}))
+            self.service.record('PutItem', self.name, write_bytes=size)
+            _check_condition(ConditionExpression, old, kwargs, 'PutItem')
+            self._store(key, item)
+        response = self.service.response(self.name, 'PutItem', kwargs, write=True, size=size)
+        if ReturnValues == 'ALL_OLD' and old is not None:
+            response['Attributes'] = _clone(old)
+        return response
+
+    def update_item(self, Key, UpdateExpression=None, ConditionExpression=None,
+                    ExpressionAttributeNames=None, ExpressionAttributeValues=None,
+                    ReturnValues='NONE', **kwargs):
+        self.service.admit('UpdateItem', self.name)
+        key_item = _normalize(Key)
+        key = self._key_of(key_item, 'UpdateItem')
+        with self._lock:
+            old = self._items.get(key)
+            _check_condition(ConditionExpression, old, dict(
+                kwargs, ExpressionAttributeNames=ExpressionAttributeNames,
+                ExpressionAttributeValues=ExpressionAttributeValues), 'UpdateItem')
+            item = _clone(old) if old is not None else dict(key_item)
+            touched = set()
+            if UpdateExpression:
+                touched = apply_update_expression(item, UpdateExpression,
+                                                  ExpressionAttributeNames, ExpressionAttributeValues)
+            size = max(item_size(item), item_size(old or {}))
+            self.service.record('UpdateItem', self.name, write_bytes=size)
+            self._store(key, item)
+        response = self.service.response(self.name, 'UpdateItem', kwargs, write=True, size=size)
+        if ReturnValues == 'ALL_NEW':
+            response['Attributes'] = _clone(item)
+        elif ReturnValues == 'UPDATED_NEW':
+            response['Attributes'] = {k: _clone(item[k]) for k in touched if k in item}
+        elif ReturnValues == 'ALL_OLD' and old is not None:
+            response['Attributes'] = _clone(old)
+        return response
+
+    def delete_item(self, Key, ConditionExpression=None, ReturnValues='NONE', **kwargs):
+        self.service.admit('DeleteItem', self.name)
+        key = self._key_of(_normalize(Key), 'DeleteItem')
+        with self._lock:
+            old = self._items.get(key)
+            size = item_size(old or {})
+            self.service.record('DeleteItem', self.name, write_bytes=size)
+            _check_condition(ConditionExpression, old, kwargs, 'DeleteItem')
+            self._drop(key)
+        response = self.service.response(self.name, 'DeleteItem', kwargs, write=True, size=size)
+        if ReturnValues == 'ALL_OLD' and old is not None:
+            response['Attributes'] = _clone(old)
+        return response
+
+    def _page(self, candidates, kwargs, operation, index_name=None):
+        """Apply Limit / 1 MB page size / FilterExpression the way DynamoDB does"""
+        limit = kwargs.get('Limit')
+        filter_expression = kwargs.get('FilterExpression')
+        projection = kwargs.get('ProjectionExpression')
+        names = kwargs.get('ExpressionAttributeNames')
+        paths = _projection_paths(projection, names) if projection else None
+        items, evaluated, scanned_bytes = [], 0, 0
+        last_item = None
+        exhausted = True
+        for item in candidates:
+            if limit is not None and evaluated >= limit:
+                exhausted = False
+                break
+            if scanned_bytes >= MAX_PAGE_BYTES:
+                exhausted = False
+                break
+            evaluated += 1
+            scanned_bytes += item_size(item)
+            last_item = item
+            if filter_expression is not None:
+                if isinstance(filter_expression, str):
+                    if not evaluate_string_condition(filter_expression, item, names,
+                                                     kwargs.get('ExpressionAttributeValues')):
+                        continue
+                elif not evaluate_condition(filter_expression, item):
+                    continue
+            items.append(_clone(_project(item, projection, names, paths)))
+
+        self.service.record(operation, self.name, read_bytes=scanned_bytes,
+                            consistent=kwargs.get('ConsistentRead', False))
+        response = self.service.response(self.name, operation, kwargs, size=scanned_bytes)
+        response.update({'Items': items, 'Count': len(items), 'ScannedCount': evaluated})
+        if not exhausted and last_item is not None:
+            response['LastEvaluatedKey'] = self._key_dict(last_item, index_name)
+        return response
+
+    def scan(self, ExclusiveStartKey=None, IndexName=None, Segment=None, TotalSegments=None, **kwargs):
+        self.service.admit('Scan', self.name)
+        with self._lock:
+            start = 0
+            if ExclusiveStartKey:
+                start = self._position.get(self._key_of(_normalize(ExclusiveStartKey)), -1) + 1
+            order = self._order
+
+            def candidates():
+                for position in range(start, len(order)):
+                    key = order[position]
+                    if key is None:
+                        continue
+                    if TotalSegments and hash(key) % TotalSegments != Segment:
+                        continue
+                    item = self._items[key]
+                    if IndexName and not self._indexed(IndexName, item):
+                        continue
+                    yield item
+
+            return self._page(candidates(), kwargs, 'Scan', IndexName)
+
+    def query(self, KeyConditionExpression, IndexName=None, ExclusiveStartKey=None,
+              ScanIndexForward=True, **kwargs):
+        self.service.admit('Query', self.name)
+        hash_attr, range_attr = self._index_keys(IndexName)
+        hash_value = _find_hash_value(KeyConditionExpression, hash_attr)
+        with self._lock:
+            if IndexName is None and not self.range_key:
+                keys = [(hash_value,)] if (hash_value,) in self._items else []
+            else:
+                keys = list(self._partitions[IndexName].get(hash_value, ()))
+            items = [self._items[k] for k in keys]
+        items = [i for i in items if evaluate_condition(KeyConditionExpression, i)]
+        if range_attr:
+            items.sort(key=lambda i: i.get(range_attr), reverse=not ScanIndexForward)
+        if ExclusiveStartKey:
+            start_key = self._key_of(_normalize(ExclusiveStartKey))
+            for position, item in enumerate(items):
+                if self._key_of(item) == start_key:
+                    items = items[position + 1:]
+                    break
+        return self._page(iter(items), kwargs, 'Query', IndexName)
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return _LocalBatchWriter(self)
+
+
+class _LocalBatchWriter:
+    """Minimal stand-in for boto3's BatchWriter context manager"""
+
+    def __init__(self, table):
+        self.table = table
+        self.pending = []
+
+    def put_item(self, Item):
+        self.pending.append({'PutRequest': {'Item': Item}})
+        self._maybe_flush()
+
+    def delete_item(self, Key):
+        self.pending.append({'DeleteRequest': {'Key': Key}})
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self.pending) >= 25:
+            self.flush()
+
+    def flush(self):
+        while self.pending:
+            batch, self.pending = self.pending[:25], self.pending[25:]
+            response = self.table.service.batch_write_item(RequestItems={self.table.name: batch})
+            self.pending.extend(response.get('UnprocessedItems', {}).get(self.table.name, []))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+def _find_hash_value(condition, hash_attr):
+    """Pull the partition key equality value out of a KeyConditionExpression"""
+    op = condition.expression_operator
+    if op == 'AND':
+        for part in condition._values:
+            value = _find_hash_value(part, hash_attr)
+            if value is not None:
+                return value
+        return None
+    if op == '=' and getattr(condition._values[0], 'name', None) == hash_attr:
+        return _normalize(condition._values[1])
+    return None
+
+
+class _ClientExceptions:
+    """Exception classes exposed as client.exceptions.<Code> like botocore does"""
+
+    def __init__(self, codes):
+        for code in codes:
+            setattr(self, code, type(code, (ClientError,), {}))
+
+    def raise_for(self, code, message, operation):
+        cls = getattr(self, code, ClientError)
+        raise cls({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+class LocalDynamoDB:
+    """
+    Stand-in for boto3.resource('dynamodb') and its low-level client.
+
+    Optional knobs:
+      latency_ms            - simulated per-request network latency
+      unprocessed_rate      - fraction of batch items returned as unprocessed
+      capacity_per_second   - per-table request budget; beyond it requests
+                              fail with ProvisionedThroughputExceededException
+      retry_attempts        - retry throttled requests this many times first
+                              (botocore-style backoff, reported as RetryAttempts)
+    """
+
+    def __init__(self, latency_ms=0.0, unprocessed_rate=0.0, capacity_per_second=None, retry_attempts=0, seed=0):
+        self.tables = {}
+        self.latency_ms = latency_ms
+        self.unprocessed_rate = unprocessed_rate
+        self.capacity_per_second = capacity_per_second
+        self.retry_attempts = retry_attempts
+        self._local = threading.local()
+        self.counters = defaultdict(int)
+        self.capacity = defaultdict(float)
+        self.exceptions = _ClientExceptions([
+            'ConditionalCheckFailedException', 'ProvisionedThroughputExceededException',
+            'ResourceNotFoundException', 'ValidationException'])
+        self._lock = threading.Lock()
+        self._windows = defaultdict(lambda: [0.0, 0])
+        self._rng_state = seed or 1
+
+        # boto3 exposes the low-level client as resource.meta.client
+        self.meta = type('Meta', (), {'client': self})()
+
+    # -- table management -------------------------------------------------
+
+    def create_table(self, name, hash_key, range_key=None, indexes=None):
+        table = LocalTable(self, name, hash_key, range_key, indexes)
+        self.tables[name] = table
+        return table
+
+    def create_table_from_schema(self, schema_file, name=None):
+        """Create a table from one of the dynamodb-schemas/*.json definitions"""
+        with open(os.path.join(SCHEMAS_DIR, schema_file)) as f:
+            schema = json.load(f)
+        keys = {k['KeyType']: k['AttributeName'] for k in schema['KeySchema']}
+        indexes = {}
+        for gsi in schema.get('GlobalSecondaryIndexes', []):
+            gsi_keys = {k['KeyType']: k['AttributeName'] for k in gsi['KeySchema']}
+            indexes[gsi['IndexName']] = (gsi_keys['HASH'], gsi_keys.get('RANGE'))
+        return self.create_table(name or schema['TableName'], keys['HASH'], keys.get('RANGE'), indexes)
+
+    def Table(self, name):
+        if name not in self.tables:
+            raise client_error('ResourceNotFoundException', f'Requested resource not found: {name}',
+                               'DescribeTable')
+        return self.tables[name]
+
+    # -- accounting -------------------------------------------------------
+
+    def admit(self, operation, table_name):
+        """
+        Throttle check before a request does any work. With retry_attempts,
+        throttled requests are retried with exponential backoff like botocore
+        does, and the response reports ResponseMetadata.RetryAttempts.
+        """
+        attempts = 0
+        while True:
+            with self._lock:
+                throttled = self._throttled(table_name)
+                if throttled:
+                    self.counters[f'dynamodb.{operation}.throttled'] += 1
+            if not throttled:
+                self._local.retries = attempts
+                return
+            if attempts >= self.retry_attempts:
+                self.exceptions.raise_for('ProvisionedThroughputExceededException',
+                                          'The level of configured provisioned throughput for the table was exceeded.',
+                                          operation)
+            attempts += 1
+            time.sleep(min(RETRY_MAX_BACKOFF, RETRY_BASE_DELAY * 2 ** attempts))
+
+    def record(self, operation, table_name, read_bytes=0, write_bytes=0, consistent=False):
+        """Count a request and apply simulated latency"""
+        with self._lock:
+            self.counters[f'dynamodb.{operation}'] += 1
+            if read_bytes:
+                units = max(1, -(-read_bytes // 4096))
+                self.capacity[f'{table_name}.RCU'] += units if consistent else units / 2
+            if write_bytes:
+                self.capacity[f'{table_name}.WCU'] += max(1, -(-write_bytes // 1024))
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+    def _throttled(self, table_name):
+        if not self.capacity_per_second:
+            return False
+        window = self._windows[table_name]
+        now = time.monotonic()
+        if now - window[0] >= 1.0:
+            window[0], window[1] = now, 0
+        window[1] += 1
+        return window[1] > self.capacity_per_second
+
+    def response(self, table_name, operation, kwargs, write=False, size=0):
+        """Base response dict, including ConsumedCapacity (for size bytes) when requested"""
+        response = {'ResponseMetadata': self.metadata()}
+        mode = kwargs.get('ReturnConsumedCapacity', 'NONE')
+        if mode in ('TOTAL', 'INDEXES'):
+            if write:
+                units = float(max(1, -(-size // 1024)))
+                response['ConsumedCapacity'] = {'TableName': table_name, 'CapacityUnits': units,
+                                                'WriteCapacityUnits': units}
+            else:
+                units = max(1, -(-size // 4096)) * (1.0 if kwargs.get('ConsistentRead') else 0.5)
+                response['ConsumedCapacity'] = {'TableName': table_name, 'CapacityUnits': units,
+                                                'ReadCapacityUnits': units}
+        return response
+
+    def metadata(self):
+        metadata = {'HTTPStatusCode': 200, 'RequestId': uuid.uuid4().hex}
+        retries = getattr(self._local, 'retries', 0)
+        if retries:
+            metadata['RetryAttempts'] = retries
+        return metadata
+
+    def reset_counters(self):
+        with self._lock:
+            self.counters.clear()
+            self.capacity.clear()
+
+    def _unprocessed(self):
+        if not self.unprocessed_rate:
+            return False
+        # xorshift keeps the simulation deterministic without touching random's global state
+        x = self._rng_state
+        x ^= (x << 13) & 0xFFFFFFFF
+        x ^= x >> 17
+        x ^= (x << 5) & 0xFFFFFFFF
+        self._rng_state = x
+        return (x % 10000) / 10000.0 < self.unprocessed_rate
+
+    # -- batch operations (resource and client share the Python-typed form) --
+
+    def batch_get_item(self, RequestItems, ReturnConsumedCapacity='NONE', **kwargs):
+        if sum(len(spec['Keys']) for spec in RequestItems.values()) > 100:
+            raise client_error('ValidationException',
+                               'Too many items requested for the BatchGetItem call', 'BatchGetItem')
+        responses, unprocessed, consumed = {}, {}, []
+        total_bytes = 0
+        for table_name, spec in RequestItems.items():
+            table = self.Table(table_name)
+            self.admit('BatchGetItem', table_name)
+            found = []
+            table_bytes = 0
+            for key in spec['Keys']:
+                if self._unprocessed():
+                    unprocessed.setdefault(table_name, dict(spec, Keys=[]))['Keys'].append(key)
+                    continue
+                item = table._items.get(table._key_of(_normalize(key)))
+                if item is not None:
+                    table_bytes += item_size(item)
+                    found.append(_clone(_project(item, spec.get('ProjectionExpression'),
+                                                 spec.get('ExpressionAttributeNames'))))
+            responses[table_name] = found
+            total_bytes += table_bytes
+            if ReturnConsumedCapacity in ('TOTAL', 'INDEXES'):
+                consumed.append({'TableName': table_name,
+                                 'CapacityUnits': max(1, -(-table_bytes // 4096)) * 0.5})
+            self.record('BatchGetItem', table_name, read_bytes=table_bytes)
+        response = {'Responses': responses, 'UnprocessedKeys': unprocessed,
+                    'ResponseMetadata': self.metadata()}
+        if consumed:
+            response['ConsumedCapacity'] = consumed
+        return response
+
+    def batch_write_item(self, RequestItems, ReturnConsumedCapacity='NONE', **kwargs):
+        if sum(len(requests) for requests in RequestItems.values()) > 25:
+            raise client_error('ValidationException',
+                               'Too many items requested for the BatchWriteItem call', 'BatchWriteItem')
+        unprocessed, consumed = {}, []
+        for table_name, requests in RequestItems.items():
+            table = self.Table(table_name)
+            self.admit('BatchWriteItem', table_name)
+            keys = [table._key_of(_normalize(r['PutRequest']['Item'] if 'PutRequest' in r
+                                             else r['DeleteRequest']['Key']), 'BatchWriteItem')
+                    for r in requests]
+            if len(set(keys)) != len(keys):
+                raise client_error('ValidationException',
+                                   'Provided list of item keys contains duplicates', 'BatchWriteItem')
+            units = 0
+            for request in requests:
+                if self._unprocessed():
+                    unprocessed.setdefault(table_name, []).append(request)
+                    continue
+                with table._lock:
+                    if 'PutRequest' in request:
+                        item = _normalize(request['PutRequest']['Item'])
+                        units += max(1, -(-item_size(item) // 1024))
+                        table._store(table._key_of(item, 'BatchWriteItem'), item)
+                    else:
+                        key = table._key_of(_normalize(request['DeleteRequest']['Key']), 'BatchWriteItem')
+                        old = table._drop(key)
+                        units += max(1, -(-item_size(old or {}) // 1024))
+            if ReturnConsumedCapacity in ('TOTAL', 'INDEXES'):
+                consumed.append({'TableName': table_name, 'CapacityUnits': float(units)})
+            self.record('BatchWriteItem', table_name, write_bytes=units * 1024)
+        response = {'UnprocessedItems': unprocessed, 'ResponseMetadata': self.metadata()}
+        if consumed:
+            response['ConsumedCapacity'] = consumed
+        return response
+
+
+# =========================================================================
+# SES / Lambda / Step Functions
+# =========================================================================
+
+class LocalSES:
+    """Stand-in for boto3.client('ses'); keeps every message in memory"""
+
+    def __init__(self, latency_ms=0.0, max_send_rate=None, keep_messages=True):
+        self.latency_ms = latency_ms
+        self.max_send_rate = max_send_rate
+        self.keep_messages = keep_messages
+        self.sent = []
+        self.counters = defaultdict(int)
+        self.exceptions = _ClientExceptions(['MessageRejected', 'Throttling'])
+        self._lock = threading.Lock()
+        self._window = [0.0, 0]
+
+    def _throttle(self, operation):
+        with self._lock:
+            self.counters[f'ses.{operation}'] += 1
+            if not self.max_send_rate:
+                return
+            now = time.monotonic()
+            if now - self._window[0] >= 1.0:
+                self._window[0], self._window[1] = now, 0
+            self._window[1] += 1
+            if self._window[1] > self.max_send_rate:
+                self.counters[f'ses.{operation}.throttled'] += 1
+                self.exceptions.raise_for('Throttling', 'Maximum sending rate exceeded.', operation)
+
+    def send_email(self, Source, Destination, Message, **kwargs):
+        self._throttle('SendEmail')
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        message_id = uuid.uuid4().hex
+        if self.keep_messages:
+            with self._lock:
+                self.sent.append({'MessageId': message_id, 'Source': Source,
+                                  'Destination': Destination, 'Message': Message})
+        return {'MessageId': message_id}
+
+    def reset_counters(self):
+        with self._lock:
+            self.counters.clear()
+            self.sent.clear()
+
+
+class LocalLambda:
+    """
+    Stand-in for boto3.client('lambda') that runs registered handlers in-process.
+
+    concurrency_limit caps simultaneous synchronous invocations per function;
+    beyond it invoke() fails with TooManyRequestsException like a throttled
+    Lambda.
+    """
+
+    def __init__(self, concurrency_limit=None):
+        self.functions = {}
+        self.counters = defaultdict(int)
+        self.concurrency_limit = concurrency_limit
+        self.exceptions = _ClientExceptions(['ResourceNotFoundException', 'TooManyRequestsException'])
+        self._in_flight = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def register(self, function_name, handler):
+        self.functions[function_name] = handler
+
+    def invoke(self, FunctionName, Payload=b'{}', InvocationType='RequestResponse', **kwargs):
+        name = FunctionName.split(':')[-1]
+        with self._lock:
+            self.counters['lambda.Invoke'] += 1
+            if name not in self.functions:
+                raise client_error('ResourceNotFoundException', f'Function not found: {FunctionName}', 'Invoke')
+            if self.concurrency_limit and self._in_flight[name] >= self.concurrency_limit:
+                self.counters['lambda.Invoke.throttled'] += 1
+                self.exceptions.raise_for('TooManyRequestsException', 'Rate Exceeded.', 'Invoke')
+            self._in_flight[name] += 1
+        try:
+            event = json.loads(Payload) if isinstance(Payload, (str, bytes)) else Payload
+            result = self.functions[name](event, None)
+        finally:
+            with self._lock:
+                self._in_flight[name] -= 1
+        if InvocationType == 'Event':
+            return {'StatusCode': 202, 'Payload': io.BytesIO(b'')}
+        return {'StatusCode': 200, 'Payload': io.BytesIO(json.dumps(result, default=str).encode('utf-8'))}
+
+
+class LocalStepFunctions:
+    """
+    Stand-in for boto3.client('stepfunctions'). Executions are only recorded,
+    unless a local_workflow.StateMachine is registered for the ARN; then they
+    run to completion inside start_execution.
+    """
+
+    def __init__(self):
+        self.executions = {}
+        self.machines = {}
+        self.counters = defaultdict(int)
+        self.exceptions = _ClientExceptions(['ExecutionAlreadyExists', 'StateMachineDoesNotExist',
+                                             'ExecutionDoesNotExist'])
+
+    def register(self, state_machine_arn, machine):
+        self.machines[state_machine_arn] = machine
+
+    def start_execution(self, stateMachineArn, input='{}', name=None, **kwargs):
+        self.counters['stepfunctions.StartExecution'] += 1
+        name = name or uuid.uuid4().hex
+        arn = f"{stateMachineArn.replace(':stateMachine:', ':execution:')}:{name}"
+        if arn in self.executions:
+            self.exceptions.raise_for('ExecutionAlreadyExists', f'Execution Already Exists: {arn}',
+                                      'StartExecution')
+        record = self.executions[arn] = {'input': json.loads(input), 'status': 'RUNNING'}
+        machine = self.machines.get(stateMachineArn)
+        if machine is not None:
+            execution = machine.run(record['input'], name)
+            record.update(status=execution.status, output=execution.output, error=execution.error,
+                          cause=execution.cause, execution=execution)
+            # Standard workflows bill every state entered and every retry as a transition
+            retries = sum(len(entry.get('retried_errors', [])) for entry in execution.trace)
+            self.counters['stepfunctions.StateTransition'] += len(execution.trace) + retries
+        return {'executionArn': arn, 'startDate': datetime.utcnow()}
+
+    def start_sync_execution(self, stateMachineArn, input='{}', name=None, **kwargs):
+        """Express StartSyncExecution: runs the registered machine and returns its result"""
+        self.counters['stepfunctions.StartSyncExecution'] += 1
+        machine = self.machines.get(stateMachineArn)
+        if machine is None:
+            self.exceptions.raise_for('StateMachineDoesNotExist', f'State Machine Does Not Exist: {stateMachineArn}',
+                                      'StartSyncExecution')
+        name = name or uuid.uuid4().hex
+        # Express execution names need not be unique, so nothing is recorded
+        arn = f"{stateMachineArn.replace(':stateMachine:', ':express:')}:{name}:{uuid.uuid4().hex}"
+        started = datetime.utcnow()
+        execution = machine.run(json.loads(input), name)
+        response = {'executionArn': arn, 'stateMachineArn': stateMachineArn, 'name': name,
+                    'startDate': started, 'stopDate': datetime.utcnow(), 'status': execution.status,
+                    'input': input, 'billingDetails': {'billedDurationInMilliseconds': int(execution.duration_ms)}}
+        if execution.status == 'SUCCEEDED':
+            response['output'] = json.dumps(execution.output)
+        else:
+            response.update(error=execution.error, cause=execution.cause)
+        return response
+
+    def describe_execution(self, executionArn):
+        self.counters['stepfunctions.DescribeExecution'] += 1
+        record = self.executions.get(executionArn)
+        if record is None:
+            self.exceptions.raise_for('ExecutionDoesNotExist', f'Execution Does Not Exist: {executionArn}',
+                                      'DescribeExecution')
+        response = {'executionArn': executionArn, 'status': record['status'], 'input': json.dumps(record['input'])}
+        if record.get('output') is not None:
+            response['output'] = json.dumps(record['output'])
+        if record.get('error'):
+            response.update(error=record['error'], cause=record['cause'])
+        return response
+
+
+class LocalS3:
+    """Stand-in for boto3.client('s3'): objects kept in memory with MD5 ETags"""
+
+    def __init__(self):
+        self.objects = {}
+        self.counters = defaultdict(int)
+        self.exceptions = _ClientExceptions(['NoSuchKey', 'NoSuchBucket'])
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket, Key, Body=b'', **kwargs):
+        if hasattr(Body, 'read'):
+            Body = Body.read()
+        data = Body.encode('utf-8') if isinstance(Body, str) else bytes(Body)
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        with self._lock:
+            self.counters['s3.PutObject'] += 1
+            self.objects[(Bucket, Key)] = {'Body': data, 'ETag': etag, 'Metadata': kwargs.get('Metadata', {}),
+                                           'ContentType': kwargs.get('ContentType', 'binary/octet-stream'),
+                                           'LastModified': datetime.utcnow()}
+        return {'ETag': etag}
+
+    def _object(self, Bucket, Key, operation):
+        with self._lock:
+            self.counters[f's3.{operation}'] += 1
+            obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            if operation == 'HeadObject':
+                # HEAD responses carry no error body, only the status code
+                raise client_error('404', 'Not Found', operation)
+            self.exceptions.raise_for('NoSuchKey', 'The specified key does not exist.', operation)
+        return obj
+
+    def head_object(self, Bucket, Key, **kwargs):
+        obj = self._object(Bucket, Key, 'HeadObject')
+        return {'ETag': obj['ETag'], 'ContentLength': len(obj['Body']), 'Metadata': obj['Metadata'],
+                'LastModified': obj['LastModified']}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        obj = self._object(Bucket, Key, 'GetObject')
+        return {'Body': io.BytesIO(obj['Body']), 'ETag': obj['ETag'], 'ContentLength': len(obj['Body']),
+                'Metadata': obj['Metadata'], 'LastModified': obj['LastModified']}
+
+
+class LocalAWS:
+    """Bundle of stand-ins with a boto3-like client()/resource() factory"""
+
+    def __init__(self, dynamodb=None, ses=None, lambda_=None):
+        self.dynamodb = dynamodb or LocalDynamoDB()
+        self.ses = ses or LocalSES()
+        self.lambda_ = lambda_ or LocalLambda()
+        self.stepfunctions = LocalStepFunctions()
+        self.s3 = LocalS3()
+
+    def client(self, service_name, *args, **kwargs):
+        return {
+            'dynamodb': self.dynamodb,
+            'ses': self.ses,
+            'lambda': self.lambda_,
+            'stepfunctions': self.stepfunctions,
+            's3': self.s3,
+        }[service_name]
+
+    def resource(self, service_name, *args, **kwargs):
+        if service_name != 'dynamodb':
+            raise ValueError(f'No local resource for {service_name}')
+        return self.dynamodb
+
+    def counters(self):
+        merged = defaultdict(int)
+        for service in (self.dynamodb, self.ses, self.lambda_, self.stepfunctions, self.s3):
+            for name, count in service.counters.items():
+                merged[name] += count
+        return dict(merged)
+
+    def reset_counters(self):
+        self.dynamodb.reset_counters()
+        self.ses.reset_counters()
+        self.lambda_.counters.clear()
+        self.stepfunctions.counters.clear()
+        self.s3.counters.clear()
@@ -0,0 +1,439 @@
+"""
+Local Step Functions interpreter.
+Purpose: Run the Amazon States Language subset used by
+step-functions/startup-matcher-workflow.json offline, calling the Lambda
+handlers in-process, and record a per-state timing trace
+
+Supported: Task (Lambda resources), Choice, Pass, Wait, Succeed, Fail and
+Map (ItemProcessor/Iterator, MaxConcurrency). Retry covers ErrorEquals,
+IntervalSeconds, BackoffRate, MaxAttempts, MaxDelaySeconds and
+JitterStrategy. Catch covers ErrorEquals, Next and ResultPath. Input and
+output processing covers InputPath, Parameters/ItemSelector, ResultSelector,
+ResultPath and OutputPath, with `.$` keys and `$$.` context paths.
+Intrinsic functions are not supported.
+
+Time is tracked on a virtual clock. Retry backoff, Wait states and an
+optional per-transition latency are added to it instead of slept, so a
+workflow with 2 s + 4 s + 8 s retries still runs in milliseconds. The trace
+shows what each state would have cost. Pass real_waits=True to actually sleep.
+"""
+
+import copy
+import fnmatch
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PATH_TOKEN = re.compile(r'\.([^.\[\]]+)|\[(\d+)\]')
+
+NUMERIC_OPS = {
+    'Equals': lambda a, b: a == b,
+    'LessThan': lambda a, b: a < b,
+    'GreaterThan': lambda a, b: a > b,
+    'LessThanEquals': lambda a, b: a <= b,
+    'GreaterThanEquals': lambda a, b: a >= b,
+}
+
+
+class WorkflowError(Exception):
+    """A States error (name + cause), as matched by Retry/Catch ErrorEquals"""
+
+    def __init__(self, error, cause=''):
+        super().__init__(f'{error}: {cause}')
+        self.error = error
+        self.cause = cause
+
+
+def load_definition(path, substitutions=None):
+    """Read an ASL JSON file, replacing ${Name} placeholders (CloudFormation !Sub style)"""
+    with open(path) as f:
+        text = f.read()
+    for name, value in (substitutions or {}).items():
+        text = text.replace('${' + name + '}', value)
+    return json.loads(text)
+
+
+# =========================================================================
+# Paths and payload templates
+# =========================================================================
+
+def read_path(data, path, context=None):
+    if path.startswith('$$'):
+        data, path = context or {}, path[1:]
+    if not path.startswith('$'):
+        raise WorkflowError('States.Runtime', f'Invalid path: {path}')
+    current = data
+    for name, index in PATH_TOKEN.findall(path[1:]):
+        try:
+            current = current[int(index)] if index else current[name]
+        except (KeyError, IndexError, TypeError):
+            raise WorkflowError('States.Runtime', f'Path {path} not found in input')
+    return current
+
+
+def has_path(data, path):
+    try:
+        read_path(data, path)
+        return True
+    except WorkflowError:
+        return False
+
+
+def write_path(data, path, value):
+    """ResultPath semantics: None discards the result, '$' replaces the input"""
+    if path is None:
+        return data
+    if path == '$':
+        return value
+    result = copy.deepcopy(data) if isinstance(data, dict) else {}
+    tokens = [name for name, _ in PATH_TOKEN.findall(path[1:])]
+    target = result
+    for name in tokens[:-1]:
+        if not isinstance(target.get(name), dict):
+            target[name] = {}
+        target = target[name]
+    target[tokens[-1]] = value
+    return result
+
+
+def render(template, data, context):
+    """Parameters / ItemSelector / ResultSelector: keys ending in .$ are paths"""
+    if isinstance(template, dict):
+        rendered = {}
+        for key, value in template.items():
+            if key.endswith('.$'):
+                if not isinstance(value, str) or not value.startswith('$'):
+                    raise WorkflowError('States.Runtime', f'Intrinsic functions are not supported: {value}')
+                rendered[key[:-2]] = read_path(data, value, context)
+            else:
+                rendered[key] = render(value, data, context)
+        return rendered
+    if isinstance(template, list):
+        return [render(value, data, context) for value in template]
+    return template
+
+
+def effective_input(state, data, context):
+    if 'InputPath' in state:
+        data = {} if state['InputPath'] is None else read_path(data, state['InputPath'], context)
+    template = state.get('Parameters', state.get('ItemSelector'))
+    if template is not None and state['Type'] != 'Map':
+        data = render(template, data, context)
+    return data
+
+
+def state_output(state, raw_input, result, context):
+    if 'ResultSelector' in state:
+        result = render(state['ResultSelector'], result, context)
+    output = write_path(raw_input, state.get('ResultPath', '$'), result)
+    if 'OutputPath' in state:
+        output = {} if state['OutputPath'] is None else read_path(output, state['OutputPath'], context)
+    return output
+
+
+# =========================================================================
+# Choice rules
+# =========================================================================
+
+def evaluate_rule(rule, data):
+    if 'And' in rule:
+        return all(evaluate_rule(r, data) for r in rule['And'])
+    if 'Or' in rule:
+        return any(evaluate_rule(r, data) for r in rule['Or'])
+    if 'Not' in rule:
+        return not evaluate_rule(rule['Not'], data)
+
+    variable = rule['Variable']
+    if 'IsPresent' in rule:
+        return has_path(data, variable) == rule['IsPresent']
+    value = read_path(data, variable)
+    for operator, expected in rule.items():
+        if operator in ('Variable', 'Next'):
+            continue
+        if operator.endswith('Path'):
+            operator, expected = operator[:-4], read_path(data, expected)
+        if operator == 'IsNull':
+            return (value is None) == expected
+        if operator == 'IsString':
+            return isinstance(value, str) == expected
+        if operator == 'IsBoolean':
+            return isinstance(value, bool) == expected
+        if operator == 'IsNumeric':
+            return (isinstance(value, (int, float)) and not isinstance(value, bool)) == expected
+        if operator == 'BooleanEquals':
+            return isinstance(value, bool) and value == expected
+        if operator == 'StringMatches':
+            return isinstance(value, str) and fnmatch.fnmatchcase(value, expected)
+        for prefix, kind in (('String', str), ('Timestamp', str), ('Numeric', (int, float))):
+            if operator.startswith(prefix) and operator[len(prefix):] in NUMERIC_OPS:
+                if not isinstance(value, kind) or isinstance(value, bool):
+                    return False
+                return NUMERIC_OPS[operator[len(prefix):]](value, expected)
+        raise WorkflowError('States.Runtime', f'Unsupported Choice operator: {operator}')
+    raise WorkflowError('States.Runtime', f'Choice rule without a comparison: {rule}')
+
+
+def error_matches(names, error):
+    if error in names:
+        return True
+    if 'States.ALL' in names:
+        return error != 'States.Runtime'
+    return 'States.TaskFailed' in names and error != 'States.Timeout' and not error.startswith('States.')
+
+
+# =========================================================================
+# Interpreter
+# =========================================================================
+
+class Execution:
+    """Result of one run: status, output or error, the trace and timings"""
+
+    def __init__(self, name, input_data):
+        self.name = name
+        self.input = input_data
+        self.status = 'RUNNING'
+        self.output = None
+        self.error = None
+        self.cause = None
+        self.trace = []
+        self.transitions = 0
+        self.wall_ms = 0.0
+        self.virtual_ms = 0.0
+        self.started = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration_ms(self):
+        """End-to-end latency including retry backoff, Wait states and transitions"""
+        return self.wall_ms + self.virtual_ms
+
+    def elapsed_ms(self):
+        """Position on the execution's clock (wall time so far plus virtual waits)"""
+        return (time.perf_counter() - self.started) * 1000.0 + self.virtual_ms
+
+    def add_virtual(self, ms):
+        with self._lock:
+            self.virtual_ms += ms
+
+    def record(self, entry):
+        with self._lock:
+            self.trace.append(entry)
+
+    def summary(self):
+        return {
+            'name': self.name,
+            'status': self.status,
+            'error': self.error,
+            'transitions': self.transitions,
+            'wall_ms': round(self.wall_ms, 3),
+            'virtual_ms': round(self.virtual_ms, 3),
+            'duration_ms': round(self.duration_ms, 3),
+            'trace': sorted(self.trace, key=lambda entry: entry['start_ms']),
+        }
+
+
+class StateMachine:
+    """
+    Interpreter for one definition.
+
+    resources maps Task Resource strings (Lambda ARNs) to callables taking the
+    payload and returning the result; use lambda_resource() for handlers.
+    """
+
+    def __init__(self, definition, resources, transition_ms=0.0, real_waits=False, seed=0):
+        self.definition = definition
+        self.resources = resources
+        self.transition_ms = transition_ms
+        self.real_waits = real_waits
+        self._rng = random.Random(seed)
+        self._counter = 0
+
+    def run(self, input_data=None, name=None):
+        self._counter += 1
+        execution = Execution(name or f'execution-{self._counter}', input_data if input_data is not None else {})
+        started = execution.started = time.perf_counter()
+        try:
+            execution.output = self._run_states(self.definition, copy.deepcopy(execution.input),
+                                                execution, {'Execution': {'Name': execution.name,
+                                                                          'Input': execution.input}})
+            execution.status = 'SUCCEEDED'
+        except WorkflowError as e:
+            execution.status = 'FAILED'
+            execution.error, execution.cause = e.error, e.cause
+        execution.wall_ms = (time.perf_counter() - started) * 1000.0
+        return execution
+
+    def _wait(self, execution, seconds):
+        if seconds <= 0:
+            return
+        if self.real_waits:
+            time.sleep(seconds)
+        else:
+            execution.add_virtual(seconds * 1000.0)
+
+    def _run_states(self, machine, data, execution, context, prefix=''):
+        states = machine['States']
+        name = machine['StartAt']
+        while True:
+            if name not in states:
+                raise WorkflowError('States.Runtime', f'No such state: {name}')
+            state = states[name]
+            started = time.perf_counter()
+            virtual_before = execution.virtual_ms
+            entry = {'state': prefix + name, 'type': state['Type'], 'start_ms': round(execution.elapsed_ms(), 3),
+                     'attempts': 0, 'retry_wait_ms': 0.0, 'error': None}
+            try:
+                data, next_name = self._run_state(name, state, data, execution, context, entry, prefix)
+            finally:
+                entry['wall_ms'] = round((time.perf_counter() - started) * 1000.0, 3)
+                entry['duration_ms'] = round(entry['wall_ms'] + execution.virtual_ms - virtual_before, 3)
+                execution.record(entry)
+            if next_name is None:
+                return data
+            execution.transitions += 1
+            if self.transition_ms:
+                self._wait(execution, self.transition_ms / 1000.0)
+            name = next_name
+
+    def _run_state(self, name, state, data, execution, context, entry, prefix):
+        kind = state['Type']
+        following = None if state.get('End') else state.get('Next')
+
+        if kind == 'Pass':
+            result = state['Result'] if 'Result' in state else effective_input(state, data, context)
+            return state_output(state, data, result, context), following
+
+        if kind == 'Succeed':
+            return state_output(state, data, effective_input(state, data, context), context), None
+
+        if kind == 'Fail':
+            entry['error'] = state.get('Error', 'States.Fail')
+            raise WorkflowError(state.get('Error', 'States.Fail'), state.get('Cause', ''))
+
+        if kind == 'Wait':
+            seconds = state.get('Seconds')
+            if 'SecondsPath' in state:
+                seconds = read_path(data, state['SecondsPath'], context)
+            self._wait(execution, float(seconds or 0))
+            return state_output(state, data, effective_input(state, data, context), context), following
+
+        if kind == 'Choice':
+            chosen = effective_input(state, data, context)
+            for rule in state.get('Choices', []):
+                if evaluate_rule(rule, chosen):
+                    return self._choice_output(state, data, context), rule['Next']
+            if 'Default' not in state:
+                raise WorkflowError('States.NoChoiceMatched', f'No Choice rule matched in {name}')
+            return self._choice_output(state, data, context), state['Default']
+
+        if kind in ('Task', 'Map'):
+            try:
+                result = self._with_retries(state, data, execution, context, entry, prefix + name)
+            except WorkflowError as e:
+                entry['error'] = e.error
+                for catcher in state.get('Catch', []):
+                    if error_matches(catcher['ErrorEquals'], e.error):
+                        entry['caught'] = catcher['Next']
+                        error_output = {'Error': e.error, 'Cause': e.cause}
+                        return write_path(data, catcher.get('ResultPath', '$'), error_output), catcher['Next']
+                raise
+            return state_output(state, data, result, context), following
+
+        raise WorkflowError('States.Runtime', f'Unsupported state type {kind} in {name}')
+
+    def _choice_output(self, state, data, context):
+        if 'OutputPath' in state:
+            return {} if state['OutputPath'] is None else read_path(data, state['OutputPath'], context)
+        return data
+
+    def _with_retries(self, state, data, execution, context, entry, path):
+        attempts_by_retrier = {}
+        while True:
+            entry['attempts'] += 1
+            try:
+                if state['Type'] == 'Task':
+                    return self._invoke(state, effective_input(state, data, context))
+                return self._map(state, data, execution, context, path)
+            except WorkflowError as e:
+                retrier = next((r for r in state.get('Retry', []) if error_matches(r['ErrorEquals'], e.error)), None)
+                if retrier is None:
+                    raise
+                index = id(retrier)
+                attempts_by_retrier[index] = attempts_by_retrier.get(index, 0) + 1
+                if attempts_by_retrier[index] > retrier.get('MaxAttempts', 3):
+                    raise
+                delay = retrier.get('IntervalSeconds', 1) * retrier.get('BackoffRate', 2.0) ** (attempts_by_retrier[index] - 1)
+                if 'MaxDelaySeconds' in retrier:
+                    delay = min(delay, retrier['MaxDelaySeconds'])
+                if retrier.get('JitterStrategy') == 'FULL':
+                    delay = self._rng.uniform(0, delay)
+                entry['retry_wait_ms'] = round(entry['retry_wait_ms'] + delay * 1000.0, 3)
+                entry.setdefault('retried_errors', []).append(e.error)
+                self._wait(execution, delay)
+
+    def _invoke(self, state, payload):
+        resource = state['Resource']
+        handler = self.resources.get(resource)
+        if handler is None:
+            raise WorkflowError('States.Runtime', f'No local resource for {resource}')
+        return handler(payload)
+
+    def _map(self, state, data, execution, context, path):
+        items_input = effective_input(state, data, context)
+        items = read_path(items_input, state.get('ItemsPath', '$'), context)
+        if not isinstance(items, list):
+            raise WorkflowError('States.Runtime', f'ItemsPath of {path} is not an array')
+        processor = state.get('ItemProcessor') or state.get('Iterator')
+        selector = state.get('ItemSelector', state.get('Parameters'))
+
+        def run_item(index):
+            item_context = dict(context, Map={'Item': {'Index': index, 'Value': items[index]}})
+            item = render(selector, items_input, item_context) if selector is not None else items[index]
+            return self._run_states(processor, item, execution, item_context, prefix=f'{path}/')
+
+        workers = state.get('MaxConcurrency') or len(items) or 1
+        if workers == 1 or len(items) <= 1:
+            return [run_item(i) for i in range(len(items))]
+        # Branch waits overlap in reality; the virtual clock adds them up, an upper bound
+        with ThreadPoolExecutor(max_workers=min(workers, len(items), 32)) as pool:
+            return list(pool.map(run_item, range(len(items))))
+
+
+def lambda_resource(handler):
+    """
+    Wrap a Lambda handler the way the Step Functions Lambda integration sees
+    it: a JSON round trip of payload and result, and exceptions reported as
+    errors named after their class.
+    """
+    def invoke(payload):
+        event = json.loads(json.dumps(payload))
+        try:
+            result = handler(event, None)
+        except Exception as e:
+            raise WorkflowError(type(e).__name__, json.dumps({'errorMessage': str(e),
+                                                              'errorType': type(e).__name__}))
+        try:
+            return json.loads(json.dumps(result))
+        except (TypeError, ValueError) as e:
+            raise WorkflowError('Runtime.MarshalError', str(e))
+    return invoke
+
+
+def inject_failures(resource, failures, error='Lambda.ServiceException'):
+    """
+    Fault injection for profiling Retry/Catch: the first `failures` calls of
+    each execution fail with `error` before reaching the resource. Call
+    reset() between executions.
+    """
+    state = {'calls': 0}
+
+    def invoke(payload):
+        state['calls'] += 1
+        if state['calls'] <= failures:
+            raise WorkflowError(error, 'Injected failure')
+        return resource(payload)
+    invoke.reset = lambda: state.update(calls=0)
+    return invoke
@@ -0,0 +1,97 @@
+"""
+Matcher memory scaling check.
+Purpose: Run the full dev-startup-matcher pass over growing investor counts
+(fixed catalogue) under tracemalloc and fail if peak memory grows with the
+number of investors
+
+Data written into the local stand-in tables (recommendations, seen-sets)
+stays allocated after the run and grows with investors by construction; it is
+reported separately and subtracted, so the check covers the matcher's own
+working set.
+
+Usage:
+    python benchmarks/memory_scaling.py
+    python benchmarks/memory_scaling.py --investors 1000,4000,16000 --startups 2000
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+from harness import (INVESTORS_TABLE, PREFERENCES_TABLE, STARTUPS_TABLE, load_handler, quiet)
+from local_aws import LocalAWS, LocalSES
+from synthetic_data import iter_investors, iter_startups
+
+# Allowed growth of the working set from the smallest to the largest run
+DEFAULT_MAX_GROWTH = 0.25
+
+
+def measure(investors, startups, seed):
+    aws = LocalAWS(ses=LocalSES(keep_messages=False))
+    db = aws.dynamodb
+    db.create_table_from_schema('startups-table.json', STARTUPS_TABLE).load(iter_startups(startups, seed))
+    db.create_table_from_schema('investors-table.json', INVESTORS_TABLE).load(iter_investors(investors, seed))
+    db.create_table(PREFERENCES_TABLE, 'investor_id')
+    module = load_handler('dev-startup-matcher', aws)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        with quiet():
+            response = module.lambda_handler({}, None)
+        elapsed = time.perf_counter() - started
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if response.get('statusCode') != 200:
+        raise SystemExit(f"Matcher failed: {response}")
+
+    retained = max(0, current - before)
+    return {
+        'investors': investors,
+        'seconds': round(elapsed, 2),
+        'peak_kb': round((peak - before) / 1024.0, 1),
+        'retained_kb': round(retained / 1024.0, 1),
+        'working_kb': round((peak - before - retained) / 1024.0, 1),
+        'emails': aws.ses.counters.get('ses.SendEmail', 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--investors', default='250,1000,4000', help='comma-separated investor counts')
+    parser.add_argument('--startups', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-growth', type=float, default=DEFAULT_MAX_GROWTH,
+                        help='allowed working-set growth, smallest to largest run (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    counts = sorted(int(n) for n in args.investors.split(','))
+    print(f"Matcher memory vs investor count ({args.startups} startups)\n")
+    print(f"{'investors':>10} {'seconds':>9} {'emails':>8} {'peak KB':>10} {'retained KB':>12} {'working KB':>11}")
+    print('-' * 65)
+    results = []
+    for count in counts:
+        result = measure(count, args.startups, args.seed)
+        results.append(result)
+        print(f"{result['investors']:>10} {result['seconds']:>9} {result['emails']:>8} {result['peak_kb']:>10} "
+              f"{result['retained_kb']:>12} {result['working_kb']:>11}")
+
+    smallest, largest = results[0], results[-1]
+    growth = (largest['working_kb'] - smallest['working_kb']) / smallest['working_kb'] if smallest['working_kb'] else 0
+    factor = largest['investors'] / smallest['investors']
+    print(f"\nWorking set {growth:+.0%} for {factor:.0f}x the investors (limit {args.max_growth:+.0%})")
+    if growth > args.max_growth:
+        print("❌ Matcher memory grows with the number of investors")
+        return 1
+    print("✅ Matcher memory is flat in the number of investors")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,722 @@
+"""
+Offline benchmark suite for the Lambda functions.
+Purpose: Measure matcher / API / email / batch performance against local
+DynamoDB + SES stand-ins and flag regressions against a stored baseline
+
+Usage:
+    python benchmarks/run_benchmarks.py                       # run + compare to baseline.json
+    python benchmarks/run_benchmarks.py --startups 10000      # bigger catalogue
+    python benchmarks/run_benchmarks.py --save-baseline       # record a new baseline
+    python benchmarks/run_benchmarks.py --scenarios api.get_startups,matcher.single_investor
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from harness import (BACKEND_DIR, COUNTERS_TABLE, EVENTS_TABLE, INVESTORS_TABLE, MATCHER_FUNCTION, PREFERENCES_TABLE,
+                     STARTUPS_TABLE, load_handler, peak_memory, quiet, summarize, time_operations)
+from local_aws import LocalAWS
+from synthetic_data import (generate_preference, investor_id_for, iter_counters, iter_events, iter_investors,
+                            iter_startups, startup_id_for)
+from workflow_trace import EXPRESS_DEFINITION_FILE, build_machine
+
+# Shared Lambda modules (harness puts lambda-functions/shared on sys.path)
+import ddb_batch  # noqa: E402
+import matching  # noqa: E402
+import similarity  # noqa: E402
+import snapshots  # noqa: E402
+import startup_records  # noqa: E402
+
+INGEST_TABLE = 'benchmark-ingest-startups'
+INGEST_RECORDS = 1000
+
+# Catalogue size for the raw similarity top-K scenario (independent of --startups)
+SIMILARITY_LOOKUP_STARTUPS = 100000
+
+# The matcher workflow runs under its own ARN so the batch workflow scenario keeps only recording executions
+WORKFLOW_TRACE_ARN = 'arn:aws:states:eu-north-1:000000000000:stateMachine:startup-investor-platform-dev-local-trace'
+EXPRESS_TRACE_ARN = 'arn:aws:states:eu-north-1:000000000000:stateMachine:startup-investor-platform-dev-local-express'
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Relative slack before a timing/memory change counts as a regression
+DEFAULT_TOLERANCE = 0.25
+# Latency deltas below this are treated as noise regardless of percentage
+NOISE_FLOOR_MS = 1.0
+# Below this many iterations p95/p99 are just the slowest sample, so only p50 is compared
+TAIL_MIN_ITERATIONS = 20
+# Re-runs of a scenario whose only regressions are timings, before they are reported
+DEFAULT_RETRIES = 2
+
+
+class BenchmarkEnvironment:
+    """Local AWS stand-ins seeded with synthetic data plus the loaded handlers"""
+
+    def __init__(self, startups, investors, seed=42):
+        self.startup_count = startups
+        self.investor_count = investors
+        self.seed = seed
+        self.aws = LocalAWS()
+        db = self.aws.dynamodb
+        # Module-level snapshot cache would otherwise carry over from the previous environment
+        snapshots.clear()
+
+        print(f"Seeding {startups} startups and {investors} investors...")
+        started = time.perf_counter()
+        db.create_table_from_schema('startups-table.json', STARTUPS_TABLE).load(iter_startups(startups, seed))
+        db.create_table_from_schema('investors-table.json', INVESTORS_TABLE).load(iter_investors(investors, seed))
+        db.create_table(PREFERENCES_TABLE, 'investor_id')
+        db.create_table_from_schema('events-table.json', EVENTS_TABLE)
+        self.reset_events()
+        db.create_table_from_schema('startup-counters-table.json', COUNTERS_TABLE).load(
+            iter_counters(startups, seed))
+        db.create_table_from_schema('startups-table.json', INGEST_TABLE)
+        self.reset_preferences()
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+        self.handlers = {
+            'api-handler': load_handler('api-handler', self.aws),
+            'dev-startup-matcher': load_handler('dev-startup-matcher', self.aws),
+            'send-email-notif': load_handler('send-email-notif', self.aws),
+            'batch-processor': load_handler('batch-processor', self.aws),
+            'snapshot-builder': load_handler('snapshot-builder', self.aws),
+            'dev-trigger-workflow': load_handler('dev-trigger-workflow', self.aws),
+        }
+        self.aws.lambda_.register(MATCHER_FUNCTION, self.handlers['dev-startup-matcher'].lambda_handler)
+        with quiet():
+            self.handler('snapshot-builder')({}, None)
+
+    def reset_preferences(self):
+        """
+        Reload investor-preferences with hours rotated onto the current UTC
+        hour, so the set of users due "now" is the same on every run.
+        """
+        current_hour = datetime.utcnow().hour
+        rows = []
+        for investor in iter_investors(self.investor_count, self.seed):
+            row = generate_preference(investor)
+            hour = (int(row['preferred_time'].split(':')[0]) + current_hour) % 24
+            row['preferred_time'] = f'{hour:02d}:00'
+            rows.append(row)
+        table = self.aws.dynamodb.Table(PREFERENCES_TABLE)
+        table.clear()
+        table.load(rows)
+
+    def reset_events(self):
+        table = self.aws.dynamodb.Table(EVENTS_TABLE)
+        table.clear()
+        table.load(iter_events(self.investor_count, self.startup_count, self.seed))
+
+    def reset_notifications(self):
+        """Forget which startups each investor has already been emailed about"""
+        table = self.aws.dynamodb.Table(INVESTORS_TABLE)
+        notified = [item for item in table.items() if 'seen_startups' in item]
+        for item in notified:
+            del item['seen_startups']
+        table.load(notified)
+
+    def reset_digest(self):
+        self.reset_preferences()
+        self.reset_notifications()
+
+    def handler(self, name):
+        return self.handlers[name].lambda_handler
+
+
+def api_event(method, path, resource=None, path_parameters=None, query=None, body=None, headers=None):
+    return {
+        'httpMethod': method,
+        'path': path,
+        'resource': resource or path,
+        'headers': headers,
+        'pathParameters': path_parameters,
+        'queryStringParameters': query,
+        'body': json.dumps(body) if body is not None else None,
+    }
+
+
+# =========================================================================
+# Scenarios: each returns (operation(i), iterations, reset or None)
+# =========================================================================
+
+def scenario_matcher_all(env, scale):
+    handler = env.handler('dev-startup-matcher')
+    return (lambda i: handler({}, None)), max(1, scale // 1000), None
+
+
+def scenario_matcher_single(env, scale):
+    handler = env.handler('dev-startup-matcher')
+    count = env.investor_count
+
+    def run(i):
+        investor_id = investor_id_for((i * 7919) % count)
+        handler({'body': json.dumps({'investor_id': investor_id})}, None)
+    return run, 20, None
+
+
+def scenario_matcher_single_similarity(env, scale):
+    run, iterations, _ = scenario_matcher_single(env, scale)
+
+    def run_with_similarity(i):
+        matching.SIMILARITY_POINTS = 20.0
+        try:
+            run(i)
+        finally:
+            matching.SIMILARITY_POINTS = 0.0
+    return run_with_similarity, iterations, None
+
+
+def scenario_matcher_single_proximity(env, scale):
+    run, iterations, _ = scenario_matcher_single(env, scale)
+
+    def run_with_proximity(i):
+        matching.PROXIMITY_POINTS = 20.0
+        try:
+            run(i)
+        finally:
+            matching.PROXIMITY_POINTS = 0.0
+    return run_with_proximity, iterations, None
+
+
+def scenario_api_get_startups(env, scale):
+    handler = env.handler('api-handler')
+    return (lambda i: handler(api_event('GET', '/startups', query={'limit': '25'}), None)), 200, None
+
+
+def scenario_api_get_startups_gzip(env, scale):
+    handler = env.handler('api-handler')
+    event = api_event('GET', '/startups', query={'limit': '100'}, headers={'Accept': 'application/json',
+                                                                           'Accept-Encoding': 'gzip, deflate, br'})
+    return (lambda i: handler(event, None)), 100, None
+
+
+def scenario_api_export_startups(env, scale):
+    handler = env.handler('api-handler')
+    headers = {'Accept': 'application/x-ndjson', 'Accept-Encoding': 'gzip'}
+
+    def export_all(i):
+        query = None
+        while True:
+            response = handler(api_event('GET', '/startups/export', query=query, headers=headers), None)
+            cursor = response['headers'].get('X-Next-Cursor')
+            if not cursor:
+                return response
+            query = {'cursor': cursor}
+    return export_all, 3, None
+
+
+def scenario_api_get_startups_industry(env, scale):
+    handler = env.handler('api-handler')
+    industries = ['FinTech', 'AI', 'HealthTech', 'SaaS']
+
+    def run(i):
+        query = {'industry': industries[i % len(industries)], 'limit': '25'}
+        handler(api_event('GET', '/startups', query=query), None)
+    return run, 200, None
+
+
+def scenario_api_get_startups_near(env, scale):
+    handler = env.handler('api-handler')
+    places = ['Berlin', 'London, UK', 'San Francisco', 'Singapore']
+
+    def run(i):
+        query = {'near': places[i % len(places)], 'radius_km': '50', 'limit': '25'}
+        handler(api_event('GET', '/startups', query=query), None)
+    return run, 200, None
+
+
+def scenario_api_get_startups_funding_range(env, scale):
+    handler = env.handler('api-handler')
+    ranges = [('250K', '2M'), ('5M', '20M'), ('1M', ''), ('', '500K')]
+
+    def run(i):
+        low, high = ranges[i % len(ranges)]
+        query = {'min_investment': low, 'max_investment': high, 'limit': '25'}
+        handler(api_event('GET', '/startups', query=query), None)
+    return run, 200, None
+
+
+def scenario_api_get_startup(env, scale):
+    handler = env.handler('api-handler')
+    buffer = env.handlers['api-handler'].counter_buffer
+    count = env.startup_count
+
+    def run(i):
+        startup_id = startup_id_for((i * 104729) % count)
+        handler(api_event('GET', f'/startups/{startup_id}', '/startups/{id}', {'id': startup_id}), None)
+
+    def reset():
+        # Start from an empty tally, so every run flushes the same batches of view counters
+        buffer.flush()
+    return run, 500, reset
+
+
+def scenario_api_batch_get_startups(env, scale):
+    handler = env.handler('api-handler')
+    count = env.startup_count
+
+    def run(i):
+        # One dashboard page: 25 startups in one request instead of 25 GET /startups/{id}
+        ids = [startup_id_for(((i * 25 + j) * 104729) % count) for j in range(25)]
+        handler(api_event('POST', '/startups/batch-get', body={'startup_ids': ids}), None)
+    return run, 200, None
+
+
+def scenario_api_similar_startups(env, scale):
+    handler = env.handler('api-handler')
+    count = env.startup_count
+
+    def run(i):
+        startup_id = startup_id_for((i * 104729) % count)
+        handler(api_event('GET', f'/startups/{startup_id}/similar', '/startups/{id}/similar',
+                          {'id': startup_id}, {'limit': '10'}), None)
+    return run, 500, None
+
+
+def scenario_similarity_top_k(env, scale):
+    """Raw cosine top-10 over a 100k-startup matrix (warm container, no I/O)"""
+    import numpy as np
+    rng = np.random.default_rng(env.seed)
+    vectors = rng.standard_normal((SIMILARITY_LOOKUP_STARTUPS, similarity.DIMENSIONS), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = np.asarray([startup_id_for(n) for n in range(SIMILARITY_LOOKUP_STARTUPS)])
+    index = similarity.SimilarityIndex(ids, vectors, np.ones(similarity.IDF_BUCKETS, dtype=np.float32))
+
+    def run(i):
+        row = (i * 104729) % SIMILARITY_LOOKUP_STARTUPS
+        index.top_k(index.vectors[row], 10, exclude={startup_id_for(row)})
+    return run, 200, None
+
+
+def scenario_snapshot_similarity(env, scale):
+    handler = env.handler('snapshot-builder')
+    return (lambda i: handler({'snapshots': ['similarity']}, None)), 3, None
+
+
+def scenario_api_contact_startup(env, scale):
+    """Contact requests: events are buffered and written 25 per BatchWriteItem"""
+    handler = env.handler('api-handler')
+    buffer = env.handlers['api-handler'].event_buffer
+    counter_buffer = env.handlers['api-handler'].counter_buffer
+    count = env.startup_count
+
+    def run(i):
+        startup_id = startup_id_for((i * 104729) % count)
+        body = {'investor_id': investor_id_for(i % env.investor_count), 'message': 'Hello'}
+        handler(api_event('POST', f'/startups/{startup_id}/contact', '/startups/{id}/contact',
+                          {'id': startup_id}, body=body), None)
+
+    def reset():
+        buffer.flush()
+        env.reset_events()
+        counter_buffer.flush()
+    return run, 500, reset
+
+
+def scenario_snapshot_affinity(env, scale):
+    handler = env.handler('snapshot-builder')
+    return (lambda i: handler({'snapshots': ['affinity']}, None)), 3, None
+
+
+def scenario_api_trending_startups(env, scale):
+    handler = env.handler('api-handler')
+    event = api_event('GET', '/startups/trending', query={'limit': '20'})
+    return (lambda i: handler(event, None)), 500, None
+
+
+def scenario_snapshot_trending(env, scale):
+    handler = env.handler('snapshot-builder')
+    return (lambda i: handler({'snapshots': ['trending']}, None)), 3, None
+
+
+def scenario_api_get_investor(env, scale):
+    handler = env.handler('api-handler')
+    count = env.investor_count
+
+    def run(i):
+        investor_id = investor_id_for((i * 7919) % count)
+        handler(api_event('GET', f'/investors/{investor_id}', '/investors/{id}', {'id': investor_id}), None)
+    return run, 500, None
+
+
+def scenario_api_save_investor(env, scale):
+    handler = env.handler('api-handler')
+    count = env.investor_count
+
+    def run(i):
+        investor_id = investor_id_for((i * 7919) % count)
+        body = {
+            'investor_id': investor_id,
+            'email': f'{investor_id}@example.com',
+            'preferred_industries': ['AI', 'FinTech'],
+            'preferred_funding_stages': ['Seed'],
+        }
+        handler(api_event('POST', '/investors', body=body), None)
+    return run, 500, None
+
+
+def scenario_api_batch_save_investors(env, scale):
+    handler = env.handler('api-handler')
+    count = env.investor_count
+
+    def run(i):
+        profiles = []
+        for j in range(25):
+            investor_id = investor_id_for(((i * 25 + j) * 7919) % count)
+            profiles.append({
+                'investor_id': investor_id,
+                'email': f'{investor_id}@example.com',
+                'preferred_industries': ['AI', 'FinTech'],
+                'preferred_funding_stages': ['Seed'],
+            })
+        handler(api_event('POST', '/investors/batch', body={'investors': profiles}), None)
+    return run, 100, None
+
+
+def scenario_api_add_bookmark(env, scale):
+    handler = env.handler('api-handler')
+    investors, startups = env.investor_count, env.startup_count
+
+    def run(i):
+        body = {'investor_id': investor_id_for((i * 7919) % investors),
+                'startup_id': startup_id_for((i * 104729) % startups)}
+        handler(api_event('POST', '/bookmarks', body=body), None)
+    return run, 500, None
+
+
+def scenario_api_list_bookmarks(env, scale):
+    handler = env.handler('api-handler')
+    count = env.investor_count
+
+    def run(i):
+        investor_id = investor_id_for((i * 7919) % count)
+        handler(api_event('GET', f'/bookmarks/{investor_id}', '/bookmarks/{userId}',
+                          {'userId': investor_id}, query={'limit': '25'}), None)
+    return run, 500, None
+
+
+def scenario_api_match_startups(env, scale):
+    handler = env.handler('api-handler')
+    count = env.investor_count
+
+    def run(i):
+        investor_id = investor_id_for((i * 7919) % count)
+        handler(api_event('POST', '/match-startups', body={'investor_id': investor_id}), None)
+    return run, 20, None
+
+
+def scenario_send_email(env, scale):
+    handler = env.handler('send-email-notif')
+    count = env.startup_count
+
+    def run(i):
+        matches = [startup_id_for((i * 31 + k) % count) for k in range(5)]
+        handler({'investor_id': investor_id_for(i), 'email': f'{investor_id_for(i)}@example.com',
+                 'matches': matches}, None)
+    return run, 200, None
+
+
+def scenario_batch_processor(env, scale):
+    module = env.handlers['batch-processor']
+
+    def run(i):
+        module.DISPATCH_MODE = 'digest'
+        module.lambda_handler({'source': 'aws.events'}, None)
+    return run, 5, env.reset_digest
+
+
+def scenario_batch_processor_repeat(env, scale):
+    module = env.handlers['batch-processor']
+
+    def run(i):
+        module.DISPATCH_MODE = 'digest'
+        module.lambda_handler({'source': 'aws.events'}, None)
+
+    def reset():
+        # Second run of the same bucket: every current match was already sent
+        env.reset_digest()
+        run(0)
+        env.reset_preferences()
+    return run, 5, reset
+
+
+def scenario_batch_processor_workflow(env, scale):
+    module = env.handlers['batch-processor']
+
+    def run(i):
+        module.DISPATCH_MODE = 'workflow'
+        module.lambda_handler({'source': 'aws.events'}, None)
+
+    def reset():
+        env.reset_preferences()
+        # Execution names are per second; without this, request counts depend on the clock
+        env.aws.stepfunctions.executions.clear()
+    return run, 5, reset
+
+
+def scenario_matcher_workflow(env, scale):
+    stepfunctions = env.aws.stepfunctions
+    stepfunctions.register(WORKFLOW_TRACE_ARN, build_machine(
+        {name: env.handler(name) for name in ('dev-startup-matcher', 'send-email-notif')}))
+
+    def run(i):
+        # Retries and extra states show up as stepfunctions.StateTransition in the request counts
+        investor_id = investor_id_for(i)
+        stepfunctions.start_execution(stateMachineArn=WORKFLOW_TRACE_ARN, name=f'bench-{i}',
+                                      input=json.dumps({'investor_id': investor_id,
+                                                        'email': f'{investor_id}@example.com'}))
+
+    def reset():
+        env.reset_preferences()
+        stepfunctions.executions.clear()
+    return run, 50, reset
+
+
+def scenario_matcher_interactive(env, scale):
+    stepfunctions = env.aws.stepfunctions
+    stepfunctions.register(EXPRESS_TRACE_ARN, build_machine(
+        {name: env.handler(name) for name in ('dev-startup-matcher', 'send-email-notif')},
+        definition_file=EXPRESS_DEFINITION_FILE))
+    module = env.handlers['dev-trigger-workflow']
+
+    def run(i):
+        # "Get Recommendations" end to end: StartSyncExecution, then the matches read back by key
+        module.EXPRESS_STATE_MACHINE_ARN = EXPRESS_TRACE_ARN
+        investor_id = investor_id_for(i)
+        module.lambda_handler({'body': json.dumps({'investor_id': investor_id,
+                                                   'email': f'{investor_id}@example.com'})}, None)
+    # Every click finds new matches, so each one includes the email step
+    return run, 50, env.reset_notifications
+
+
+def scenario_ingest_startups(env, scale):
+    fields = startup_records.load_schema(os.path.join(BACKEND_DIR, 'dynamodb-schemas', 'startups-table.json'))
+    raw = []
+    for startup in iter_startups(INGEST_RECORDS, env.seed + 1):
+        # Raw rows carry only the location and amount text; coordinates and USD amounts are derived
+        record = {k: str(v) for k, v in startup.items()
+                  if k not in ('logo_url', 'expiration_time', 'latitude', 'longitude', 'geohash', 'geohash_cell',
+                               'funding_amount_usd', 'funding_currency')}
+        raw.append(record)
+    dynamodb = env.aws.dynamodb
+
+    def run(i):
+        items = (startup_records.prepare(record, fields) for record in raw)
+        ddb_batch.batch_write_items(dynamodb, INGEST_TABLE, items, ['startup_id'])
+    return run, 5, dynamodb.Table(INGEST_TABLE).clear
+
+
+SCENARIOS = {
+    'matcher.all_investors': scenario_matcher_all,
+    'matcher.single_investor': scenario_matcher_single,
+    'matcher.single_investor_similarity': scenario_matcher_single_similarity,
+    'matcher.single_investor_proximity': scenario_matcher_single_proximity,
+    'api.get_startups': scenario_api_get_startups,
+    'api.get_startups_gzip': scenario_api_get_startups_gzip,
+    'api.export_startups': scenario_api_export_startups,
+    'api.get_startups_by_industry': scenario_api_get_startups_industry,
+    'api.get_startups_near': scenario_api_get_startups_near,
+    'api.get_startups_funding_range': scenario_api_get_startups_funding_range,
+    'api.get_startup': scenario_api_get_startup,
+    'api.batch_get_startups': scenario_api_batch_get_startups,
+    'api.similar_startups': scenario_api_similar_startups,
+    'api.trending_startups': scenario_api_trending_startups,
+    'similarity.top_k_100k': scenario_similarity_top_k,
+    'api.get_investor': scenario_api_get_investor,
+    'api.contact_startup': scenario_api_contact_startup,
+    'api.save_investor': scenario_api_save_investor,
+    'api.batch_save_investors': scenario_api_batch_save_investors,
+    'api.add_bookmark': scenario_api_add_bookmark,
+    'api.list_bookmarks': scenario_api_list_bookmarks,
+    'api.match_startups': scenario_api_match_startups,
+    'email.send_recommendations': scenario_send_email,
+    'batch.daily_recommendations': scenario_batch_processor,
+    'batch.daily_recommendations_repeat': scenario_batch_processor_repeat,
+    'batch.daily_recommendations_workflow': scenario_batch_processor_workflow,
+    'workflow.matcher_email': scenario_matcher_workflow,
+    'workflow.matcher_interactive': scenario_matcher_interactive,
+    'ingest.startups': scenario_ingest_startups,
+    'snapshot.similarity': scenario_snapshot_similarity,
+    'snapshot.affinity': scenario_snapshot_affinity,
+    'snapshot.trending': scenario_snapshot_trending,
+}
+
+
+def run_scenario(env, name, scale):
+    operation, iterations, reset = SCENARIOS[name](env, scale)
+    with quiet():
+        latencies, wall = time_operations(operation, iterations, reset=reset)
+        # Request counts come from a single clean pass so they are exact per op
+        if reset:
+            reset()
+        env.aws.reset_counters()
+        operation(iterations)
+        requests = env.aws.counters()
+        capacity = dict(env.aws.dynamodb.capacity)
+        peak = peak_memory(operation, reset=reset)
+    result = summarize(latencies, wall, iterations)
+    result['peak_memory_kb'] = round(peak / 1024.0, 1)
+    result['read_units'] = round(sum(v for k, v in capacity.items() if k.endswith('.RCU')), 1)
+    result['write_units'] = round(sum(v for k, v in capacity.items() if k.endswith('.WCU')), 1)
+    result['requests'] = dict(sorted(requests.items()))
+    return result
+
+
+# =========================================================================
+# Baseline comparison
+# =========================================================================
+
+def timing_regressions(name, current, previous, tolerance):
+    """Latency, throughput and memory changes beyond tolerance (machine noise applies)"""
+    regressions = []
+    metrics = ('p50_ms', 'p95_ms', 'p99_ms') if current['iterations'] >= TAIL_MIN_ITERATIONS else ('p50_ms',)
+    for metric in metrics:
+        before, after = previous.get(metric, 0), current[metric]
+        if after > before * (1 + tolerance) and after - before > NOISE_FLOOR_MS:
+            regressions.append(f"{name}: {metric} {before} -> {after}")
+    before, after = previous.get('throughput_ops', 0), current['throughput_ops']
+    if before and after < before * (1 - tolerance):
+        regressions.append(f"{name}: throughput_ops {before} -> {after}")
+    before, after = previous.get('peak_memory_kb', 0), current['peak_memory_kb']
+    if before and after > before * (1 + tolerance) and after - before > 64:
+        regressions.append(f"{name}: peak_memory_kb {before} -> {after}")
+    return regressions
+
+
+def count_regressions(name, current, previous):
+    """Request counts and capacity units, which must match exactly"""
+    regressions = []
+    # Each scenario runs on a freshly seeded environment, so these do not depend on run order
+    for metric in ('read_units', 'write_units'):
+        before, after = previous.get(metric), current[metric]
+        if before is not None and after != before:
+            regressions.append(f"{name}: {metric} {before} -> {after}")
+    previous_requests = previous.get('requests', {})
+    for operation in sorted(set(previous_requests) | set(current['requests'])):
+        before, after = previous_requests.get(operation, 0), current['requests'].get(operation, 0)
+        if after != before:
+            regressions.append(f"{name}: {operation} requests {before} -> {after}")
+    return regressions
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of human-readable regression messages"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous:
+            regressions += timing_regressions(name, current, previous, tolerance)
+            regressions += count_regressions(name, current, previous)
+    return regressions
+
+
+def best_of(first, second):
+    """Per-metric best of two runs of a scenario (counts are identical by construction)"""
+    best = dict(first)
+    for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'peak_memory_kb'):
+        best[metric] = min(first[metric], second[metric])
+    best['throughput_ops'] = max(first['throughput_ops'], second['throughput_ops'])
+    return best
+
+
+def fresh_run(name, args):
+    # A fresh environment per scenario: tables, buffers and caches never depend on what ran before
+    with quiet():
+        env = BenchmarkEnvironment(args.startups, args.investors, args.seed)
+    gc.collect()
+    return run_scenario(env, name, args.investors)
+
+
+def print_table(results):
+    header = (f"{'scenario':<32} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KB':>10} "
+              f"{'RCU':>8} {'WCU':>8}  requests")
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        requests = ', '.join(f"{k}={v}" for k, v in r['requests'].items())
+        print(f"{name:<32} {r['throughput_ops']:>10} {r['p50_ms']:>9} {r['p95_ms']:>9} "
+              f"{r['p99_ms']:>9} {r['peak_memory_kb']:>10} {r['read_units']:>8} {r['write_units']:>8}  {requests}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run offline Lambda benchmarks')
+    parser.add_argument('--startups', type=int, default=1000, help='catalogue size (1k - 1M)')
+    parser.add_argument('--investors', type=int, default=1000, help='investor count (1k - 1M)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scenarios', help='comma-separated subset of scenarios')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help='re-run scenarios with timing-only regressions up to this many times')
+    parser.add_argument('--output', help='write results JSON to this file')
+    args = parser.parse_args()
+
+    names = args.scenarios.split(',') if args.scenarios else list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}. Available: {', '.join(SCENARIOS)}")
+
+    config = {'startups': args.startups, 'investors': args.investors, 'seed': args.seed}
+    results = {}
+    for name in names:
+        print(f"▶ {name}")
+        results[name] = fresh_run(name, args)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('config') == config:
+            # Timings on a shared machine are noisy: a timing regression counts only if re-runs confirm it
+            for attempt in range(args.retries):
+                noisy = [name for name, result in results.items()
+                         if name in baseline['scenarios']
+                         and timing_regressions(name, result, baseline['scenarios'][name], args.tolerance)]
+                if not noisy:
+                    break
+                for name in noisy:
+                    print(f"↻ {name} (timing re-run {attempt + 1})")
+                    results[name] = best_of(results[name], fresh_run(name, args))
+
+    print()
+    print_table(results)
+    report = {'config': config, 'scenarios': results}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"\n✅ Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\n⚠️  No baseline found - run with --save-baseline to create one")
+        return 0
+
+    if baseline.get('config') != config:
+        print(f"\n⚠️  Baseline was recorded with {baseline.get('config')}, this run used {config}; "
+              f"skipping comparison")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) vs baseline:")
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+    print("\n✅ No regressions vs baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
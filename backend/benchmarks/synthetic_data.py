@@ -0,0 +1,275 @@
+"""
+Synthetic data generator for offline benchmarks.
+Purpose: Produce startups, investors and daily-recommendation preferences
+that follow the attribute shapes in dynamodb-schemas/*.json
+
+Everything is generated lazily and deterministically from a seed, so a
+1M-item catalogue never has to exist in memory twice.
+
+Usage:
+    python benchmarks/synthetic_data.py --startups 1000 --investors 1000 --out /tmp/data
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda-functions', 'shared'))
+# Coordinates and USD amounts are derived the way startup_records does at write time
+import funding  # noqa: E402
+import geo  # noqa: E402
+
+INDUSTRIES = [
+    'FinTech', 'HealthTech', 'AI', 'EdTech', 'CleanTech', 'E-commerce', 'SaaS',
+    'Cybersecurity', 'BioTech', 'AgriTech', 'PropTech', 'Mobility', 'Gaming',
+    'FoodTech', 'InsurTech', 'Logistics', 'Media', 'Robotics', 'SpaceTech', 'Web3',
+]
+
+FUNDING_STAGES = ['Pre-Seed', 'Seed', 'Series A', 'Series B', 'Series C', 'Growth']
+
+LOCATIONS = [
+    'Barcelona, Spain', 'Madrid, Spain', 'London, UK', 'Berlin, Germany', 'Paris, France',
+    'Stockholm, Sweden', 'Amsterdam, Netherlands', 'Lisbon, Portugal', 'Dublin, Ireland',
+    'San Francisco, USA', 'New York, USA', 'Austin, USA', 'Boston, USA', 'Toronto, Canada',
+    'Tel Aviv, Israel', 'Singapore', 'Bangalore, India', 'Sydney, Australia',
+    'Sao Paulo, Brazil', 'Mexico City, Mexico', 'Remote',
+]
+
+TEAM_SIZES = ['1-10', '11-50', '51-200', '201-500', '500+']
+
+_NAME_PREFIXES = ['Nova', 'Quantum', 'Blue', 'Bright', 'Hyper', 'Green', 'Smart', 'Open',
+                  'Deep', 'Swift', 'Peak', 'Clear', 'Atlas', 'Pixel', 'Vertex', 'Lumen']
+_NAME_SUFFIXES = ['Labs', 'AI', 'Health', 'Pay', 'Works', 'Flow', 'Stack', 'Grid',
+                  'Bio', 'Logic', 'Hub', 'Ware', 'Loop', 'Sense', 'Cloud', 'Forge']
+
+_WORDS = (
+    'platform helps companies automate manage scale secure analyze optimize connect '
+    'customers data payments patients students energy supply chain workflows insights '
+    'marketplace mobile cloud native real-time predictive open-source infrastructure '
+    'sustainable affordable personalized compliance fraud detection logistics carbon '
+    'network developers teams small businesses enterprises farmers clinics insurers'
+).split()
+
+
+def _funding_amount(rng, stage):
+    """Free-form funding strings like the ones in the live catalogue"""
+    if rng.random() < 0.08:
+        return 'N/A'
+    base = {
+        'Pre-Seed': 0.3, 'Seed': 1.5, 'Series A': 8, 'Series B': 25,
+        'Series C': 60, 'Growth': 150,
+    }[stage]
+    millions = round(base * rng.uniform(0.4, 2.0), 1)
+    currency = rng.choice(['$', '$', '$', '€', '£'])
+    if millions < 1:
+        return f'{currency}{int(millions * 1000)}K'
+    return f'{currency}{millions}M'
+
+
+def startup_id_for(index):
+    return f'startup-{index:07d}'
+
+
+def investor_id_for(index):
+    return f'investor-{index:07d}'
+
+
+def generate_startup(index, seed=42):
+    """Generate a single startup item (startups-table.json shape)"""
+    rng = random.Random(seed * 1_000_003 + index)
+    industry = rng.choice(INDUSTRIES)
+    stage = rng.choice(FUNDING_STAGES)
+    name = f"{rng.choice(_NAME_PREFIXES)}{rng.choice(_NAME_SUFFIXES)} {index}"
+    domain = name.lower().replace(' ', '-') + '.com'
+    words = ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(18, 60)))
+    item = {
+        'startup_id': startup_id_for(index),
+        'name': name,
+        'industry': industry,
+        'funding_stage': stage,
+        'description': f'{name} is a {industry} startup. Our {words}.',
+        'location': rng.choice(LOCATIONS),
+        'website': f'https://www.{domain}',
+        'funding_amount': _funding_amount(rng, stage),
+        'founded_year': Decimal(rng.randint(2008, 2025)),
+        'team_size': rng.choice(TEAM_SIZES),
+        'logo_url': f'https://logo.clearbit.com/{domain}',
+        'expiration_time': Decimal(int(time.time()) + 90 * 24 * 3600),
+    }
+    parsed = funding.parse_amount(item['funding_amount'])
+    if parsed:
+        item['funding_amount_usd'], item['funding_currency'] = parsed
+    located = geo.locate(item['location'])
+    if located:
+        # Spread around the city centre (separate stream, so the other fields keep their values)
+        spread = random.Random(seed * 4_000_037 + index)
+        item.update(geo.location_fields(located['latitude'] + spread.uniform(-0.2, 0.2),
+                                        located['longitude'] + spread.uniform(-0.3, 0.3)))
+    return item
+
+
+def generate_investor(index, seed=42):
+    """Generate a single investor item (investors-table.json shape)"""
+    rng = random.Random(seed * 2_000_003 + index)
+    investor_id = investor_id_for(index)
+    roll = rng.random()
+    # Mirror the real profile mix: most set both preferences, a few set one or none
+    industries = rng.sample(INDUSTRIES, rng.randint(1, 4)) if roll > 0.05 else []
+    stages = rng.sample(FUNDING_STAGES, rng.randint(1, 3)) if roll > 0.15 or not industries else []
+    if roll < 0.02:
+        industries, stages = [], []
+    hour = rng.randint(0, 23)
+    # Sorted, since the API rejects a minimum above the maximum
+    min_investment, max_investment = sorted((rng.choice([0, 50_000, 250_000, 1_000_000]),
+                                             rng.choice([500_000, 2_000_000, 10_000_000, 10_000_000_000])))
+    bookmarks = {startup_id_for(rng.randint(0, 999)) for _ in range(rng.randint(0, 5))}
+    item = {
+        'investor_id': investor_id,
+        'email': f'{investor_id}@example.com',
+        'name': f'Investor {index}',
+        'preferred_industries': industries,
+        'preferred_funding_stages': stages,
+        'min_investment': Decimal(min_investment),
+        'max_investment': Decimal(max_investment),
+        'daily_recommendations': rng.random() < 0.6,
+        'preferred_time': f'{hour:02d}:00',
+        'created_at': '2025-01-01T00:00:00Z',
+        'updated_at': '2025-01-01T00:00:00Z',
+    }
+    # DynamoDB rejects empty string sets, so the attribute is omitted instead
+    if bookmarks:
+        item['bookmarks'] = bookmarks
+    # Drawn last so the fields above stay the same for a given seed
+    item['location'] = rng.choice(LOCATIONS)
+    located = geo.locate(item['location'])
+    if located:
+        fields = geo.location_fields(located['latitude'], located['longitude'])
+        item['latitude'], item['longitude'] = fields['latitude'], fields['longitude']
+    return item
+
+
+def generate_preference(investor):
+    """Derive the investor-preferences row the batch processor reads"""
+    return {
+        'investor_id': investor['investor_id'],
+        'email': investor['email'],
+        'daily_recommendations': investor['daily_recommendations'],
+        'preferred_time': investor['preferred_time'],
+    }
+
+
+def generate_events(investor, startup_count, seed=42):
+    """Bookmark/contact events (events-table.json shape) consistent with the investor's bookmarks"""
+    index = int(investor['investor_id'].split('-')[1])
+    rng = random.Random(seed * 3_000_017 + index)
+    started = 1_750_000_000_000 + index * 1000
+    targets = [('bookmark', sid) for sid in sorted(investor.get('bookmarks', ()))]
+    # Contacts cluster around the bookmarks' neighbourhood so co-occurrence is not uniform noise
+    for _ in range(rng.randint(0, 3)):
+        anchor = int(rng.choice(targets)[1].split('-')[1]) if targets else rng.randrange(startup_count)
+        targets.append(('contact', startup_id_for((anchor + rng.randint(1, 20)) % startup_count)))
+    events = []
+    for offset, (event_type, startup_id) in enumerate(targets):
+        millis = started + offset * 60_000
+        events.append({
+            'investor_id': investor['investor_id'],
+            'event_key': f'{millis:013d}#{rng.getrandbits(32):08x}',
+            'event_type': event_type,
+            'startup_id': startup_id,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(millis / 1000)),
+            'expiration_time': Decimal(int(time.time()) + 180 * 24 * 3600),
+        })
+    return events
+
+
+def generate_counters(startup_index, seed=42, now=None, window_seconds=3600, shards=8):
+    """
+    Sharded view/contact counter items (startup-counters-table.json shape)
+    for one startup over the last three days. Popularity falls off with the
+    startup index, so the leaderboard has a clear head and a long tail.
+    """
+    rng = random.Random(seed * 5_000_011 + startup_index)
+    now = time.time() if now is None else now
+    current = int(now) // window_seconds * window_seconds
+    popularity = 200.0 / (1 + startup_index % 997) ** 0.8
+    startup_id = startup_id_for(startup_index)
+    items = []
+    for window in sorted(rng.sample(range(72), rng.randint(0, 6))):
+        window_start = current - window * window_seconds
+        views = int(popularity * rng.uniform(0.2, 2.0))
+        if not views:
+            continue
+        # Hot startups spread over more shards, as random shard choice does under load
+        used = rng.sample(range(shards), min(shards, 1 + views // 20))
+        for position, shard in enumerate(used):
+            share = views // len(used) + (1 if position < views % len(used) else 0)
+            items.append({
+                'counter_id': f'{startup_id}#{shard:02d}',
+                'window_start': Decimal(window_start),
+                'startup_id': startup_id,
+                'views': Decimal(share),
+                'contacts': Decimal(sum(1 for _ in range(share) if rng.random() < 0.05)),
+                'expiration_time': Decimal(window_start + 8 * 24 * 3600),
+            })
+    return items
+
+
+def iter_counters(startup_count, seed=42, now=None):
+    for index in range(startup_count):
+        yield from generate_counters(index, seed, now)
+
+
+def iter_startups(count, seed=42):
+    for index in range(count):
+        yield generate_startup(index, seed)
+
+
+def iter_investors(count, seed=42):
+    for index in range(count):
+        yield generate_investor(index, seed)
+
+
+def iter_events(investor_count, startup_count, seed=42):
+    for investor in iter_investors(investor_count, seed):
+        yield from generate_events(investor, startup_count, seed)
+
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, set):
+        return sorted(obj)
+    raise TypeError
+
+
+def write_jsonl(path, items):
+    count = 0
+    with open(path, 'w') as f:
+        for item in items:
+            f.write(json.dumps(item, default=_json_default) + '\n')
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic startups/investors as JSONL')
+    parser.add_argument('--startups', type=int, default=1000)
+    parser.add_argument('--investors', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='.')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    started = time.perf_counter()
+    startups = write_jsonl(os.path.join(args.out, 'startups.jsonl'), iter_startups(args.startups, args.seed))
+    investors = write_jsonl(os.path.join(args.out, 'investors.jsonl'), iter_investors(args.investors, args.seed))
+    print(f"✅ Wrote {startups} startups and {investors} investors to {args.out} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Matcher workflow trace.
+Purpose: Run step-functions/startup-matcher-workflow.json (or, with
+--express, the interactive startup-matcher-express.json) locally
+(local_workflow.py) against the in-process matcher and email handlers and
+report per-state timings, retries and end-to-end latency
+
+"wall" is time actually spent in the handlers and interpreter. "duration"
+adds the virtual time the workflow would have spent waiting in AWS: Retry
+backoff, Wait states and --transition-ms per state transition. --fail
+State=N makes the first N attempts of a Task fail with
+Lambda.ServiceException in every execution to profile its Retry/Catch path.
+
+Usage:
+    python benchmarks/workflow_trace.py
+    python benchmarks/workflow_trace.py --executions 50 --transition-ms 25 --trace
+    python benchmarks/workflow_trace.py --fail MatchStartups=2 --json
+    python benchmarks/workflow_trace.py --express --trace
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from harness import (BACKEND_DIR, INVESTORS_TABLE, PREFERENCES_TABLE, STARTUPS_TABLE, load_handler, percentile,
+                     quiet)
+from local_aws import LocalAWS, LocalSES
+from local_workflow import StateMachine, inject_failures, lambda_resource, load_definition
+from synthetic_data import investor_id_for, iter_investors, iter_startups
+
+DEFINITION_FILE = os.path.join(BACKEND_DIR, 'step-functions', 'startup-matcher-workflow.json')
+EXPRESS_DEFINITION_FILE = os.path.join(BACKEND_DIR, 'step-functions', 'startup-matcher-express.json')
+
+# ARNs substituted for the definition's placeholders (deploy-stepfunctions.sh fills in the real ones)
+LAMBDA_ARN_PREFIX = 'arn:aws:lambda:eu-north-1:000000000000:function:startup-investor-platform-dev-'
+FUNCTIONS = {
+    'MatchStartupsLambdaArn': 'dev-startup-matcher',
+    'SendEmailLambdaArn': 'send-email-notif',
+}
+
+
+def build_machine(handlers, transition_ms=0.0, real_waits=False, failures=None, definition_file=DEFINITION_FILE):
+    """
+    StateMachine for the matcher workflow. handlers maps Lambda directory
+    names to lambda_handler callables; failures maps state names to the
+    number of injected failures per execution (reset via machine.injected).
+    """
+    substitutions = {placeholder: LAMBDA_ARN_PREFIX + function for placeholder, function in FUNCTIONS.items()}
+    definition = load_definition(definition_file, substitutions)
+    resources = {LAMBDA_ARN_PREFIX + function: lambda_resource(handlers[function]) for function in FUNCTIONS.values()}
+
+    injected = []
+    for state_name, count in (failures or {}).items():
+        state = definition['States'].get(state_name)
+        if state is None or state['Type'] != 'Task':
+            raise SystemExit(f"--fail: {state_name} is not a Task state in {definition_file}")
+        wrapped = inject_failures(resources[state['Resource']], count)
+        resources[state['Resource']] = wrapped
+        injected.append(wrapped)
+
+    machine = StateMachine(definition, resources, transition_ms=transition_ms, real_waits=real_waits)
+    machine.injected = injected
+    return machine
+
+
+def parse_failures(values):
+    failures = {}
+    for value in values or []:
+        state_name, _, count = value.partition('=')
+        failures[state_name] = int(count or 1)
+    return failures
+
+
+def state_report(executions):
+    """Per-state visits, timing percentiles, attempts, retry wait and catches over all executions"""
+    by_state = {}
+    for execution in executions:
+        for entry in execution.trace:
+            stats = by_state.setdefault(entry['state'], {'type': entry['type'], 'wall': [], 'duration': [],
+                                                         'attempts': 0, 'retry_wait_ms': 0.0, 'errors': 0,
+                                                         'caught': 0})
+            stats['wall'].append(entry['wall_ms'])
+            stats['duration'].append(entry['duration_ms'])
+            stats['attempts'] += entry['attempts']
+            stats['retry_wait_ms'] += entry['retry_wait_ms']
+            stats['errors'] += 1 if entry['error'] else 0
+            stats['caught'] += 1 if entry.get('caught') else 0
+
+    report = {}
+    for name, stats in by_state.items():
+        wall, duration = sorted(stats['wall']), sorted(stats['duration'])
+        report[name] = {
+            'type': stats['type'],
+            'visits': len(wall),
+            'wall_p50_ms': round(percentile(wall, 50), 3),
+            'wall_p95_ms': round(percentile(wall, 95), 3),
+            'duration_p50_ms': round(percentile(duration, 50), 3),
+            'duration_p95_ms': round(percentile(duration, 95), 3),
+            'attempts': stats['attempts'],
+            'retry_wait_ms': round(stats['retry_wait_ms'], 3),
+            'errors': stats['errors'],
+            'caught': stats['caught'],
+        }
+    return report
+
+
+def print_timeline(execution):
+    print(f"\nTrace of {execution.name} ({execution.status}):")
+    print(f"{'start ms':>10} {'state':<20} {'type':<7} {'attempts':>8} {'wall ms':>9} {'duration ms':>12}  outcome")
+    for entry in execution.summary()['trace']:
+        outcome = ''
+        if entry.get('retried_errors'):
+            outcome = f"retried {', '.join(entry['retried_errors'])}; "
+        if entry['error']:
+            outcome += f"{entry['error']}" + (f" -> {entry['caught']}" if entry.get('caught') else '')
+        print(f"{entry['start_ms']:>10.1f} {entry['state']:<20} {entry['type']:<7} {entry['attempts']:>8} "
+              f"{entry['wall_ms']:>9.2f} {entry['duration_ms']:>12.2f}  {outcome}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--executions', type=int, default=20)
+    parser.add_argument('--startups', type=int, default=1000)
+    parser.add_argument('--investors', type=int, default=200)
+    parser.add_argument('--transition-ms', type=float, default=0.0,
+                        help='virtual latency added per state transition')
+    parser.add_argument('--real-waits', action='store_true', help='sleep through retry backoff and Wait states')
+    parser.add_argument('--fail', action='append', metavar='STATE=N',
+                        help='fail the first N attempts of a Task state per execution (repeatable)')
+    parser.add_argument('--express', action='store_true',
+                        help='run the interactive Express definition (match list passed by S3 key)')
+    parser.add_argument('--trace', action='store_true', help='print the timeline of the first execution')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    aws = LocalAWS(ses=LocalSES(keep_messages=False))
+    db = aws.dynamodb
+    db.create_table_from_schema('startups-table.json', STARTUPS_TABLE).load(iter_startups(args.startups, args.seed))
+    db.create_table_from_schema('investors-table.json', INVESTORS_TABLE).load(iter_investors(args.investors, args.seed))
+    db.create_table(PREFERENCES_TABLE, 'investor_id')
+    handlers = {function: load_handler(function, aws).lambda_handler for function in FUNCTIONS.values()}
+    definition_file = EXPRESS_DEFINITION_FILE if args.express else DEFINITION_FILE
+    machine = build_machine(handlers, args.transition_ms, args.real_waits, parse_failures(args.fail), definition_file)
+
+    executions = []
+    with quiet():
+        for i in range(args.executions):
+            for injected in machine.injected:
+                injected.reset()
+            investor_id = investor_id_for(i % args.investors)
+            # Same input shape as dev-trigger-workflow
+            executions.append(machine.run({'investor_id': investor_id, 'email': f'{investor_id}@example.com'},
+                                          name=f'trace-{i}'))
+
+    wall = sorted(execution.wall_ms for execution in executions)
+    duration = sorted(execution.duration_ms for execution in executions)
+    statuses = {}
+    for execution in executions:
+        statuses[execution.status] = statuses.get(execution.status, 0) + 1
+    report = {
+        'executions': len(executions),
+        'statuses': statuses,
+        'wall_p50_ms': round(percentile(wall, 50), 3),
+        'wall_p95_ms': round(percentile(wall, 95), 3),
+        'duration_p50_ms': round(percentile(duration, 50), 3),
+        'duration_p95_ms': round(percentile(duration, 95), 3),
+        'states': state_report(executions),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"Matcher workflow ({os.path.basename(definition_file)}): {report['executions']} executions, {args.startups} startups, "
+          f"transition {args.transition_ms:g} ms\n")
+    print(f"{'state':<20} {'visits':>6} {'wall p50':>9} {'wall p95':>9} {'dur p50':>10} {'dur p95':>10} "
+          f"{'attempts':>8} {'retry wait ms':>14} {'errors':>6} {'caught':>6}")
+    print('-' * 108)
+    for name, stats in report['states'].items():
+        print(f"{name:<20} {stats['visits']:>6} {stats['wall_p50_ms']:>9.2f} {stats['wall_p95_ms']:>9.2f} "
+              f"{stats['duration_p50_ms']:>10.1f} {stats['duration_p95_ms']:>10.1f} {stats['attempts']:>8} "
+              f"{stats['retry_wait_ms']:>14.0f} {stats['errors']:>6} {stats['caught']:>6}")
+    print(f"\nEnd to end: wall p50 {report['wall_p50_ms']:.2f} ms, p95 {report['wall_p95_ms']:.2f} ms; "
+          f"with waits p50 {report['duration_p50_ms']:.1f} ms, p95 {report['duration_p95_ms']:.1f} ms")
+    print(f"Statuses: {', '.join(f'{status} {count}' for status, count in statuses.items())}")
+    if args.trace and executions:
+        print_timeline(executions[0])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
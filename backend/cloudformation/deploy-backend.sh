@@ -1,8 +1,10 @@
 #!/bin/bash
 
 # Deployment script for backend infrastructure
-# Usage: ./deploy-backend.sh [action]
+# Usage: ./deploy-backend.sh [action] [Key=Value ...]
 # Actions: create, update, delete, status, outputs
+# Key=Value pairs override template parameters on create/update, e.g.
+#   ./deploy-backend.sh update EnableFundingAmountIndex=false
 
 set -e
 
@@ -17,6 +19,16 @@ RED='\033[0;31m'
 NC='\033[0m'
 
 ACTION=${1:-status}
+shift || true
+
+# Template parameter overrides (Key=Value -> ParameterKey=Key,ParameterValue=Value)
+PARAMETER_ARGS=()
+if [ $# -gt 0 ]; then
+    PARAMETER_ARGS=(--parameters)
+    for pair in "$@"; do
+        PARAMETER_ARGS+=("ParameterKey=${pair%%=*},ParameterValue=${pair#*=}")
+    done
+fi
 
 check_stack_exists() {
     aws cloudformation describe-stacks \
@@ -38,6 +50,7 @@ create_stack() {
         --stack-name "$STACK_NAME" \
         --template-body file://"$TEMPLATE_FILE" \
         --capabilities CAPABILITY_IAM \
+        "${PARAMETER_ARGS[@]}" \
         --region "$REGION" \
         --no-cli-pager
     
@@ -65,6 +78,7 @@ update_stack() {
         --stack-name "$STACK_NAME" \
         --template-body file://"$TEMPLATE_FILE" \
         --capabilities CAPABILITY_IAM \
+        "${PARAMETER_ARGS[@]}" \
         --region "$REGION" \
         --no-cli-pager
     
@@ -155,7 +169,7 @@ case "$ACTION" in
     *)
         echo -e "${RED}❌ Unknown action: $ACTION${NC}"
         echo ""
-        echo "Usage: $0 [action]"
+        echo "Usage: $0 [action] [Key=Value ...]"
         echo ""
         echo "Actions:"
         echo "  create   - Create new stack"
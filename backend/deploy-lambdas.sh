@@ -23,6 +23,7 @@ declare -A LAMBDA_FUNCTIONS=(
     ["send-email-notif"]="startup-investor-platform-${ENVIRONMENT}-send-email-notif"
     ["trigger-workflow"]="startup-investor-platform-${ENVIRONMENT}-trigger-workflow"
     ["batch-processor"]="startup-investor-platform-${ENVIRONMENT}-batch-processor"
+    ["snapshot-builder"]="startup-investor-platform-${ENVIRONMENT}-snapshot-builder"
 )
 
 # Check if AWS CLI is installed
@@ -69,6 +70,9 @@ deploy_function() {
     zip_file="${function_name}-deployment.zip"
     zip -r "$zip_file" . -x "*.git*" "*.pyc" "__pycache__/*" "*.zip" "*.md" "README*" > /dev/null 2>&1
     
+    # Bundle the shared modules (aws_clients, ...) at the package root
+    (cd ../shared && zip -r "../${function_dir}/${zip_file}" . -x "*.pyc" "__pycache__/*" "*.md" > /dev/null 2>&1)
+    
     if [ ! -f "$zip_file" ]; then
         echo -e "${RED}❌ Failed to create deployment package${NC}"
         cd ../..
@@ -1,45 +1,146 @@
+import base64
+import heapq
 import json
 import os
-import boto3
-from boto3.dynamodb.conditions import Key
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 
-dynamodb = boto3.resource('dynamodb')
+# Shared modules are bundled next to index.py at deploy time; fall back to the source tree locally
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import aws_clients
+import capacity
+import catalogue
+import compression
+import counters
+import ddb_batch
+import events
+import funding
+import geo
+import profiling
+import recommendations
+import seen_set
+import similarity
+import trending
+
+# API traffic is accounted per endpoint but never paced (see capacity.py)
+dynamodb = capacity.tracked(aws_clients.lazy_resource('dynamodb'), capacity.INTERACTIVE)
+lambda_client = aws_clients.lazy_client('lambda')
 STARTUPS_TABLE = os.environ['STARTUPS_TABLE']
 INVESTORS_TABLE = os.environ.get('INVESTORS_TABLE', 'startup-investor-platform-dev-investors')
 
+# Startup summaries reused across invocations in this container
+startup_catalogue = catalogue.Catalogue(dynamodb, STARTUPS_TABLE)
+
+# Bookmark/contact events, written in batches across invocations
+event_buffer = events.EventBuffer(dynamodb, events.EVENTS_TABLE)
+
+# View/contact counters for the trending leaderboard, written in batches across invocations
+counter_buffer = counters.CounterBuffer(dynamodb, counters.COUNTERS_TABLE)
+
+BOOKMARKS_PAGE_SIZE = 25
+MAX_BOOKMARKS_PAGE_SIZE = 100
+
+# Default radius for GET /startups?near=... (capped at geo.MAX_RADIUS_KM)
+NEAR_RADIUS_KM = 50.0
+
+SIMILAR_PAGE_SIZE = 10
+MAX_SIMILAR_PAGE_SIZE = 50
+
+TRENDING_PAGE_SIZE = 20
+
+# POST /startups/batch-get and /investors/batch: items per request, retries of unprocessed keys
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', '100'))
+BATCH_MAX_RETRIES = int(os.environ.get('BATCH_MAX_RETRIES', '4'))
+# Concurrent UpdateItem calls for existing profiles in one batch save
+BATCH_UPDATE_WORKERS = 8
+
+# GET /startups/export: encoded body size per response (Lambda's limit is 6 MB after base64),
+# time budget per response, and scan page size
+EXPORT_MAX_BYTES = int(os.environ.get('EXPORT_MAX_BYTES', '4000000'))
+EXPORT_MAX_SECONDS = float(os.environ.get('EXPORT_MAX_SECONDS', '20'))
+EXPORT_SCAN_PAGE_SIZE = 1000
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization,X-Profile',
+    'Access-Control-Allow-Methods': 'GET,POST,DELETE,OPTIONS'
+}
+
+# Attributes kept on the investor item for the matcher only
+INTERNAL_ATTRIBUTES = (seen_set.SEEN_ATTRIBUTE,)
+
 def decimal_default(obj):
     if isinstance(obj, Decimal):
         return float(obj)
+    if isinstance(obj, set):
+        return sorted(obj)
     raise TypeError
 
 def cors_response(status_code, body):
     return {
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-            'Access-Control-Allow-Methods': 'GET,POST,OPTIONS'
-        },
-        'body': json.dumps(body, default=decimal_default)
+        'headers': {'Content-Type': 'application/json', **CORS_HEADERS},
+        'body': json.dumps(body, default=decimal_default, separators=(',', ':'))
     }
 
+def error_code(error):
+    """botocore ClientError code (without importing botocore on the hot path)"""
+    return getattr(error, 'response', {}).get('Error', {}).get('Code')
+
+def is_type_mismatch(error):
+    """ValidationException raised when ADD/DELETE meets an attribute of another type (e.g. a legacy list)"""
+    message = getattr(error, 'response', {}).get('Error', {}).get('Message', '')
+    return error_code(error) == 'ValidationException' and 'incorrect data type' in message
+
+def non_empty_string(value):
+    return isinstance(value, str) and value.strip() != ''
+
+@profiling.profiled('api-handler')
+@capacity.metered('api-handler')
 def lambda_handler(event, context):
+    response = route(event)
+    # Bodies above compression.COMPRESS_MIN_BYTES go out gzip/brotli-compressed when the client accepts it
+    with profiling.stage('compress'):
+        return compression.compress_response(response, event.get('headers'))
+
+def route(event):
     http_method = event.get('httpMethod', 'GET')
     path = event.get('path', '')
     resource = event.get('resource', '')
     
     print(f"Method: {http_method}, Path: {path}, Resource: {resource}")
+    # Consumed capacity is attributed to the route template, not the concrete path
+    capacity.set_caller(f'{http_method} {resource or path}')
     
     try:
+        # Bodies arrive base64-encoded when their Content-Type is in the API's binaryMediaTypes
+        try:
+            compression.decode_request_body(event)
+        except ValueError:
+            return cors_response(400, {'error': 'Request body is not valid base64-encoded UTF-8'})
+        
         # Startups endpoints
         if http_method == 'GET' and '/startups' in path:
-            if '{id}' in resource:
+            if resource == '/startups/export':
+                return export_startups(event)
+            elif resource == '/startups/trending':
+                return get_trending_startups(event)
+            elif resource == '/startups/{id}/similar':
+                return get_similar_startups(event)
+            elif '{id}' in resource:
                 return get_startup(event)
             else:
                 return get_startups(event)
         
+        # Batch endpoints (dashboard pages)
+        elif http_method == 'POST' and resource == '/startups/batch-get':
+            return batch_get_startups(event)
+        
+        elif http_method == 'POST' and resource == '/investors/batch':
+            return batch_investors(event)
+        
         elif http_method == 'POST' and 'contact' in path:
             return contact_startup(event)
         
@@ -50,6 +151,16 @@ def lambda_handler(event, context):
         elif http_method == 'GET' and '/investors/{id}' in resource:
             return get_investor(event)
         
+        # Bookmark endpoints
+        elif http_method == 'POST' and resource == '/bookmarks':
+            return add_bookmark(event)
+        
+        elif http_method == 'GET' and resource == '/bookmarks/{userId}':
+            return get_bookmarks(event)
+        
+        elif http_method == 'DELETE' and resource == '/bookmarks/{userId}/{startupId}':
+            return remove_bookmark(event)
+        
         # Trigger matching endpoint
         elif http_method == 'POST' and (resource == '/trigger-matching' or resource == '/match-startups' or '/match-startups' in path):
             return trigger_matching(event)
@@ -60,13 +171,31 @@ def lambda_handler(event, context):
     except Exception as e:
         print(f"Error: {str(e)}")
         return cors_response(500, {'error': str(e)})
+    
+    finally:
+        with capacity.caller('events.flush'), profiling.stage('events.flush'):
+            event_buffer.flush_if_due()
+        with capacity.caller('counters.flush'), profiling.stage('counters.flush'):
+            counter_buffer.flush_if_due()
 
 def get_startups(event):
+    from boto3.dynamodb.conditions import Key
+
     table = dynamodb.Table(STARTUPS_TABLE)
     params = event.get('queryStringParameters') or {}
     industry = params.get('industry')
     limit = int(params.get('limit', 25))
     
+    try:
+        amount_range = investment_range(params)
+    except ValueError as e:
+        return cors_response(400, {'error': str(e)})
+    
+    if params.get('near'):
+        return get_startups_near(table, params, industry, limit, amount_range)
+    if amount_range:
+        return get_startups_in_range(table, params, industry, limit, amount_range)
+    
     try:
         if industry:
             response = table.query(
@@ -86,6 +215,197 @@ def get_startups(event):
     except Exception as e:
         return cors_response(500, {'error': str(e)})
 
+def investment_range(params):
+    """
+    (low, high) USD Decimals from min_investment=/max_investment= ('500K',
+    '2.5M', '€1M' or plain numbers; high is None when open-ended), or None
+    when neither is given
+    """
+    if not params.get('min_investment') and not params.get('max_investment'):
+        return None
+    bounds = []
+    for name in ('min_investment', 'max_investment'):
+        parsed = funding.parse_amount(params[name]) if params.get(name) else None
+        if params.get(name) and parsed is None:
+            raise ValueError(f'{name} must be an amount like 500000, 500K or $2.5M')
+        bounds.append(parsed[0] if parsed else None)
+    low, high = bounds[0] or Decimal(0), bounds[1]
+    if high is not None and low > high:
+        raise ValueError('min_investment must not be greater than max_investment')
+    return low, high
+
+def amount_condition(condition, amount_range):
+    """condition on funding_amount_usd (Key or Attr) for an investment range"""
+    low, high = amount_range
+    attribute = condition('funding_amount_usd')
+    return attribute.gte(low) if high is None else attribute.between(low, high)
+
+def export_startups(event):
+    """
+    GET /startups/export - the whole catalogue as NDJSON, one startup per
+    line, written straight into a gzip stream when the client accepts gzip.
+    A response stops before EXPORT_MAX_BYTES or EXPORT_MAX_SECONDS and then
+    carries X-Next-Cursor; the client repeats the request with ?cursor= until
+    it is absent. ?segment=&total_segments= split the scan for parallel clients.
+    """
+    table = dynamodb.Table(STARTUPS_TABLE)
+    params = event.get('queryStringParameters') or {}
+    scan_params = {'Limit': EXPORT_SCAN_PAGE_SIZE}
+    try:
+        if params.get('cursor'):
+            scan_params['ExclusiveStartKey'] = {'startup_id': decode_cursor(params['cursor'])}
+        if params.get('total_segments'):
+            total_segments, segment = int(params['total_segments']), int(params.get('segment', 0))
+            if not 0 <= segment < total_segments:
+                raise ValueError('segment out of range')
+            scan_params.update(Segment=segment, TotalSegments=total_segments)
+    except (ValueError, UnicodeDecodeError):
+        return cors_response(400, {'error': 'Invalid cursor or segment'})
+    
+    request_headers = event.get('headers')
+    gzipped = (compression.binary_accepted(request_headers) and
+               compression.negotiate(compression.header(request_headers, 'accept-encoding'), ('gzip',)) == 'gzip')
+    writer = compression.GzipWriter(enabled=gzipped)
+    limit = EXPORT_MAX_BYTES - (compression.PENDING_BYTES if gzipped else 0)
+    deadline = time.monotonic() + EXPORT_MAX_SECONDS
+    count, last_id, next_id = 0, None, None
+    
+    try:
+        while next_id is None:
+            response = table.scan(**scan_params)
+            for item in response.get('Items', []):
+                line = (json.dumps(item, default=decimal_default, separators=(',', ':')) + '\n').encode('utf-8')
+                if count and writer.size() + len(line) > limit:
+                    next_id = last_id
+                    break
+                writer.write(line)
+                count += 1
+                last_id = item['startup_id']
+            if next_id is not None or 'LastEvaluatedKey' not in response:
+                break
+            scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            if time.monotonic() > deadline:
+                next_id = response['LastEvaluatedKey']['startup_id']
+    except Exception as e:
+        return cors_response(500, {'error': str(e)})
+    
+    body = writer.close()
+    print(f"Exported {count} startups: {writer.raw_bytes} bytes NDJSON, {len(body)} bytes sent"
+          f"{' (gzip)' if gzipped else ''}{', more to come' if next_id else ''}")
+    headers = {
+        'Content-Type': 'application/x-ndjson',
+        **CORS_HEADERS,
+        'Access-Control-Expose-Headers': 'X-Next-Cursor,X-Item-Count',
+        'X-Item-Count': str(count)
+    }
+    if next_id is not None:
+        headers['X-Next-Cursor'] = encode_cursor(next_id)
+    if gzipped:
+        headers['Content-Encoding'] = 'gzip'
+        return {'statusCode': 200, 'headers': headers, 'isBase64Encoded': True,
+                'body': base64.b64encode(body).decode('ascii')}
+    return {'statusCode': 200, 'headers': headers, 'body': body.decode('utf-8')}
+
+def get_startups_in_range(table, params, industry, limit, amount_range):
+    """
+    min_investment=/max_investment=: startups whose funding_amount_usd is in
+    range, smallest first. One FundingAmountIndex BETWEEN query per funding
+    stage (funding_stage= narrows it to one), merged by amount; startups
+    without a parsed amount are not returned.
+    """
+    from boto3.dynamodb.conditions import Attr, Key
+    
+    low, high = amount_range
+    stages = [params['funding_stage']] if params.get('funding_stage') else funding.FUNDING_STAGES
+    per_stage = []
+    try:
+        for stage in stages:
+            query = {
+                'IndexName': 'FundingAmountIndex',
+                'KeyConditionExpression': Key('funding_stage').eq(stage) & amount_condition(Key, amount_range)
+            }
+            if industry:
+                query['FilterExpression'] = Attr('industry').eq(industry)
+            else:
+                # Unfiltered pages are all hits; filtered ones read on in 1 MB pages
+                query['Limit'] = limit
+            found = []
+            # Only the smallest `limit` of each stage can make the merged page
+            while len(found) < limit:
+                response = table.query(**query)
+                found.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            per_stage.append(found[:limit])
+    except Exception as e:
+        return cors_response(500, {'error': str(e)})
+    
+    startups = list(heapq.merge(*per_stage, key=lambda startup: startup['funding_amount_usd']))[:limit]
+    return cors_response(200, {
+        'startups': startups,
+        'count': len(startups),
+        'min_investment': low,
+        'max_investment': high
+    })
+
+def get_startups_near(table, params, industry, limit, amount_range=None):
+    """
+    near= (place name or 'lat,lon') and radius_km=: the nearest startups
+    first, with distance_km. Only the GeohashIndex cells covering the circle
+    are queried; startups without a resolved location are never returned.
+    An investment range is applied as a filter on funding_amount_usd.
+    """
+    from boto3.dynamodb.conditions import Attr, Key
+    
+    center = geo.locate(params['near'])
+    if center is None:
+        return cors_response(400, {'error': f"Unknown location: {params['near']}"})
+    try:
+        radius_km = float(params.get('radius_km', NEAR_RADIUS_KM))
+    except ValueError:
+        return cors_response(400, {'error': 'radius_km must be a number'})
+    if not 0 < radius_km <= geo.MAX_RADIUS_KM:
+        return cors_response(400, {'error': f'radius_km must be between 0 and {geo.MAX_RADIUS_KM:g}'})
+    
+    latitude, longitude = center['latitude'], center['longitude']
+    found = []
+    try:
+        for prefix in geo.query_prefixes(latitude, longitude, radius_km):
+            condition = Key('geohash_cell').eq(prefix[:geo.CELL_PRECISION])
+            if len(prefix) > geo.CELL_PRECISION:
+                condition = condition & Key('geohash').begins_with(prefix)
+            query = {'IndexName': 'GeohashIndex', 'KeyConditionExpression': condition}
+            filters = []
+            if industry:
+                filters.append(Attr('industry').eq(industry))
+            if amount_range:
+                filters.append(amount_condition(Attr, amount_range))
+            if filters:
+                query['FilterExpression'] = filters[0] if len(filters) == 1 else filters[0] & filters[1]
+            while True:
+                response = table.query(**query)
+                for startup in response.get('Items', []):
+                    distance = geo.distance_km(latitude, longitude,
+                                               float(startup['latitude']), float(startup['longitude']))
+                    if distance <= radius_km:
+                        found.append((distance, startup))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    except Exception as e:
+        return cors_response(500, {'error': str(e)})
+    
+    found.sort(key=lambda pair: pair[0])
+    startups = [dict(startup, distance_km=round(distance, 1)) for distance, startup in found[:limit]]
+    return cors_response(200, {
+        'startups': startups,
+        'count': len(startups),
+        'total_in_radius': len(found),
+        'near': center['label'],
+        'radius_km': radius_km
+    })
+
 def get_startup(event):
     table = dynamodb.Table(STARTUPS_TABLE)
     startup_id = event['pathParameters']['id']
@@ -96,11 +416,78 @@ def get_startup(event):
         if 'Item' not in response:
             return cors_response(404, {'error': 'Startup not found'})
         
+        counter_buffer.record(startup_id, counters.VIEWS)
         return cors_response(200, response['Item'])
     
     except Exception as e:
         return cors_response(500, {'error': str(e)})
 
+def get_similar_startups(event):
+    """Startups with the most similar descriptions, from the precomputed similarity snapshot"""
+    startup_id = event['pathParameters']['id']
+    params = event.get('queryStringParameters') or {}
+    try:
+        limit = min(max(int(params.get('limit', SIMILAR_PAGE_SIZE)), 1), MAX_SIMILAR_PAGE_SIZE)
+    except ValueError:
+        return cors_response(400, {'error': 'limit must be an integer'})
+    
+    index = similarity.current_index()
+    if index is None:
+        return cors_response(503, {'error': 'Similarity index not available yet'})
+    
+    if startup_id in index.row:
+        vector = index.vectors[index.row[startup_id]]
+    else:
+        # Added since the last snapshot build: embed its description on the fly
+        response = dynamodb.Table(STARTUPS_TABLE).get_item(
+            Key={'startup_id': startup_id},
+            ProjectionExpression='startup_id, description, industry'
+        )
+        if 'Item' not in response:
+            return cors_response(404, {'error': 'Startup not found'})
+        vector = index.vector_for(response['Item'])
+    
+    ranked = index.top_k(vector, limit, exclude={startup_id})
+    summaries = startup_catalogue.get_many([sid for sid, _ in ranked])
+    # Startups deleted since the snapshot was built are skipped
+    results = [
+        dict(summaries[sid], similarity=round(score, 4))
+        for sid, score in ranked if sid in summaries
+    ]
+    return cors_response(200, {
+        'startup_id': startup_id,
+        'similar': results,
+        'count': len(results),
+        'index_built_at': index.built_at
+    })
+
+def get_trending_startups(event):
+    """Most viewed/contacted startups lately, from the trending snapshot built by snapshot-builder"""
+    params = event.get('queryStringParameters') or {}
+    try:
+        limit = min(max(int(params.get('limit', TRENDING_PAGE_SIZE)), 1), trending.TRENDING_SIZE)
+    except ValueError:
+        return cors_response(400, {'error': 'limit must be an integer'})
+    
+    leaderboard = trending.current_leaderboard()
+    if leaderboard is None:
+        return cors_response(503, {'error': 'Trending startups not available yet'})
+    
+    # Hydrate a few extra in case some were deleted since the snapshot was built
+    ranked = leaderboard['startups'][:limit + 10]
+    summaries = startup_catalogue.get_many([entry['startup_id'] for entry in ranked])
+    results = [
+        dict(summaries[entry['startup_id']], trending_score=entry['score'],
+             views=entry[counters.VIEWS], contacts=entry[counters.CONTACTS])
+        for entry in ranked if entry['startup_id'] in summaries
+    ][:limit]
+    return cors_response(200, {
+        'trending': results,
+        'count': len(results),
+        'built_at': leaderboard['built_at'],
+        'half_life_hours': leaderboard['half_life_hours']
+    })
+
 def contact_startup(event):
     startup_id = event['pathParameters']['id']
     
@@ -110,6 +497,10 @@ def contact_startup(event):
         return cors_response(400, {'error': 'Invalid body'})
     
     print(f"Contact request for startup {startup_id}")
+    investor_id = body.get('investor_id') if isinstance(body, dict) else None
+    if investor_id:
+        event_buffer.record(investor_id, events.CONTACT, startup_id)
+    counter_buffer.record(startup_id, counters.CONTACTS)
     return cors_response(200, {
         'message': 'Contact request sent',
         'startup_id': startup_id
@@ -117,32 +508,73 @@ def contact_startup(event):
 
 # NEW INVESTOR ENDPOINTS
 
+def investor_profile(body):
+    """
+    (item, removed) for one POST /investors body: the profile attributes to
+    SET and the ones to REMOVE. Raises ValueError for an invalid profile.
+    """
+    # Validate required fields
+    if 'investor_id' not in body or 'email' not in body:
+        raise ValueError('investor_id and email are required')
+    if not non_empty_string(body['investor_id']):
+        raise ValueError('investor_id must be a non-empty string')
+    
+    # Investment range in USD (matching compares it to funding_amount_usd)
+    investment = {}
+    for name, default in (('min_investment', 0), ('max_investment', 10000000000)):
+        # An explicit null means no bound, like a missing field
+        value = body.get(name)
+        parsed = funding.parse_amount(default if value is None else value)
+        if parsed is None:
+            raise ValueError(f'{name} must be an amount like 500000, 500K or $2.5M')
+        investment[name] = parsed[0]
+    if investment['min_investment'] > investment['max_investment']:
+        raise ValueError('min_investment must not be greater than max_investment')
+    
+    # Profile fields (bookmarks and recommendations are maintained separately)
+    item = {
+        'email': body['email'],
+        'name': body.get('name', body['email']),
+        'preferred_industries': body.get('preferred_industries', []),
+        'preferred_funding_stages': body.get('preferred_funding_stages', []),
+        'min_investment': investment['min_investment'],
+        'max_investment': investment['max_investment'],
+        'created_at': body.get('created_at'),
+        'updated_at': body.get('updated_at')
+    }
+    
+    # Coordinates for the proximity term in matching, resolved once here
+    removed = []
+    if 'location' in body:
+        item['location'] = body['location']
+        located = geo.locate(body['location'])
+        if located:
+            fields = geo.location_fields(located['latitude'], located['longitude'])
+            item['latitude'], item['longitude'] = fields['latitude'], fields['longitude']
+        else:
+            removed = ['latitude', 'longitude']
+    return item, removed
+
+def update_investor(table, investor_id, item, removed):
+    """Update rather than put, so bookmarks/recommendations on the item survive a profile save"""
+    update_expression = 'SET ' + ', '.join(f'#{name} = :{name}' for name in item)
+    if removed:
+        update_expression += ' REMOVE ' + ', '.join(f'#{name}' for name in removed)
+    table.update_item(
+        Key={'investor_id': investor_id},
+        UpdateExpression=update_expression,
+        ExpressionAttributeNames={f'#{name}': name for name in list(item) + removed},
+        ExpressionAttributeValues={f':{name}': value for name, value in item.items()}
+    )
+
 def save_investor(event):
     """Save or update investor profile"""
     table = dynamodb.Table(INVESTORS_TABLE)
     
     try:
         body = json.loads(event['body'])
-        
-        # Validate required fields
-        if 'investor_id' not in body or 'email' not in body:
-            return cors_response(400, {'error': 'investor_id and email are required'})
-        
-        # Create investor item
-        item = {
-            'investor_id': body['investor_id'],
-            'email': body['email'],
-            'name': body.get('name', body['email']),
-            'preferred_industries': body.get('preferred_industries', []),
-            'preferred_funding_stages': body.get('preferred_funding_stages', []),
-            'min_investment': body.get('min_investment', 0),
-            'max_investment': body.get('max_investment', 10000000000),
-            'created_at': body.get('created_at'),
-            'updated_at': body.get('updated_at')
-        }
-        
-        # Save to DynamoDB
-        table.put_item(Item=item)
+        item, removed = investor_profile(body)
+        update_investor(table, body['investor_id'], item, removed)
         
         print(f"✅ Saved investor profile for {body['email']}")
         
@@ -154,6 +586,9 @@ def save_investor(event):
     except json.JSONDecodeError:
         return cors_response(400, {'error': 'Invalid JSON in request body'})
     
+    except ValueError as e:
+        return cors_response(400, {'error': str(e)})
+    
     except Exception as e:
         print(f"❌ Error saving investor: {str(e)}")
         return cors_response(500, {'error': str(e)})
@@ -173,17 +608,318 @@ def get_investor(event):
             print(f"Investor not found: {investor_id}")
             return cors_response(404, {'error': 'Investor not found'})
         
+        investor = investor_view(response['Item'])
+        
         print(f"✅ Found investor profile for {investor_id}")
-        return cors_response(200, response['Item'])
+        return cors_response(200, investor)
     
     except Exception as e:
         print(f"❌ Error getting investor: {str(e)}")
         return cors_response(500, {'error': str(e)})
 
+def investor_view(item):
+    """An investor item as the API returns it"""
+    # Internal bookkeeping (binary seen-set) is not part of the profile
+    investor = {k: v for k, v in item.items() if k not in INTERNAL_ATTRIBUTES}
+    
+    # Recommendations are stored as compact (startup_id, score) pairs
+    if 'recommendations' in investor:
+        investor['recommendations'] = recommendations.hydrate(investor['recommendations'], startup_catalogue)
+    return investor
+
+# BATCH ENDPOINTS
+# One request per dashboard page instead of one per item. Chunked
+# BatchGetItem/BatchWriteItem with a bounded retry of unprocessed keys; the
+# response carries a status per requested item, in request order.
+
+def batch_list(body, field, kind):
+    """The non-empty list under field (at most BATCH_MAX_ITEMS); raises ValueError"""
+    values = body.get(field)
+    if not isinstance(values, list) or not values or not all(isinstance(v, kind) and v for v in values):
+        raise ValueError(f'{field} must be a non-empty list')
+    if len(values) > BATCH_MAX_ITEMS:
+        raise ValueError(f'{field}: at most {BATCH_MAX_ITEMS} per request')
+    return values
+
+def batch_lookup(table_name, key_name, ids, view=None):
+    """Per-id results of a batched get: found (with the item), not_found or error"""
+    items, failed = ddb_batch.batch_get_items_partial(
+        dynamodb, table_name, [{key_name: item_id} for item_id in ids], max_retries=BATCH_MAX_RETRIES
+    )
+    found = {item[key_name]: item for item in items}
+    errors = {key[key_name]: reason for key, reason in failed}
+    results = []
+    for item_id in dict.fromkeys(ids):
+        if item_id in found:
+            item = found[item_id]
+            results.append({key_name: item_id, 'status': 'found', 'item': view(item) if view else item})
+        elif item_id in errors:
+            results.append({key_name: item_id, 'status': 'error', 'error': errors[item_id]})
+        else:
+            results.append({key_name: item_id, 'status': 'not_found'})
+    return results
+
+def batch_summary(results):
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return {'results': results, 'count': len(results), 'statuses': counts}
+
+def batch_get_startups(event):
+    """POST /startups/batch-get - body {"startup_ids": [...]}"""
+    try:
+        body = json.loads(event.get('body') or '{}')
+        ids = batch_list(body, 'startup_ids', str)
+    except json.JSONDecodeError:
+        return cors_response(400, {'error': 'Invalid JSON in request body'})
+    except ValueError as e:
+        return cors_response(400, {'error': str(e)})
+    
+    results = batch_lookup(STARTUPS_TABLE, 'startup_id', ids)
+    for result in results:
+        if 'item' in result:
+            result['startup'] = result.pop('item')
+    return cors_response(200, batch_summary(results))
+
+def batch_investors(event):
+    """
+    POST /investors/batch - body {"investor_ids": [...]} to read profiles
+    (as GET /investors/{id} returns them) or {"investors": [...]} to save
+    profiles (each as POST /investors takes it)
+    """
+    try:
+        body = json.loads(event.get('body') or '{}')
+        if 'investors' in body:
+            profiles = batch_list(body, 'investors', dict)
+        else:
+            ids = batch_list(body, 'investor_ids', str)
+    except json.JSONDecodeError:
+        return cors_response(400, {'error': 'Invalid JSON in request body'})
+    except ValueError as e:
+        return cors_response(400, {'error': str(e)})
+    
+    if 'investors' in body:
+        return cors_response(200, batch_summary(save_investors(profiles)))
+    
+    results = batch_lookup(INVESTORS_TABLE, 'investor_id', ids, investor_view)
+    for result in results:
+        if 'item' in result:
+            result['investor'] = result.pop('item')
+    return cors_response(200, batch_summary(results))
+
+def save_investors(profiles):
+    """
+    Per-profile results (created, updated, invalid or error). New investors
+    are written with BatchWriteItem. Existing ones are updated in place
+    (concurrent UpdateItem calls): a batch put would wipe their bookmarks
+    and recommendations.
+    """
+    table = dynamodb.Table(INVESTORS_TABLE)
+    results = [None] * len(profiles)
+    valid = {}
+    for position, profile in enumerate(profiles):
+        investor_id = profile.get('investor_id')
+        try:
+            item, removed = investor_profile(profile)
+            if investor_id in valid:
+                raise ValueError('duplicate investor_id in this request')
+        except ValueError as e:
+            results[position] = {'investor_id': investor_id, 'status': 'invalid', 'error': str(e)}
+            continue
+        valid[investor_id] = (position, item, removed)
+    
+    if valid:
+        existing, failed = ddb_batch.batch_get_items_partial(
+            dynamodb, INVESTORS_TABLE, [{'investor_id': investor_id} for investor_id in valid],
+            projection_expression='investor_id', max_retries=BATCH_MAX_RETRIES
+        )
+        for key, reason in failed:
+            position, _, _ = valid.pop(key['investor_id'])
+            results[position] = {'investor_id': key['investor_id'], 'status': 'error', 'error': reason}
+        existing_ids = {item['investor_id'] for item in existing}
+        
+        # New profiles: nothing to preserve, so plain puts in chunks of 25
+        new_items = [dict(item, investor_id=investor_id)
+                     for investor_id, (_, item, _) in valid.items() if investor_id not in existing_ids]
+        failed_puts = {item['investor_id']: reason for item, reason in
+                       ddb_batch.batch_put_items_partial(dynamodb, INVESTORS_TABLE, new_items,
+                                                         max_retries=BATCH_MAX_RETRIES)}
+        
+        def update(investor_id):
+            _, item, removed = valid[investor_id]
+            try:
+                update_investor(table, investor_id, item, removed)
+                return None
+            except Exception as e:
+                return str(e)
+        
+        updates = [investor_id for investor_id in valid if investor_id in existing_ids]
+        with ThreadPoolExecutor(max_workers=BATCH_UPDATE_WORKERS) as pool:
+            update_errors = dict(zip(updates, pool.map(update, updates)))
+        
+        for investor_id, (position, _, _) in valid.items():
+            error = failed_puts.get(investor_id) or update_errors.get(investor_id)
+            if error:
+                results[position] = {'investor_id': investor_id, 'status': 'error', 'error': error}
+            else:
+                status = 'updated' if investor_id in existing_ids else 'created'
+                results[position] = {'investor_id': investor_id, 'status': status}
+    
+    print(f"✅ Batch save: {sum(1 for r in results if r['status'] in ('created', 'updated'))}/{len(results)} profiles")
+    return results
+
+# BOOKMARK ENDPOINTS
+# Bookmarks live in a string set on the investor item, so toggling one is a
+# single conditional ADD/DELETE instead of a read-modify-write of the profile.
+
+def add_bookmark(event):
+    """Bookmark a startup for an investor"""
+    try:
+        body = json.loads(event.get('body') or '{}')
+    except json.JSONDecodeError:
+        return cors_response(400, {'error': 'Invalid JSON in request body'})
+    
+    if not isinstance(body, dict):
+        return cors_response(400, {'error': 'Request body must be a JSON object'})
+    investor_id = body.get('investor_id')
+    startup_id = body.get('startup_id')
+    if not non_empty_string(investor_id) or not non_empty_string(startup_id):
+        return cors_response(400, {'error': 'investor_id and startup_id must be non-empty strings'})
+    
+    try:
+        update_bookmarks(investor_id, 'ADD', startup_id)
+        event_buffer.record(investor_id, events.BOOKMARK, startup_id)
+        print(f"✅ Bookmarked {startup_id} for {investor_id}")
+        return cors_response(200, {
+            'message': 'Bookmark added',
+            'investor_id': investor_id,
+            'startup_id': startup_id
+        })
+    
+    except LookupError:
+        return cors_response(404, {'error': 'Investor not found'})
+    
+    except Exception as e:
+        print(f"❌ Error adding bookmark: {str(e)}")
+        return cors_response(500, {'error': str(e)})
+
+def remove_bookmark(event):
+    """Remove a bookmarked startup"""
+    investor_id = event['pathParameters']['userId']
+    startup_id = event['pathParameters']['startupId']
+    if not non_empty_string(investor_id) or not non_empty_string(startup_id):
+        return cors_response(400, {'error': 'userId and startupId must be non-empty strings'})
+    
+    try:
+        update_bookmarks(investor_id, 'DELETE', startup_id)
+        event_buffer.record(investor_id, events.UNBOOKMARK, startup_id)
+        print(f"✅ Removed bookmark {startup_id} for {investor_id}")
+        return cors_response(200, {
+            'message': 'Bookmark removed',
+            'investor_id': investor_id,
+            'startup_id': startup_id
+        })
+    
+    except LookupError:
+        return cors_response(404, {'error': 'Investor not found'})
+    
+    except Exception as e:
+        print(f"❌ Error removing bookmark: {str(e)}")
+        return cors_response(500, {'error': str(e)})
+
+def update_bookmarks(investor_id, action, startup_id):
+    """Atomically ADD/DELETE one startup id in the investor's bookmark set"""
+    table = dynamodb.Table(INVESTORS_TABLE)
+    
+    def apply():
+        table.update_item(
+            Key={'investor_id': investor_id},
+            UpdateExpression=f'{action} bookmarks :ids',
+            ConditionExpression='attribute_exists(investor_id)',
+            ExpressionAttributeValues={':ids': {startup_id}}
+        )
+    
+    try:
+        apply()
+    except Exception as e:
+        code = error_code(e)
+        if code == 'ConditionalCheckFailedException':
+            raise LookupError(investor_id)
+        if not is_type_mismatch(e):
+            raise
+        # Profiles written before the string-set format store bookmarks as a list
+        migrate_bookmarks(table, investor_id)
+        apply()
+
+def migrate_bookmarks(table, investor_id):
+    """One-time conversion of a legacy bookmarks list into a string set"""
+    response = table.get_item(Key={'investor_id': investor_id}, ProjectionExpression='bookmarks')
+    legacy = response.get('Item', {}).get('bookmarks') or []
+    if legacy:
+        table.update_item(
+            Key={'investor_id': investor_id},
+            UpdateExpression='SET bookmarks = :ids',
+            ExpressionAttributeValues={':ids': set(legacy)}
+        )
+    else:
+        table.update_item(
+            Key={'investor_id': investor_id},
+            UpdateExpression='REMOVE bookmarks'
+        )
+    print(f"Migrated bookmarks list to string set for {investor_id}")
+
+def encode_cursor(startup_id):
+    return base64.urlsafe_b64encode(startup_id.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    return base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+
+def get_bookmarks(event):
+    """List an investor's bookmarked startups (hydrated, cursor-paginated)"""
+    investor_id = event['pathParameters']['userId']
+    params = event.get('queryStringParameters') or {}
+    
+    try:
+        limit = max(1, min(int(params.get('limit', BOOKMARKS_PAGE_SIZE)), MAX_BOOKMARKS_PAGE_SIZE))
+        after = decode_cursor(params['cursor']) if params.get('cursor') else None
+    except (ValueError, UnicodeDecodeError):
+        return cors_response(400, {'error': 'Invalid limit or cursor'})
+    
+    try:
+        response = dynamodb.Table(INVESTORS_TABLE).get_item(
+            Key={'investor_id': investor_id},
+            ProjectionExpression='investor_id, bookmarks'
+        )
+        if 'Item' not in response:
+            return cors_response(404, {'error': 'Investor not found'})
+        
+        # Sets are unordered; sort ids so cursors are stable between pages
+        startup_ids = sorted(response['Item'].get('bookmarks') or [])
+        if after is not None:
+            startup_ids = [sid for sid in startup_ids if sid > after]
+        page = startup_ids[:limit]
+        has_more = len(startup_ids) > limit
+        
+        items = ddb_batch.batch_get_items(
+            dynamodb, STARTUPS_TABLE, [{'startup_id': sid} for sid in page]
+        )
+        by_id = {item['startup_id']: item for item in items}
+        # Bookmarks of startups that have since been removed (or expired) are skipped
+        startups = [by_id[sid] for sid in page if sid in by_id]
+        
+        return cors_response(200, {
+            'investor_id': investor_id,
+            'bookmarks': startups,
+            'count': len(startups),
+            'next_cursor': encode_cursor(page[-1]) if has_more else None
+        })
+    
+    except Exception as e:
+        print(f"❌ Error getting bookmarks: {str(e)}")
+        return cors_response(500, {'error': str(e)})
+
 def trigger_matching(event):
     """Trigger the matching Lambda to send recommendations"""
-    lambda_client = boto3.client('lambda')
-    
     try:
         # Get investor_id and email from request body
         body = json.loads(event.get('body', '{}'))
@@ -2,21 +2,54 @@
 Lambda Function: investor-startup-platform-batch-processor
 Purpose: Process daily scheduled recommendations for opted-in users
 Triggered by: EventBridge (hourly)
+
+Dispatch modes (DISPATCH_MODE):
+  digest   - one batch job per hour: match all due investors against a single
+             catalogue scan, render every email in one pass and bulk-send them
+  workflow - legacy: one Step Functions execution per due investor
 """
 
 import json
-import boto3
 import os
+import sys
 from datetime import datetime, timedelta
-from boto3.dynamodb.conditions import Attr
 
-dynamodb = boto3.resource('dynamodb')
-stepfunctions = boto3.client('stepfunctions')
+# Shared modules are bundled next to index.py at deploy time; fall back to the source tree locally
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import affinity
+import aws_clients
+import capacity
+import ddb_batch
+import funding
+import geo
+import matching
+import notifications
+import profiling
+import recommendations
+import seen_set
+import similarity
+
+# Background job: paced by the container's capacity budget so API traffic keeps priority
+dynamodb = capacity.tracked(aws_clients.lazy_resource('dynamodb'), capacity.BACKGROUND, 'batch-processor')
+stepfunctions = aws_clients.lazy_client('stepfunctions')
+ses_client = aws_clients.lazy_client('ses')
 
 # Configuration - YOU NEED TO SET THESE IN LAMBDA ENVIRONMENT VARIABLES
 PREFERENCES_TABLE = os.environ.get('PREFERENCES_TABLE', 'startup-investor-platform-dev-investor-preferences')
 STATE_MACHINE_ARN = os.environ.get('STATE_MACHINE_ARN', '')
+DISPATCH_MODE = os.environ.get('DISPATCH_MODE', 'digest')
 
+# Used by the digest mode
+STARTUPS_TABLE = os.environ.get('STARTUPS_TABLE', 'startup-investor-platform-dev-startups')
+INVESTORS_TABLE = os.environ.get('INVESTORS_TABLE', 'startup-investor-platform-dev-investors')
+SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'nerea.ugarte@alumni.esade.edu')
+# Catalogue fields matching and the email read (same as the matcher)
+STARTUP_FIELDS = ('startup_id', 'name', 'industry', 'funding_stage', 'description', 'location',
+                  'website', 'funding_amount', 'funding_amount_usd')
+GEO_FIELDS = ('latitude', 'longitude')
+
+@profiling.profiled('batch-processor')
+@capacity.metered('batch-processor')
 def lambda_handler(event, context):
     """
     Main handler - triggered by EventBridge hourly
@@ -25,7 +58,7 @@ def lambda_handler(event, context):
     
     print(f"=== Batch Processor Started at {datetime.utcnow().isoformat()} ===")
     
-    if not STATE_MACHINE_ARN:
+    if DISPATCH_MODE == 'workflow' and not STATE_MACHINE_ARN:
         print("ERROR: STATE_MACHINE_ARN not configured!")
         return {
             'statusCode': 500,
@@ -41,7 +74,8 @@ def lambda_handler(event, context):
     
     try:
         # Get all users with daily recommendations enabled
-        users = get_users_with_daily_recommendations()
+        with profiling.stage('schedule.preferences'):
+            users = get_users_with_daily_recommendations()
         stats['users_checked'] = len(users)
         
         print(f"Found {len(users)} users with daily_recommendations enabled")
@@ -49,7 +83,8 @@ def lambda_handler(event, context):
         current_hour = datetime.utcnow().hour
         print(f"Current UTC hour: {current_hour}")
         
-        # Process each user
+        # Collect the users due in this hour's bucket
+        due_users = []
         for user in users:
             try:
                 investor_id = user.get('investor_id')
@@ -78,13 +113,7 @@ def lambda_handler(event, context):
                 
                 # Check if this is their preferred hour
                 if current_hour == preferred_hour:
-                    print(f"✅ Triggering recommendations for {investor_id} ({email})")
-                    
-                    if trigger_step_functions(investor_id, email):
-                        update_last_sent_timestamp(investor_id)
-                        stats['users_triggered'] += 1
-                    else:
-                        stats['errors'] += 1
+                    due_users.append(user)
                 else:
                     print(f"Skipping {investor_id} - preferred hour {preferred_hour}, current hour {current_hour}")
                     stats['users_skipped'] += 1
@@ -93,6 +122,23 @@ def lambda_handler(event, context):
                 print(f"Error processing user {user.get('investor_id', 'unknown')}: {str(e)}")
                 stats['errors'] += 1
         
+        print(f"{len(due_users)} users due this hour (mode: {DISPATCH_MODE})")
+        
+        if DISPATCH_MODE == 'workflow':
+            for user in due_users:
+                investor_id = user['investor_id']
+                print(f"✅ Triggering recommendations for {investor_id} ({user['email']})")
+                
+                with profiling.stage('workflow.start'):
+                    started = trigger_step_functions(investor_id, user['email'])
+                if started:
+                    update_last_sent_timestamp(investor_id)
+                    stats['users_triggered'] += 1
+                else:
+                    stats['errors'] += 1
+        elif due_users:
+            process_digest(due_users, stats)
+        
         # Log final stats
         print(f"=== Batch Processing Complete ===")
         print(f"Stats: {json.dumps(stats)}")
@@ -119,8 +165,11 @@ def lambda_handler(event, context):
         }
 
 
+@capacity.caller('schedule.preferences')
 def get_users_with_daily_recommendations():
     """Query DynamoDB for users with daily_recommendations enabled"""
+    from boto3.dynamodb.conditions import Attr
+
     table = dynamodb.Table(PREFERENCES_TABLE)
     
     try:
@@ -172,6 +221,175 @@ def trigger_step_functions(investor_id, email):
         return False
 
 
+@capacity.caller('digest.catalogue')
+def load_catalogue():
+    """
+    Scan the whole startups table once (all pages) for the digest run,
+    projected to the fields matching and rendering read
+    """
+    table = dynamodb.Table(STARTUPS_TABLE)
+    fields = STARTUP_FIELDS + (GEO_FIELDS if matching.PROXIMITY_POINTS else ())
+    names = {f'#{field}': field for field in fields}
+    params = {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+    response = table.scan(**params)
+    startups = response.get('Items', [])
+    
+    while 'LastEvaluatedKey' in response:
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **params)
+        startups.extend(response.get('Items', []))
+    
+    return startups
+
+
+def process_digest(due_users, stats):
+    """
+    Amortized daily run for one schedule bucket:
+    one catalogue scan, one matching pass, one render pass, one bulk send.
+    Delivery status is tracked per recipient.
+    """
+    stats.update({'emails_sent': 0, 'no_matches': 0, 'no_new_matches': 0})
+    
+    # Profiles (preferences) for every due investor in as few requests as possible
+    with capacity.caller('digest.profiles'), profiling.stage('digest.profiles'):
+        profiles = ddb_batch.batch_get_items(
+            dynamodb, INVESTORS_TABLE, [{'investor_id': u['investor_id']} for u in due_users]
+        )
+    profiles_by_id = {p['investor_id']: p for p in profiles}
+    
+    with profiling.stage('digest.catalogue'):
+        startups = load_catalogue()
+    print(f"Digest: {len(due_users)} investors, {len(profiles)} profiles, {len(startups)} startups")
+    with profiling.stage('digest.indexes'):
+        similarity_index = similarity.index_for_matching()
+        affinity_matrix = affinity.matrix_for_matching()
+        geo_index = geo.index_for_matching(startups)
+        funding_index = funding.index_for_matching(startups)
+    
+    deliveries = []
+    statuses = []
+    results = {}
+    
+    for user in due_users:
+        investor_id = user['investor_id']
+        profile = profiles_by_id.get(investor_id)
+        
+        if not profile or not matching.has_preferences(profile):
+            statuses.append({'investor_id': investor_id, 'recipient': user['email'], 'status': 'no_matches'})
+            continue
+        
+        # Top MATCH_TOP_K only, same as the matcher
+        with profiling.stage('digest.match'):
+            matches, _ = matching.top_matches(
+                profile, funding.investor_candidates(funding_index, profile, startups),
+                similarity=similarity.investor_scorer(similarity_index, profile),
+                affinity=affinity.investor_scorer(affinity_matrix, profile),
+                proximity=geo.investor_scorer(geo_index, profile)
+            )
+            seen = seen_set.SeenSet.from_item(profile)
+            new_matches = seen_set.unseen(matches, seen)
+        results[investor_id] = (matches, new_matches, seen)
+        
+        if not matches:
+            statuses.append({'investor_id': investor_id, 'recipient': user['email'], 'status': 'no_matches'})
+            continue
+        if not new_matches:
+            # Nothing the investor hasn't already been sent - no render, no email
+            statuses.append({'investor_id': investor_id, 'recipient': user['email'], 'status': 'no_new_matches'})
+            continue
+        
+        with profiling.stage('digest.render'):
+            deliveries.append({
+                'investor_id': investor_id,
+                'recipient': user['email'],
+                'match_count': len(new_matches),
+                'message': notifications.render_match_email(
+                    profile.get('name', investor_id), new_matches,
+                    profile.get('preferred_industries', []), profile.get('preferred_funding_stages', [])
+                )
+            })
+    
+    with profiling.stage('digest.send'):
+        statuses.extend(notifications.send_bulk(ses_client, SENDER_EMAIL, deliveries))
+    
+    for status in statuses:
+        investor_id = status['investor_id']
+        if status['status'] == 'failed':
+            print(f"❌ Delivery failed for {investor_id}: {status.get('error')}")
+            stats['errors'] += 1
+        else:
+            if status['status'] == 'sent':
+                stats['emails_sent'] += 1
+            elif status['status'] == 'no_new_matches':
+                stats['no_new_matches'] += 1
+            else:
+                stats['no_matches'] += 1
+            stats['users_triggered'] += 1
+        with profiling.stage('digest.store'):
+            if investor_id in results:
+                store_results(investor_id, status, *results[investor_id])
+            record_delivery_status(investor_id, status)
+    
+    return statuses
+
+
+@capacity.caller('digest.recommendations')
+def store_results(investor_id, status, matches, new_matches, seen):
+    """
+    One write per investor after delivery: the fresh recommendations, plus
+    the updated seen-set when the email actually went out.
+    """
+    update_expression = 'SET recommendations = :recs, last_matched = :timestamp'
+    values = {
+        ':recs': recommendations.encode(matches),
+        ':timestamp': datetime.utcnow().isoformat()
+    }
+    if status['status'] == 'sent':
+        seen.add(m['startup_id'] for m in new_matches)
+        update_expression += f', {seen_set.SEEN_ATTRIBUTE} = :seen'
+        values[':seen'] = seen.to_bytes()
+    
+    try:
+        dynamodb.Table(INVESTORS_TABLE).update_item(
+            Key={'investor_id': investor_id},
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=values
+        )
+    except Exception as e:
+        print(f"❌ Error storing recommendations for {investor_id}: {str(e)}")
+
+
+@capacity.caller('digest.status')
+def record_delivery_status(investor_id, status):
+    """
+    Keep the outcome of the latest digest delivery on the preferences row.
+    Failed deliveries leave last_recommendation_sent untouched.
+    """
+    table = dynamodb.Table(PREFERENCES_TABLE)
+    timestamp = datetime.utcnow().isoformat() + 'Z'
+    update_expression = 'SET last_digest_status = :status'
+    values = {
+        ':status': {
+            'status': status['status'],
+            'message_id': status.get('message_id'),
+            'error': status.get('error'),
+            'timestamp': timestamp
+        }
+    }
+    if status['status'] != 'failed':
+        update_expression += ', last_recommendation_sent = :timestamp'
+        values[':timestamp'] = timestamp
+    
+    try:
+        table.update_item(
+            Key={'investor_id': investor_id},
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=values
+        )
+    except Exception as e:
+        print(f"Error recording delivery status for {investor_id}: {str(e)}")
+
+
+@capacity.caller('workflow.timestamp')
 def update_last_sent_timestamp(investor_id):
     """Update the last_recommendation_sent timestamp"""
     table = dynamodb.Table(PREFERENCES_TABLE)
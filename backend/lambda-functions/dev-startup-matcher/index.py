@@ -1,22 +1,213 @@
+import itertools
 import json
 import os
-import boto3
+import sys
 from decimal import Decimal
 from datetime import datetime
 
-dynamodb = boto3.resource('dynamodb')
-ses_client = boto3.client('ses')
+# Shared modules are bundled next to index.py at deploy time; fall back to the source tree locally
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import affinity
+import aws_clients
+import capacity
+import funding
+import geo
+import matching
+import notifications
+import payloads
+import profiling
+import recommendations
+import seen_set
+import similarity
+
+# Background job: paced by the container's capacity budget so API traffic keeps priority
+dynamodb = capacity.tracked(aws_clients.lazy_resource('dynamodb'), capacity.BACKGROUND, 'matcher')
+ses_client = aws_clients.lazy_client('ses')
 
 STARTUPS_TABLE = os.environ['STARTUPS_TABLE']
 INVESTORS_TABLE = os.environ['INVESTORS_TABLE']
 # Updated to use your verified email
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'nerea.ugarte@alumni.esade.edu')
 
+# Investors are streamed in scan pages of this size, so memory does not grow with the table
+INVESTOR_PAGE_SIZE = int(os.environ.get('INVESTOR_PAGE_SIZE', '100'))
+# Per-investor summaries returned in the response (a full run returns only the first ones)
+MATCH_SUMMARY_LIMIT = int(os.environ.get('MATCH_SUMMARY_LIMIT', '25'))
+
+# Only what matching, emails and the seen-set need (not stored recommendations)
+INVESTOR_FIELDS = ('investor_id', 'email', 'name', 'preferred_industries', 'preferred_funding_stages',
+                   'min_investment', 'max_investment', 'bookmarks', 'latitude', 'longitude',
+                   seen_set.SEEN_ATTRIBUTE)
+STARTUP_FIELDS = ('startup_id', 'name', 'industry', 'funding_stage', 'description', 'location',
+                  'website', 'funding_amount', 'funding_amount_usd')
+GEO_FIELDS = ('latitude', 'longitude')
+
 def decimal_default(obj):
     if isinstance(obj, Decimal):
         return float(obj)
     raise TypeError
 
+def scan_pages(table, fields, page_size=None, stage='matcher.scan'):
+    """Yield projected items one scan page at a time (all pages)"""
+    names = {f'#{field}': field for field in fields}
+    params = {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+    if page_size:
+        params['Limit'] = page_size
+    while True:
+        with capacity.caller(stage):
+            response = table.scan(**params)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def iter_investors(table, requested_investor_id=None):
+    """
+    Stage 1: stream investors page by page. A requested investor is looked
+    up by id first; otherwise the scan matches investor_id or email
+    case-insensitively.
+    """
+    requested = requested_investor_id.lower() if requested_investor_id else None
+    if requested_investor_id:
+        # Usual case (API / Step Functions): the exact investor_id, one GetItem instead of a scan
+        names = {f'#{field}': field for field in INVESTOR_FIELDS}
+        with capacity.caller('matcher.investors'):
+            response = table.get_item(
+                Key={'investor_id': requested_investor_id},
+                ProjectionExpression=', '.join(names),
+                ExpressionAttributeNames=names
+            )
+        if 'Item' in response:
+            yield response['Item']
+            return
+    for investor in scan_pages(table, INVESTOR_FIELDS, INVESTOR_PAGE_SIZE, 'matcher.investors'):
+        if requested and (investor.get('investor_id', '').lower() != requested and
+                          investor.get('email', '').lower() != requested):
+            continue
+        yield investor
+
+def match_results(investors, startups, similarity_index, affinity_matrix, geo_index=None, funding_index=None):
+    """
+    Stage 2: one result per investor, produced as soon as it is matched.
+    Only the top MATCH_TOP_K matches are kept (heap), never the full list,
+    and only startups inside the investor's investment range are scored.
+    """
+    for investor in investors:
+        if not matching.has_preferences(investor):
+            yield {'investor': investor, 'matches': None, 'total': 0, 'new_matches': [], 'seen': None}
+            continue
+        with profiling.stage('matcher.match'):
+            matches, total = matching.top_matches(
+                investor, funding.investor_candidates(funding_index, investor, startups),
+                similarity=similarity.investor_scorer(similarity_index, investor),
+                affinity=affinity.investor_scorer(affinity_matrix, investor),
+                proximity=geo.investor_scorer(geo_index, investor)
+            )
+            # Only startups the investor hasn't already been emailed about
+            seen = seen_set.SeenSet.from_item(investor)
+        yield {'investor': investor, 'matches': matches, 'total': total,
+               'new_matches': seen_set.unseen(matches, seen), 'seen': seen}
+
+def notify(result):
+    """Stage 3a: email the new matches; returns True if an email went out"""
+    investor = result['investor']
+    investor_email = investor.get('email')
+    new_matches = result['new_matches']
+    
+    # Send email only if there is something new (skip rendering otherwise)
+    if not (new_matches and investor_email):
+        if not result['matches']:
+            print(f"  No matches found for this investor")
+        elif not new_matches:
+            print(f"  No new matches since last notification - skipping email")
+        if not investor_email:
+            print(f"  No email address for this investor")
+        return False
+    
+    try:
+        message = notifications.render_match_email(
+            investor.get('name', investor.get('investor_id')), new_matches,
+            investor.get('preferred_industries', []), investor.get('preferred_funding_stages', [])
+        )
+        
+        # Send via SES directly to investor
+        message_id = notifications.send_email(ses_client, SENDER_EMAIL, investor_email, message)
+        
+        print(f"  ✅ Email sent to {investor_email} (MessageId: {message_id})")
+        result['seen'].add(m['startup_id'] for m in new_matches)
+        return True
+    
+    except Exception as e:
+        print(f"  ❌ Error sending email: {str(e)}")
+        return False
+
+def hand_off(result):
+    """
+    Stage 3a in the interactive workflow: its SendNotifications state emails
+    the new matches and records them in the seen-set once SES has accepted
+    the email. Returns True if there is something to send.
+    """
+    return bool(result['new_matches'] and result['investor'].get('email'))
+
+def reference_output(result, notified):
+    """Workflow output with the match list stored in S3 (shared/payloads.py) instead of inline"""
+    investor = result['investor']
+    investor_id = investor.get('investor_id')
+    matches = result['matches'] or []
+    new_matches = result['new_matches'] if notified else []
+    matches_key = payloads.store(f'matches/{investor_id}', {
+        'investor_id': investor_id,
+        'matches': matches,
+        # What SendNotifications emails: the top new matches, as in notify()
+        'email_matches': [m['startup_id'] for m in new_matches[:matching.EMAIL_TOP_N]],
+        # What it adds to the seen-set after a successful send: every new match, as in notify()
+        'new_matches': [m['startup_id'] for m in new_matches],
+    })
+    return {
+        'statusCode': 200,
+        # True when there is an email to send (CheckMatches)
+        'matchesFound': notified,
+        'investor_id': investor_id,
+        'email': investor.get('email'),
+        'matches_key': matches_key,
+        'match_count': result['total'],
+        'new_match_count': len(new_matches),
+    }
+
+def persist(investors_table, result, notified):
+    """Stage 3b: replace the investor's stored recommendations (and seen-set if notified)"""
+    investor_id = result['investor'].get('investor_id', 'Unknown')
+    matches = result['matches'] or []
+    try:
+        # Compact (startup_id, score) pairs; names etc. are hydrated from the catalogue on read
+        stored_recommendations = recommendations.encode(matches)
+        
+        # UPDATE investor record with NEW recommendations (and the seen-set
+        # if an email went out) - this REPLACES the old recommendations completely
+        update_expression = 'SET recommendations = :recs, last_matched = :timestamp'
+        values = {
+            ':recs': stored_recommendations,
+            ':timestamp': datetime.utcnow().isoformat()
+        }
+        if notified:
+            update_expression += f', {seen_set.SEEN_ATTRIBUTE} = :seen'
+            values[':seen'] = result['seen'].to_bytes()
+        
+        with capacity.caller('matcher.persist'):
+            investors_table.update_item(
+                Key={'investor_id': investor_id},
+                UpdateExpression=update_expression,
+                ExpressionAttributeValues=values
+            )
+        if result['matches'] is None:
+            print(f"  ✅ Cleared recommendations for investor with no preferences")
+        else:
+            print(f"  ✅ Stored {len(matches)} recommendations in DynamoDB ({len(stored_recommendations)} bytes)")
+    except Exception as e:
+        print(f"  ❌ Error storing recommendations in DynamoDB: {str(e)}")
+
+@profiling.profiled('dev-startup-matcher')
+@capacity.metered('dev-startup-matcher')
 def lambda_handler(event, context):
     startups_table = dynamodb.Table(STARTUPS_TABLE)
     investors_table = dynamodb.Table(INVESTORS_TABLE)
@@ -49,21 +240,20 @@ def lambda_handler(event, context):
     else:
         print(f"⚠️  No body in event - will process ALL investors")
     
+    # The interactive (Express) workflow sends the email itself and takes the
+    # match list by reference: {"notify": false, "result_by_reference": true}
+    notify_here = body.get('notify', True) if body else True
+    by_reference = bool(requested_investor_id and body.get('result_by_reference'))
+    output = None
+    
     print(f"🎯 FILTERING FOR: {requested_investor_id if requested_investor_id else 'ALL INVESTORS'}")
     
-    # Get all investors
-    investors_response = investors_table.scan()
-    investors = investors_response.get('Items', [])
+    # Stream investors (page by page); peek so an empty result can be reported as before
+    investors = iter_investors(investors_table, requested_investor_id)
+    with profiling.stage('matcher.investors'):
+        first_investor = next(investors, None)
     
-    # Filter to specific investor if requested (CASE-INSENSITIVE - FIXED)
-    if requested_investor_id:
-        requested_investor_id_lower = requested_investor_id.lower()
-        investors = [inv for inv in investors 
-                     if inv.get('investor_id', '').lower() == requested_investor_id_lower or 
-                        inv.get('email', '').lower() == requested_investor_id_lower]
-        print(f"Filtered to {len(investors)} investor(s)")
-    
-    if not investors:
+    if first_investor is None:
         print("No investors found")
         return {
             'statusCode': 200,
@@ -71,9 +261,11 @@ def lambda_handler(event, context):
             'body': json.dumps({'message': 'No investors found', 'total_matches': 0})
         }
     
-    # Get all startups
-    startups_response = startups_table.scan()
-    startups = startups_response.get('Items', [])
+    # The catalogue is the one thing held in full: every investor is scored against it
+    # Coordinates are only read when the proximity term is on
+    fields = STARTUP_FIELDS + (GEO_FIELDS if matching.PROXIMITY_POINTS else ())
+    with profiling.stage('matcher.startups'):
+        startups = list(scan_pages(startups_table, fields, stage='matcher.startups'))
     
     if not startups:
         print("No startups found")
@@ -83,265 +275,87 @@ def lambda_handler(event, context):
             'body': json.dumps({'message': 'No startups found', 'total_matches': 0})
         }
     
-    print(f"Processing {len(investors)} investors and {len(startups)} startups")
+    print(f"Processing investors (streamed, {INVESTOR_PAGE_SIZE} per page) against {len(startups)} startups")
+    
+    with profiling.stage('matcher.indexes'):
+        # Optional description-similarity term (SIMILARITY_POINTS); None when disabled
+        similarity_index = similarity.index_for_matching()
+        # Behavioural re-ranking from the co-occurrence snapshot; None until one is published
+        affinity_matrix = affinity.matrix_for_matching()
+        # Optional proximity term (PROXIMITY_POINTS): geohash cells -> startups, built once per run
+        geo_index = geo.index_for_matching(startups)
+        # Startups sorted by funding_amount_usd, for the per-investor investment range (MATCH_FUNDING_RANGE)
+        funding_index = funding.index_for_matching(startups)
     
     total_matches = 0
+    investors_processed = 0
     all_matches = []
+    summaries_truncated = False
     
-    for investor in investors:
-        investor_id = investor.get('investor_id', 'Unknown')
-        investor_name = investor.get('name', investor_id)
-        investor_email = investor.get('email')
+    results = match_results(itertools.chain([first_investor], investors), startups,
+                            similarity_index, affinity_matrix, geo_index, funding_index)
+    for result in results:
+        investor = result['investor']
+        investors_processed += 1
         
-        # Get preferences
-        preferred_industries = investor.get('preferred_industries', [])
-        preferred_stages = investor.get('preferred_funding_stages', [])
-        
-        print(f"\nMatching for {investor_email}")
-        print(f"  Industries: {preferred_industries}")
-        print(f"  Stages: {preferred_stages}")
+        print(f"\nMatching for {investor.get('email')}")
+        print(f"  Industries: {investor.get('preferred_industries', [])}")
+        print(f"  Stages: {investor.get('preferred_funding_stages', [])}")
         
         # STRICTER MATCHING: If no preferences, don't match anything
-        if not preferred_industries and not preferred_stages:
+        if result['matches'] is None:
             print("  ⚠️  No preferences set - skipping")
             # IMPORTANT: Clear old recommendations if preferences removed
-            try:
-                investors_table.update_item(
-                    Key={'investor_id': investor_id},
-                    UpdateExpression='SET recommendations = :empty, last_matched = :timestamp',
-                    ExpressionAttributeValues={
-                        ':empty': [],
-                        ':timestamp': datetime.utcnow().isoformat()
-                    }
-                )
-                print(f"  ✅ Cleared recommendations for investor with no preferences")
-            except Exception as e:
-                print(f"  ❌ Error clearing recommendations: {str(e)}")
+            persist(investors_table, result, False)
+            if by_reference and output is None:
+                output = {'statusCode': 200, 'matchesFound': False, 'investor_id': investor.get('investor_id'),
+                          'match_count': 0, 'new_match_count': 0}
             continue
         
-        matches = []
+        matches = result['matches']
+        print(f"  Found {result['total']} matches (keeping top {len(matches)})")
         
-        for startup in startups:
-            match_score = 0
-            industry_match = False
-            stage_match = False
-            
-            startup_industry = startup.get('industry', '')
-            startup_stage = startup.get('funding_stage', '')
-            startup_id = startup.get('startup_id', '')
-            
-            # Industry matching - STRICT
-            if preferred_industries:
-                for pref_industry in preferred_industries:
-                    # Exact or substring match
-                    if pref_industry.lower() in startup_industry.lower() or \
-                       startup_industry.lower() in pref_industry.lower():
-                        industry_match = True
-                        match_score += 50  # 50 points for industry match
-                        break
-            
-            # Funding stage matching - STRICT
-            if preferred_stages:
-                if startup_stage in preferred_stages:
-                    stage_match = True
-                    match_score += 50  # 50 points for stage match
-            
-            # STRICT MATCHING: REQUIRE BOTH industry AND stage to match
-            # Only add if we have preferences for both and they both match
-            has_industry_pref = len(preferred_industries) > 0
-            has_stage_pref = len(preferred_stages) > 0
-            
-            # If user set both preferences, require both to match
-            if has_industry_pref and has_stage_pref:
-                if industry_match and stage_match:
-                    matches.append({
-                        'startup_id': startup_id,
-                        'name': startup.get('name', 'Unknown'),
-                        'industry': startup_industry,
-                        'funding_stage': startup_stage,
-                        'description': startup.get('description', ''),
-                        'location': startup.get('location', ''),
-                        'website': startup.get('website', ''),
-                        'funding_amount': startup.get('funding_amount', 'N/A'),
-                        'match_score': match_score,
-                        'industry_match': industry_match,
-                        'stage_match': stage_match
-                    })
-            # If user only set one preference, match on that one
-            elif has_industry_pref and industry_match:
-                matches.append({
-                    'startup_id': startup_id,
-                    'name': startup.get('name', 'Unknown'),
-                    'industry': startup_industry,
-                    'funding_stage': startup_stage,
-                    'description': startup.get('description', ''),
-                    'location': startup.get('location', ''),
-                    'website': startup.get('website', ''),
-                    'funding_amount': startup.get('funding_amount', 'N/A'),
-                    'match_score': match_score,
-                    'industry_match': industry_match,
-                    'stage_match': stage_match
-                })
-            elif has_stage_pref and stage_match:
-                matches.append({
-                    'startup_id': startup_id,
-                    'name': startup.get('name', 'Unknown'),
-                    'industry': startup_industry,
-                    'funding_stage': startup_stage,
-                    'description': startup.get('description', ''),
-                    'location': startup.get('location', ''),
-                    'website': startup.get('website', ''),
-                    'funding_amount': startup.get('funding_amount', 'N/A'),
-                    'match_score': match_score,
-                    'industry_match': industry_match,
-                    'stage_match': stage_match
+        if matches:
+            total_matches += result['total']
+            if len(all_matches) < MATCH_SUMMARY_LIMIT:
+                all_matches.append({
+                    'investor_email': investor.get('email'),
+                    'match_count': result['total'],
+                    'new_match_count': len(result['new_matches']),
+                    'top_matches': matches[:matching.EMAIL_TOP_N]
                 })
+            else:
+                summaries_truncated = True
         
-        print(f"  Found {len(matches)} matches")
-        
-        # Sort by match score
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        # ===== KEY FIX: WRITE TO DYNAMODB (REPLACES OLD DATA) =====
-        try:
-            # Prepare recommendations for storage (simplified version)
-            stored_recommendations = [
-                {
-                    'startup_id': m['startup_id'],
-                    'name': m['name'],
-                    'industry': m['industry'],
-                    'funding_stage': m['funding_stage'],
-                    'match_score': m['match_score']
-                }
-                for m in matches
-            ]
-            
-            # UPDATE investor record with NEW recommendations
-            # This REPLACES the old recommendations array completely
-            investors_table.update_item(
-                Key={'investor_id': investor_id},
-                UpdateExpression='SET recommendations = :recs, last_matched = :timestamp',
-                ExpressionAttributeValues={
-                    ':recs': stored_recommendations,
-                    ':timestamp': datetime.utcnow().isoformat()
-                }
-            )
-            print(f"  ✅ Stored {len(stored_recommendations)} recommendations in DynamoDB")
-        except Exception as e:
-            print(f"  ❌ Error storing recommendations in DynamoDB: {str(e)}")
-        # ========================================================
-        
-        # Send email if matches found
-        if matches and investor_email:
-            total_matches += len(matches)
-            
-            all_matches.append({
-                'investor_email': investor_email,
-                'match_count': len(matches),
-                'top_matches': matches[:5]
-            })
-            
-            try:
-                # Create HTML email message
-                html_message = f"""<html>
-<head></head>
-<body>
-<h2>Hello {investor_name}!</h2>
-<p>We found <strong>{len(matches)}</strong> startup(s) matching your investment preferences.</p>
-
-<h3>Top Matches:</h3>
-"""
-                
-                # Add top 5 matches with details
-                for i, match in enumerate(matches[:5], 1):
-                    match_icons = []
-                    if match['industry_match']:
-                        match_icons.append('🎯 Industry Match')
-                    if match['stage_match']:
-                        match_icons.append('📊 Stage Match')
-                    
-                    html_message += f"""
-<div style="border: 1px solid #ddd; padding: 15px; margin: 10px 0; border-radius: 8px;">
-<h4>{i}. {match['name']} - {match['industry']}</h4>
-<p><strong>Stage:</strong> {match['funding_stage']} | <strong>Funding:</strong> {match['funding_amount']}</p>
-<p><strong>Location:</strong> {match['location']}</p>
-<p><strong>Match Score:</strong> {match['match_score']}% | <strong>Why matched:</strong> {' | '.join(match_icons)}</p>
-<p>{match['description'][:150]}...</p>
-<p><a href="{match['website']}" target="_blank">Visit Website</a></p>
-</div>
-"""
-                
-                if len(matches) > 5:
-                    html_message += f"<p><em>... and {len(matches) - 5} more matches!</em></p>"
-                
-                html_message += f"""
-<hr>
-<p><strong>Your preferences:</strong></p>
-<ul>
-<li><strong>Industries:</strong> {', '.join(preferred_industries) if preferred_industries else 'Not set'}</li>
-<li><strong>Stages:</strong> {', '.join(preferred_stages) if preferred_stages else 'Not set'}</li>
-</ul>
-
-<p>Visit the <a href="https://your-vercel-url.vercel.app">Startup Investor Platform</a> to explore all your matches!</p>
-
-<p style="color: #666; font-size: 12px;">This is an automated notification from Startup Investor Platform.</p>
-</body>
-</html>"""
-                
-                # Plain text version
-                text_message = f"""Hello {investor_name}!
-
-We found {len(matches)} startup(s) matching your investment preferences.
-
-TOP MATCHES:
-
-"""
-                for i, match in enumerate(matches[:5], 1):
-                    text_message += f"""{i}. {match['name']} - {match['industry']}
-   Stage: {match['funding_stage']} | Funding: {match['funding_amount']}
-   Match Score: {match['match_score']}%
-   Location: {match['location']}
-   {match['description'][:120]}...
-   Website: {match['website']}
-   
-"""
-                
-                # Send via SES directly to investor
-                response = ses_client.send_email(
-                    Source=SENDER_EMAIL,
-                    Destination={'ToAddresses': [investor_email]},
-                    Message={
-                        'Subject': {'Data': f'🚀 {len(matches)} Startup Matches Found!'},
-                        'Body': {
-                            'Text': {'Data': text_message},
-                            'Html': {'Data': html_message}
-                        }
-                    }
-                )
-                
-                print(f"  ✅ Email sent to {investor_email} (MessageId: {response['MessageId']})")
-                
-            except Exception as e:
-                print(f"  ❌ Error sending email: {str(e)}")
-        else:
-            if not matches:
-                print(f"  No matches found for this investor")
-            if not investor_email:
-                print(f"  No email address for this investor")
+        # Work is emitted per result: nothing accumulates across investors
+        with profiling.stage('matcher.notify'):
+            notified = notify(result) if notify_here else hand_off(result)
+        with profiling.stage('matcher.persist'):
+            # A handed-off email has not been sent yet: send-email-notif records the seen-set
+            persist(investors_table, result, notified and notify_here)
+        if by_reference and output is None:
+            with profiling.stage('matcher.payload'):
+                output = reference_output(result, notified)
+    
+    if output is not None:
+        print(f"\n✅ Complete: {output['match_count']} matches, stored as {output.get('matches_key')}")
+        return output
     
     # Return summary
+    body = {
+        'message': 'Matching completed successfully',
+        'total_matches': total_matches,
+        'investors_processed': investors_processed,
+        'matches_summary': all_matches
+    }
+    if summaries_truncated:
+        body['matches_summary_truncated'] = True
     result = {
         'statusCode': 200,
         'matchesFound': total_matches > 0,
-        'body': json.dumps({
-            'message': 'Matching completed successfully',
-            'total_matches': total_matches,
-            'investors_processed': len(investors),
-            'matches_summary': all_matches
-        }, default=decimal_default)
+        'body': json.dumps(body, default=decimal_default)
     }
     
-    print(f"\n✅ Complete: {total_matches} matches for {len(investors)} investors")
+    print(f"\n✅ Complete: {total_matches} matches for {investors_processed} investors")
     
     return result
-
@@ -1,137 +1,209 @@
 """
 Lambda Function: startup-investor-platform-dev-trigger-workflow
-Purpose: Receives API Gateway requests and starts Step Functions state machine execution
+Purpose: Receives API Gateway requests and runs the startup matcher workflow,
+either interactively (Express state machine, started synchronously) or in
+bulk (Standard state machine, one asynchronous execution per investor)
 """
 
 import json
-import boto3
 import os
+import sys
+import uuid
 from datetime import datetime
 
-stepfunctions = boto3.client('stepfunctions')
+# Shared modules are bundled next to index.py at deploy time; fall back to the source tree locally
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import aws_clients
+import compression
+import payloads
+import profiling
 
+stepfunctions = aws_clients.lazy_client('stepfunctions')
+
+STATE_MACHINE_ARN = os.environ.get('STATE_MACHINE_ARN')
+EXPRESS_STATE_MACHINE_ARN = os.environ.get('EXPRESS_STATE_MACHINE_ARN')
+
+# Requests for up to this many investors run interactively when the Express machine is configured
+INTERACTIVE_MAX_INVESTORS = int(os.environ.get('INTERACTIVE_MAX_INVESTORS', '1'))
+BULK_MAX_INVESTORS = int(os.environ.get('BULK_MAX_INVESTORS', '100'))
+# Matches returned in an interactive response (the full list stays in S3)
+RESPONSE_MATCH_LIMIT = int(os.environ.get('RESPONSE_MATCH_LIMIT', '20'))
+
+MODES = ('interactive', 'bulk')
+
+
+def response(status_code, body):
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Access-Control-Allow-Origin': '*',
+            'Content-Type': 'application/json'
+        },
+        'body': json.dumps(body)
+    }
+
+
+def requested_investors(body):
+    """
+    [{'investor_id', 'email'}, ...] from a single-investor body or an
+    'investors' list; an investor listed twice is run once (first entry)
+    """
+    entries = body['investors'] if 'investors' in body else [body]
+    if not isinstance(entries, list) or not entries:
+        raise ValueError('investors must be a non-empty list')
+    if len(entries) > BULK_MAX_INVESTORS:
+        raise ValueError(f'At most {BULK_MAX_INVESTORS} investors per request')
+    investors = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get('investor_id'):
+            raise ValueError('Missing required field: investor_id')
+        if not isinstance(entry['investor_id'], str):
+            raise ValueError('investor_id must be a string')
+        if not entry.get('email'):
+            raise ValueError('Missing required field: email')
+        investors.setdefault(entry['investor_id'], {'investor_id': entry['investor_id'], 'email': entry['email']})
+    return list(investors.values())
+
+
+def choose_mode(body, investors):
+    """'interactive' for small requests when the Express machine is configured, else 'bulk'"""
+    mode = body.get('mode')
+    if mode is not None and mode not in MODES:
+        raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+    interactive_ok = bool(EXPRESS_STATE_MACHINE_ARN) and len(investors) <= INTERACTIVE_MAX_INVESTORS
+    if mode == 'interactive' and not interactive_ok:
+        raise ValueError(f'Interactive mode takes at most {INTERACTIVE_MAX_INVESTORS} investor(s)'
+                         if EXPRESS_STATE_MACHINE_ARN else 'Interactive mode is not configured')
+    return mode or ('interactive' if interactive_ok else 'bulk')
+
+
+def execution_name(investor):
+    # The timestamp has one-second resolution; the suffix keeps names from the same second apart
+    return f"matching-{investor['investor_id']}-{int(datetime.now().timestamp())}-{uuid.uuid4().hex[:8]}"
+
+
+def run_interactive(investor):
+    """Run the Express workflow and wait for it; the matches are read back from the key it returns"""
+    print(f"Running interactive matching for investor: {investor['investor_id']}")
+    result = stepfunctions.start_sync_execution(
+        stateMachineArn=EXPRESS_STATE_MACHINE_ARN,
+        name=execution_name(investor),
+        input=json.dumps(investor)
+    )
+    if result['status'] != 'SUCCEEDED':
+        print(f"❌ Express execution {result['status']}: {result.get('error')} {result.get('cause')}")
+        return response(502, {
+            'error': f"Matching {result['status'].lower().replace('_', ' ')}: {result.get('error', 'unknown error')}",
+            'executionArn': result['executionArn']
+        })
+
+    output = json.loads(result['output'])
+    matches = []
+    if output.get('matches_key'):
+        matches = payloads.load(output['matches_key'])['matches'][:RESPONSE_MATCH_LIMIT]
+    emailed = bool(output.get('matchesFound')) and output.get('notification', {}).get('statusCode') == 200
+    print(f"✅ Interactive matching done: {output.get('match_count', 0)} matches, emailed: {emailed}")
+    return response(200, {
+        'message': 'Matching completed successfully',
+        'mode': 'interactive',
+        'executionArn': result['executionArn'],
+        'match_count': output.get('match_count', 0),
+        'new_match_count': output.get('new_match_count', 0),
+        'emailed': emailed,
+        'matches': matches
+    })
+
+
+def run_bulk(investors):
+    """
+    Start one Standard execution per investor and return without waiting.
+    Each investor gets its own status ('started' or 'error'), so one failed
+    start does not fail the others.
+    """
+    if not STATE_MACHINE_ARN:
+        return response(500, {'error': 'STATE_MACHINE_ARN not configured. Please set environment variable.'})
+
+    executions = []
+    for investor in investors:
+        print(f"Starting execution for investor: {investor['investor_id']}, email: {investor['email']}")
+        try:
+            result = stepfunctions.start_execution(
+                stateMachineArn=STATE_MACHINE_ARN,
+                name=execution_name(investor),
+                input=json.dumps(investor)
+            )
+        except Exception as e:
+            print(f"❌ Could not start execution for investor {investor['investor_id']}: {str(e)}")
+            executions.append({'investor_id': investor['investor_id'], 'status': 'error', 'error': str(e)})
+            continue
+        print(f"Step Functions execution started: {result['executionArn']}")
+        executions.append({
+            'investor_id': investor['investor_id'],
+            'status': 'started',
+            'executionArn': result['executionArn'],
+            'startDate': result['startDate'].isoformat() if 'startDate' in result else None
+        })
+
+    started = [execution for execution in executions if execution['status'] == 'started']
+    if not started:
+        return response(502, {'error': 'No matching execution could be started', 'mode': 'bulk',
+                              'executions': executions})
+    message = 'Matching process started successfully'
+    if len(started) < len(executions):
+        message = f'Matching started for {len(started)} of {len(executions)} investors'
+    body = {'message': message, 'mode': 'bulk'}
+    if len(executions) == 1:
+        body.update(executionArn=executions[0]['executionArn'], startDate=executions[0]['startDate'])
+    else:
+        body['executions'] = executions
+    return response(200, body)
+
+
+@profiling.profiled('dev-trigger-workflow')
 def lambda_handler(event, context):
     """
-    Triggers the startup matching Step Functions state machine
-    
+    Triggers the startup matching workflow
+
     Expected input from API Gateway:
     {
         "body": "{\"investor_id\": \"user123\", \"email\": \"user@example.com\"}"
     }
+    or, for several investors, {"investors": [{"investor_id": ..., "email": ...}, ...]}.
+    An optional "mode" ("interactive" or "bulk") overrides the choice by request size.
     """
-    
+
     print(f"Received event: {json.dumps(event)}")
-    
+
     try:
-        # Parse the incoming request body
+        # Parse the incoming request body (base64-encoded when its Content-Type is a binary media type)
+        try:
+            compression.decode_request_body(event)
+        except ValueError:
+            return response(400, {'error': 'Request body is not valid base64-encoded UTF-8'})
         if isinstance(event.get('body'), str):
             body = json.loads(event['body'])
         else:
-            body = event.get('body', {})
-        
-        investor_id = body.get('investor_id')
-        email = body.get('email')
-        
-        # Validate required fields
-        if not investor_id:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'error': 'Missing required field: investor_id'
-                })
-            }
-        
-        if not email:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'error': 'Missing required field: email'
-                })
-            }
-        
-        # Get the state machine ARN from environment variable
-        state_machine_arn = os.environ.get('STATE_MACHINE_ARN')
-        
-        if not state_machine_arn:
-            # If not set as environment variable, you can hardcode it here temporarily
-            # Get the ARN from your Step Functions console
-            return {
-                'statusCode': 500,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'error': 'STATE_MACHINE_ARN not configured. Please set environment variable.'
-                })
-            }
-        
-        print(f"Starting execution for investor: {investor_id}, email: {email}")
-        
-        # Prepare input for Step Functions
-        step_functions_input = {
-            'investor_id': investor_id,
-            'email': email
-        }
-        
-        # Start the Step Functions execution
-        response = stepfunctions.start_execution(
-            stateMachineArn=state_machine_arn,
-            name=f"matching-{investor_id}-{int(datetime.now().timestamp())}",  # Unique execution name
-            input=json.dumps(step_functions_input)
-        )
-        
-        print(f"Step Functions execution started: {response['executionArn']}")
-        
-        # Return success response
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Content-Type': 'application/json'
-            },
-            'body': json.dumps({
-                'message': 'Matching process started successfully',
-                'executionArn': response['executionArn'],
-                'startDate': response['startDate'].isoformat() if 'startDate' in response else None
-            })
-        }
-        
+            body = event.get('body') or {}
+
+        try:
+            investors = requested_investors(body)
+            mode = choose_mode(body, investors)
+        except ValueError as e:
+            return response(400, {'error': str(e)})
+
+        if mode == 'interactive':
+            return run_interactive(investors[0])
+        return run_bulk(investors)
+
     except stepfunctions.exceptions.ExecutionAlreadyExists:
-        return {
-            'statusCode': 409,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Content-Type': 'application/json'
-            },
-            'body': json.dumps({
-                'error': 'An execution is already in progress. Please wait a moment and try again.'
-            })
-        }
-        
+        return response(409, {'error': 'An execution is already in progress. Please wait a moment and try again.'})
+
     except Exception as e:
         print(f"Error starting Step Functions execution: {str(e)}")
         import traceback
         traceback.print_exc()
-        
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Content-Type': 'application/json'
-            },
-            'body': json.dumps({
-                'error': f'Internal server error: {str(e)}'
-            })
-        }
+
+        return response(500, {'error': f'Internal server error: {str(e)}'})
 
 
 # For local testing
@@ -142,7 +214,6 @@ if __name__ == "__main__":
             'email': 'test@example.com'
         })
     }
-    
+
     result = lambda_handler(test_event, None)
     print(json.dumps(result, indent=2))
-
@@ -4,28 +4,63 @@ Purpose: Send email with actual startup recommendations via SES
 """
 
 import json
-import boto3
+import os
+import sys
 from botocore.exceptions import ClientError
 
-ses = boto3.client('ses', region_name='eu-north-1')
-dynamodb = boto3.resource('dynamodb')
+# Shared modules are bundled next to index.py at deploy time; fall back to the source tree locally
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import aws_clients
+import capacity
+import ddb_batch
+import payloads
+import profiling
+import seen_set
+
+ses = aws_clients.lazy_client('ses', region_name='eu-north-1')
+# Runs inside the workflow, not on the API path: paced like the other background jobs
+dynamodb = capacity.tracked(aws_clients.lazy_resource('dynamodb'), capacity.BACKGROUND, 'workflow.email')
 
 STARTUPS_TABLE = 'startup-investor-platform-dev-startups'
+INVESTORS_TABLE = os.environ.get('INVESTORS_TABLE', 'startup-investor-platform-dev-investors')
 
 def get_startup_details(startup_ids):
-    """Fetch full startup details from DynamoDB"""
-    table = dynamodb.Table(STARTUPS_TABLE)
-    startups = []
-    
-    for startup_id in startup_ids:
-        try:
-            response = table.get_item(Key={'startup_id': startup_id})
-            if 'Item' in response:
-                startups.append(response['Item'])
-        except Exception as e:
-            print(f"Error fetching startup {startup_id}: {str(e)}")
-    
-    return startups
+    """Fetch full startup details from DynamoDB (one BatchGetItem per 100 IDs), in match order"""
+    try:
+        items = ddb_batch.batch_get_items(
+            dynamodb, STARTUPS_TABLE, [{'startup_id': startup_id} for startup_id in startup_ids]
+        )
+    except Exception as e:
+        print(f"Error fetching startups: {str(e)}")
+        return []
+    by_id = {item['startup_id']: item for item in items}
+    # Startups removed since matching are skipped
+    return [by_id[startup_id] for startup_id in startup_ids if startup_id in by_id]
+
+def record_seen(investor_id, startup_ids):
+    """
+    Add the emailed investor's new matches to their seen-set. Runs only after
+    SES accepted the email, so a failed send leaves them to be sent again.
+    """
+    table = dynamodb.Table(INVESTORS_TABLE)
+    try:
+        response = table.get_item(
+            Key={'investor_id': investor_id},
+            ProjectionExpression=seen_set.SEEN_ATTRIBUTE
+        )
+        seen = seen_set.SeenSet.from_item(response.get('Item', {}))
+        seen.add(startup_ids)
+        table.update_item(
+            Key={'investor_id': investor_id},
+            UpdateExpression=f'SET {seen_set.SEEN_ATTRIBUTE} = :seen',
+            ConditionExpression='attribute_exists(investor_id)',
+            ExpressionAttributeValues={':seen': seen.to_bytes()}
+        )
+        return True
+    except Exception as e:
+        # The email went out; at worst these startups are listed again next time
+        print(f"⚠️ Could not update the seen-set for {investor_id}: {str(e)}")
+        return False
 
 def format_startup_html(startup):
     """Format a single startup as HTML"""
@@ -122,9 +157,13 @@ def create_email_html(startups, investor_email):
     
     return html_body
 
+@profiling.profiled('send-email-notif')
+@capacity.metered('send-email-notif')
 def lambda_handler(event, context):
     """
-    Send email with startup recommendations
+    Send email with startup recommendations. The startup IDs come inline
+    (matches) or, from the interactive workflow, as the S3 key of the
+    matcher's output (matches_key)
     """
     
     print(f"Received event: {json.dumps(event)}")
@@ -133,6 +172,12 @@ def lambda_handler(event, context):
         investor_id = event.get('investor_id')
         email = event.get('email')
         matches = event.get('matches', [])
+        # Startups to record as notified once the email is sent (interactive workflow only)
+        new_matches = []
+        if event.get('matches_key'):
+            payload = payloads.load(event['matches_key'])
+            matches = payload['email_matches']
+            new_matches = payload.get('new_matches', [])
         
         if not email:
             raise ValueError("Email address is required")
@@ -201,6 +246,9 @@ The Startup Investor Platform Team"""
         
         print(f"Email sent successfully! MessageId: {response['MessageId']}")
         
+        if investor_id and new_matches:
+            record_seen(investor_id, new_matches)
+        
         return {
             'statusCode': 200,
             'body': json.dumps({
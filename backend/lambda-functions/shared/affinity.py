@@ -0,0 +1,204 @@
+"""
+Shared module: affinity
+Purpose: Startup-to-startup co-occurrence built from investor behaviour
+(bookmarks, contact requests), used to re-rank matches
+
+snapshot-builder replays the events table (see events.py) into one set of
+interacted startups per investor and counts how often two startups share an
+investor. Contacts weigh more than bookmarks, and later unbookmarks cancel
+bookmarks. Scores are cosine-normalised, and only the top AFFINITY_NEIGHBOURS
+per startup are kept. The result is stored as a compressed-sparse-row
+snapshot: ids, row offsets, neighbour indices and 16-bit scores, read with
+array.frombytes. Re-ranking one investor therefore touches
+len(bookmarks) * AFFINITY_NEIGHBOURS entries, no matter how big the catalogue is.
+"""
+
+import heapq
+import math
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import defaultdict
+
+import snapshots
+
+SNAPSHOT_NAME = 'affinity.bin'
+AFFINITY_NEIGHBOURS = int(os.environ.get('AFFINITY_NEIGHBOURS', '50'))
+# Cap per investor so one heavy user cannot dominate (or blow up) the pair count
+MAX_INTERACTIONS_PER_INVESTOR = int(os.environ.get('AFFINITY_MAX_INTERACTIONS', '200'))
+# Re-rank matches with the snapshot when one is published ('0' disables)
+AFFINITY_RERANK = os.environ.get('AFFINITY_RERANK', '1') != '0'
+
+EVENT_WEIGHTS = {'bookmark': 1.0, 'contact': 2.0}
+
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<2sBIII')  # magic, version, startups, entries, built_at
+SCORE_SCALE = 65535
+
+
+def _le(values):
+    """array -> little-endian bytes"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def interactions(events):
+    """
+    {investor_id: {startup_id: weight}} from event items, replayed in
+    event_key (chronological) order per investor
+    """
+    by_investor = defaultdict(list)
+    for event in events:
+        by_investor[event['investor_id']].append(event)
+
+    result = {}
+    for investor_id, investor_events in by_investor.items():
+        investor_events.sort(key=lambda e: e['event_key'])
+        weights = {}
+        for event in investor_events:
+            startup_id = event['startup_id']
+            event_type = event['event_type']
+            if event_type == 'unbookmark':
+                # A contact request still counts after the bookmark is removed
+                if weights.get(startup_id, 0) <= EVENT_WEIGHTS['bookmark']:
+                    weights.pop(startup_id, None)
+                continue
+            weight = EVENT_WEIGHTS.get(event_type)
+            if weight:
+                weights[startup_id] = max(weights.get(startup_id, 0), weight)
+                # Re-insert so dict order follows the latest interaction
+                weights[startup_id] = weights.pop(startup_id)
+        if len(weights) > MAX_INTERACTIONS_PER_INVESTOR:
+            weights = dict(list(weights.items())[-MAX_INTERACTIONS_PER_INVESTOR:])
+        if len(weights) > 1:
+            result[investor_id] = weights
+    return result
+
+
+class AffinityMatrix:
+    """Sparse startup x startup affinity (CSR), at most AFFINITY_NEIGHBOURS per row"""
+
+    def __init__(self, ids, indptr, indices, scores, built_at=0):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+        self.scores = scores
+        self.built_at = int(built_at)
+        self.row = {startup_id: i for i, startup_id in enumerate(ids)}
+
+    @classmethod
+    def build(cls, events, neighbours=None, built_at=0):
+        neighbours = neighbours or AFFINITY_NEIGHBOURS
+        co_occurrence = defaultdict(lambda: defaultdict(float))
+        norms = defaultdict(float)
+        for weights in interactions(events).values():
+            items = list(weights.items())
+            for i, (a, wa) in enumerate(items):
+                norms[a] += wa * wa
+                row = co_occurrence[a]
+                for b, wb in items[i + 1:]:
+                    row[b] += wa * wb
+                    co_occurrence[b][a] += wa * wb
+
+        ids = sorted(co_occurrence)
+        position = {startup_id: i for i, startup_id in enumerate(ids)}
+        indptr, indices, scores = array('I', [0]), array('I'), array('H')
+        for startup_id in ids:
+            row = co_occurrence[startup_id]
+            norm = norms[startup_id]
+            ranked = heapq.nlargest(
+                neighbours,
+                ((count / math.sqrt(norm * norms[other]), other) for other, count in row.items())
+            )
+            for score, other in ranked:
+                indices.append(position[other])
+                scores.append(max(1, min(SCORE_SCALE, int(round(score * SCORE_SCALE)))))
+            indptr.append(len(indices))
+        return cls(ids, indptr, indices, scores, built_at)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, count, entries, built_at = HEADER.unpack_from(data)
+        if magic != b'AF' or version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported affinity snapshot (magic {magic!r}, version {version})')
+        offset = HEADER.size
+        (ids_length,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+        names = zlib.decompress(data[offset:offset + ids_length]).decode('utf-8')
+        ids = names.split('\n') if count else []
+        offset += ids_length
+        indptr = _from_le('I', data[offset:offset + 4 * (count + 1)])
+        offset += 4 * (count + 1)
+        indices = _from_le('I', data[offset:offset + 4 * entries])
+        offset += 4 * entries
+        scores = _from_le('H', data[offset:offset + 2 * entries])
+        return cls(ids, indptr, indices, scores, built_at)
+
+    def to_bytes(self):
+        names = zlib.compress('\n'.join(self.ids).encode('utf-8'), 6)
+        return b''.join([
+            HEADER.pack(b'AF', FORMAT_VERSION, len(self.ids), len(self.indices), self.built_at),
+            struct.pack('<I', len(names)), names,
+            _le(self.indptr), _le(self.indices), _le(self.scores),
+        ])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def neighbours(self, startup_id):
+        """[(startup_id, score)] best first"""
+        row = self.row.get(startup_id)
+        if row is None:
+            return []
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return [(self.ids[self.indices[j]], self.scores[j] / SCORE_SCALE) for j in range(start, end)]
+
+    def scores_for(self, seeds):
+        """{startup_id: summed affinity to the seed startups}"""
+        totals = defaultdict(float)
+        ids, indptr, indices, scores = self.ids, self.indptr, self.indices, self.scores
+        for seed in seeds:
+            row = self.row.get(seed)
+            if row is None:
+                continue
+            for j in range(indptr[row], indptr[row + 1]):
+                totals[ids[indices[j]]] += scores[j]
+        return {startup_id: total / SCORE_SCALE for startup_id, total in totals.items()}
+
+
+def current_matrix():
+    """The published affinity snapshot for this container, or None"""
+    return snapshots.load(SNAPSHOT_NAME, AffinityMatrix.from_bytes)
+
+
+def matrix_for_matching():
+    """The snapshot to re-rank with, or None; load errors never fail matching"""
+    if not AFFINITY_RERANK or not snapshots.SNAPSHOT_BUCKET:
+        return None
+    try:
+        return current_matrix()
+    except Exception as e:
+        print(f"⚠️ Affinity snapshot unavailable, ranking without it: {str(e)}")
+        return None
+
+
+def investor_scorer(matrix, investor):
+    """startup_id -> affinity with the investor's bookmarks, for matching.match_investor; or None"""
+    if matrix is None or not investor.get('bookmarks'):
+        return None
+    totals = matrix.scores_for(investor['bookmarks'])
+    if not totals:
+        return None
+    return lambda startup_id: totals.get(startup_id, 0.0)
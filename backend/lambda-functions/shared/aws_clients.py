@@ -0,0 +1,136 @@
+"""
+Shared module: aws_clients
+Purpose: Lazily create boto3 sessions, clients and resources once per
+container and reuse them across warm invocations
+
+Bundled into every Lambda package by deploy-lambdas.sh. boto3 itself is only
+imported when the first client is actually needed, which keeps it out of the
+import phase of the cold start.
+
+Usage in a handler:
+    import aws_clients
+    dynamodb = aws_clients.lazy_resource('dynamodb')
+    ses_client = aws_clients.lazy_client('ses')
+"""
+
+import os
+import threading
+
+# botocore tuning - override per function through environment variables
+CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', '2'))
+READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', '10'))
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '25'))
+MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+
+# Synchronous Lambda invokes wait for the whole matcher run
+SERVICE_READ_TIMEOUTS = {
+    'lambda': float(os.environ.get('AWS_LAMBDA_READ_TIMEOUT', '60')),
+    'stepfunctions': float(os.environ.get('AWS_STEPFUNCTIONS_READ_TIMEOUT', '60')),
+}
+
+_lock = threading.RLock()
+_session = None
+_clients = {}
+_resources = {}
+
+# Optional replacement factory (local stand-ins); must expose client()/resource()
+_factory = None
+
+
+def _config(service_name):
+    from botocore.config import Config
+
+    return Config(
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=SERVICE_READ_TIMEOUTS.get(service_name, READ_TIMEOUT),
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        retries={'mode': 'adaptive', 'max_attempts': MAX_ATTEMPTS},
+    )
+
+
+def get_session():
+    """Return the process-wide boto3 session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import boto3.session
+                _session = boto3.session.Session()
+    return _session
+
+
+def client(service_name, region_name=None):
+    """Return a cached low-level client for service_name"""
+    key = (service_name, region_name)
+    cached = _clients.get(key)
+    if cached is not None:
+        return cached
+    with _lock:
+        if key not in _clients:
+            if _factory is not None:
+                _clients[key] = _factory.client(service_name, region_name=region_name)
+            else:
+                _clients[key] = get_session().client(
+                    service_name, region_name=region_name, config=_config(service_name))
+        return _clients[key]
+
+
+def resource(service_name, region_name=None):
+    """Return a cached service resource (e.g. dynamodb) for service_name"""
+    key = (service_name, region_name)
+    cached = _resources.get(key)
+    if cached is not None:
+        return cached
+    with _lock:
+        if key not in _resources:
+            if _factory is not None:
+                _resources[key] = _factory.resource(service_name, region_name=region_name)
+            else:
+                _resources[key] = get_session().resource(
+                    service_name, region_name=region_name, config=_config(service_name))
+        return _resources[key]
+
+
+class _LazyProxy:
+    """Module-level stand-in that builds the real object on first attribute access"""
+
+    def __init__(self, getter, service_name, region_name):
+        self._getter = getter
+        self._service_name = service_name
+        self._region_name = region_name
+
+    def __getattr__(self, name):
+        return getattr(self._getter(self._service_name, self._region_name), name)
+
+    def __repr__(self):
+        return f'<lazy {self._getter.__name__} {self._service_name}>'
+
+
+def lazy_client(service_name, region_name=None):
+    return _LazyProxy(client, service_name, region_name)
+
+
+def lazy_resource(service_name, region_name=None):
+    return _LazyProxy(resource, service_name, region_name)
+
+
+def set_factory(factory):
+    """
+    Route every client()/resource() call through factory (e.g. the local
+    stand-ins in backend/benchmarks). Pass None to go back to boto3.
+    """
+    global _factory
+    with _lock:
+        _factory = factory
+        _clients.clear()
+        _resources.clear()
+
+
+def reset():
+    """Drop every cached session/client (simulates a fresh container)"""
+    global _session
+    with _lock:
+        _session = None
+        _clients.clear()
+        _resources.clear()
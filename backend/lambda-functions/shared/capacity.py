@@ -0,0 +1,321 @@
+"""
+Shared module: capacity
+Purpose: DynamoDB data-access wrapper that attributes consumed capacity to
+callers and paces background work with an adaptive client-side token bucket
+
+tracked(dynamodb, priority) wraps a dynamodb resource. Every table and
+batch call then asks for ReturnConsumedCapacity. The RCU/WCU it reports,
+plus throttles and time spent waiting, are recorded per (caller, operation,
+table). The caller is the logical unit of work, set with caller('...'):
+an API endpoint or a matcher stage. metered(function_name) wraps a
+lambda_handler to reset the counters per invocation and print them at the
+end as CloudWatch Embedded Metric Format lines (metrics without API calls).
+
+Pacing: BACKGROUND callers (matcher, digest, snapshot builds) draw from one
+token bucket per container for reads and one for writes, refilled at
+DDB_BACKGROUND_RCU_PER_SECOND / DDB_BACKGROUND_WCU_PER_SECOND. A call waits
+while the bucket is empty and is debited with what it actually consumed
+afterwards. Any throttle signal halves the refill rate: a throttling error,
+botocore retries, or unprocessed batch items. The rate then climbs back
+linearly over DDB_BACKGROUND_RECOVERY_SECONDS. INTERACTIVE callers (API
+requests) are never delayed. Background jobs therefore stay under their
+budget and give way first when the table runs hot.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+# Per-container budgets for background callers (capacity units per second, 0 = unpaced)
+BACKGROUND_RCU_PER_SECOND = float(os.environ.get('DDB_BACKGROUND_RCU_PER_SECOND', '1000'))
+BACKGROUND_WCU_PER_SECOND = float(os.environ.get('DDB_BACKGROUND_WCU_PER_SECOND', '500'))
+RECOVERY_SECONDS = float(os.environ.get('DDB_BACKGROUND_RECOVERY_SECONDS', '30'))
+# Never slow down below this share of the budget
+MIN_RATE_FRACTION = 0.05
+BACKOFF_FACTOR = 0.5
+
+METRICS_ENABLED = os.environ.get('CAPACITY_METRICS', '1') != '0'
+METRICS_NAMESPACE = os.environ.get('CAPACITY_METRICS_NAMESPACE', 'StartupInvestorPlatform/DynamoDB')
+
+THROTTLE_CODES = ('ProvisionedThroughputExceededException', 'ThrottlingException',
+                  'RequestLimitExceeded', 'TooManyRequestsException')
+
+
+class TokenBucket:
+    """
+    Capacity units per second with additive-increase / multiplicative-decrease
+    of the refill rate. Callers wait for a non-negative balance, then pay the
+    actual cost afterwards (unknown up front), so the balance may go negative.
+    """
+
+    def __init__(self, max_rate, recovery_seconds=None, clock=time.monotonic, sleep=time.sleep):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.recovery_seconds = RECOVERY_SECONDS if recovery_seconds is None else recovery_seconds
+        # Start empty: a cold container must not open with a full second's burst
+        self.tokens = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rate < self.max_rate and self.recovery_seconds:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * elapsed / self.recovery_seconds)
+        # At most one second of budget can be banked
+        self.tokens = min(self.rate, self.tokens + self.rate * elapsed)
+
+    def acquire(self):
+        """Block until the balance is non-negative; returns seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self.tokens >= 0:
+                    return waited
+                delay = -self.tokens / self.rate
+            self._sleep(delay)
+            waited += delay
+
+    def consume(self, units):
+        with self._lock:
+            self._refill(self._clock())
+            self.tokens -= units
+
+    def throttled(self):
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate * BACKOFF_FACTOR)
+            self.tokens = min(self.tokens, 0.0)
+
+
+_buckets = {}
+_lock = threading.Lock()
+
+# Per-invocation counters: (caller, operation, table) -> totals
+_metrics = defaultdict(lambda: {'requests': 0, 'rcu': 0.0, 'wcu': 0.0, 'throttled': 0, 'wait_ms': 0.0})
+# Lambdas run one invocation at a time; worker threads (ddb_batch) inherit the caller
+_caller = {'name': None}
+
+
+def bucket(kind):
+    """The container's background bucket for 'read' or 'write' (None when unpaced)"""
+    rate = BACKGROUND_RCU_PER_SECOND if kind == 'read' else BACKGROUND_WCU_PER_SECOND
+    if not rate:
+        return None
+    with _lock:
+        if kind not in _buckets:
+            _buckets[kind] = TokenBucket(rate)
+        return _buckets[kind]
+
+
+def _slow_down():
+    """A throttle anywhere in this container slows both background buckets"""
+    for kind in ('read', 'write'):
+        background = bucket(kind)
+        if background:
+            background.throttled()
+
+
+class caller(contextlib.ContextDecorator):
+    """Names the logical caller for the calls inside it (context manager or decorator)"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.previous = _caller['name']
+        _caller['name'] = self.name
+        return self
+
+    def __exit__(self, *exc):
+        _caller['name'] = self.previous
+        return False
+
+
+def set_caller(name):
+    _caller['name'] = name
+
+
+def _consumed_units(response):
+    consumed = response.get('ConsumedCapacity')
+    if not consumed:
+        return 0.0
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(float(entry.get('CapacityUnits', 0)) for entry in consumed)
+
+
+def _throttle_signal(response):
+    retries = response.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+    return bool(retries or response.get('UnprocessedKeys') or response.get('UnprocessedItems'))
+
+
+class _Tracked:
+    def __init__(self, priority, default_caller):
+        self._priority = priority
+        self._default_caller = default_caller
+
+    def _call(self, operation, table_name, kind, method, kwargs):
+        background = bucket(kind) if self._priority == BACKGROUND else None
+        waited = background.acquire() if background else 0.0
+        kwargs.setdefault('ReturnConsumedCapacity', 'TOTAL')
+        key = (_caller['name'] or self._default_caller, operation, table_name)
+        try:
+            response = method(**kwargs)
+        except Exception as e:
+            code = getattr(e, 'response', {}).get('Error', {}).get('Code')
+            if code in THROTTLE_CODES:
+                _slow_down()
+                with _lock:
+                    entry = _metrics[key]
+                    entry['requests'] += 1
+                    entry['throttled'] += 1
+                    entry['wait_ms'] += waited * 1000.0
+            raise
+
+        units = _consumed_units(response)
+        signal = _throttle_signal(response)
+        if background and units:
+            background.consume(units)
+        if signal:
+            _slow_down()
+        with _lock:
+            entry = _metrics[key]
+            entry['requests'] += 1
+            entry['rcu' if kind == 'read' else 'wcu'] += units
+            entry['throttled'] += 1 if signal else 0
+            entry['wait_ms'] += waited * 1000.0
+        return response
+
+
+class TrackedTable(_Tracked):
+    """boto3 Table whose reads/writes are accounted (and paced for background callers)"""
+
+    def __init__(self, table, priority, default_caller):
+        super().__init__(priority, default_caller)
+        self._table = table
+
+    def get_item(self, **kwargs):
+        return self._call('GetItem', self._table.name, 'read', self._table.get_item, kwargs)
+
+    def query(self, **kwargs):
+        return self._call('Query', self._table.name, 'read', self._table.query, kwargs)
+
+    def scan(self, **kwargs):
+        return self._call('Scan', self._table.name, 'read', self._table.scan, kwargs)
+
+    def put_item(self, **kwargs):
+        return self._call('PutItem', self._table.name, 'write', self._table.put_item, kwargs)
+
+    def update_item(self, **kwargs):
+        return self._call('UpdateItem', self._table.name, 'write', self._table.update_item, kwargs)
+
+    def delete_item(self, **kwargs):
+        return self._call('DeleteItem', self._table.name, 'write', self._table.delete_item, kwargs)
+
+    def __getattr__(self, name):
+        # Everything else (name, batch_writer, meta, ...) is the plain table
+        return getattr(self._table, name)
+
+
+class TrackedResource(_Tracked):
+    """dynamodb resource wrapper: Table() and the batch calls go through the accounting"""
+
+    def __init__(self, resource, priority, default_caller):
+        super().__init__(priority, default_caller)
+        self._resource = resource
+
+    def Table(self, name):
+        return TrackedTable(self._resource.Table(name), self._priority, self._default_caller)
+
+    def batch_get_item(self, **kwargs):
+        table_name = ','.join(kwargs.get('RequestItems', {}))
+        return self._call('BatchGetItem', table_name, 'read', self._resource.batch_get_item, kwargs)
+
+    def batch_write_item(self, **kwargs):
+        table_name = ','.join(kwargs.get('RequestItems', {}))
+        return self._call('BatchWriteItem', table_name, 'write', self._resource.batch_write_item, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._resource, name)
+
+
+def tracked(resource, priority=INTERACTIVE, default_caller='unattributed'):
+    return TrackedResource(resource, priority, default_caller)
+
+
+def snapshot():
+    """Copy of this invocation's counters: {(caller, operation, table): totals}"""
+    with _lock:
+        return {key: dict(values) for key, values in _metrics.items()}
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
+    _caller['name'] = None
+
+
+# The metric declaration is the same for every record; encoded once
+_METRICS_DIRECTIVE = json.dumps([{
+    'Namespace': METRICS_NAMESPACE,
+    'Dimensions': [['Function'], ['Function', 'Caller']],
+    'Metrics': [
+        {'Name': 'ConsumedRCU', 'Unit': 'Count'},
+        {'Name': 'ConsumedWCU', 'Unit': 'Count'},
+        {'Name': 'Requests', 'Unit': 'Count'},
+        {'Name': 'Throttled', 'Unit': 'Count'},
+        {'Name': 'ThrottleWaitMs', 'Unit': 'Milliseconds'},
+    ],
+}])
+
+
+def emit(function_name):
+    """Print one CloudWatch EMF record per caller for this invocation"""
+    by_caller = {}
+    with _lock:
+        for (caller_name, operation, table_name), values in _metrics.items():
+            record = by_caller.get(caller_name)
+            if record is None:
+                record = by_caller[caller_name] = {
+                    'Function': function_name, 'Caller': caller_name, 'ConsumedRCU': 0.0, 'ConsumedWCU': 0.0,
+                    'Requests': 0, 'Throttled': 0, 'ThrottleWaitMs': 0.0, 'Operations': []
+                }
+            record['ConsumedRCU'] += values['rcu']
+            record['ConsumedWCU'] += values['wcu']
+            record['Requests'] += values['requests']
+            record['Throttled'] += values['throttled']
+            record['ThrottleWaitMs'] += values['wait_ms']
+            # Searchable in the log, not a metric dimension
+            record['Operations'].append(f'{operation} {table_name}')
+    if not by_caller:
+        return
+
+    prefix = f'{{"_aws": {{"Timestamp": {int(time.time() * 1000)}, "CloudWatchMetrics": {_METRICS_DIRECTIVE}}}, '
+    for record in by_caller.values():
+        print(prefix + json.dumps(record)[1:])
+
+
+def metered(function_name):
+    """Decorator for lambda_handler: fresh counters per invocation, EMF metrics at the end"""
+    def decorate(handler):
+        @functools.wraps(handler)
+        def run(event, context):
+            reset()
+            try:
+                return handler(event, context)
+            finally:
+                if METRICS_ENABLED:
+                    emit(function_name)
+        return run
+    return decorate
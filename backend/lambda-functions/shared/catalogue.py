@@ -0,0 +1,78 @@
+"""
+Shared module: catalogue
+Purpose: Per-container cache of startup summaries, used to hydrate compact
+references to startups (stored recommendations, bookmarks) at read time
+
+Entries expire after CATALOGUE_TTL_SECONDS, so renames show up within that
+window without touching the items that reference the startup. Misses are
+fetched with one projected BatchGetItem per 100 keys.
+"""
+
+import os
+import threading
+import time
+
+import ddb_batch
+
+CATALOGUE_TTL_SECONDS = float(os.environ.get('CATALOGUE_TTL_SECONDS', '300'))
+CATALOGUE_MAX_ENTRIES = int(os.environ.get('CATALOGUE_MAX_ENTRIES', '50000'))
+
+SUMMARY_FIELDS = ('startup_id', 'name', 'industry', 'funding_stage')
+
+
+class Catalogue:
+    """Startup summaries keyed by startup_id, loaded lazily and kept for the TTL"""
+
+    def __init__(self, dynamodb, table_name, ttl=None, max_entries=None):
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+        self.ttl = CATALOGUE_TTL_SECONDS if ttl is None else ttl
+        self.max_entries = max_entries or CATALOGUE_MAX_ENTRIES
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _store(self, startups, now):
+        with self._lock:
+            for startup in startups:
+                summary = {field: startup[field] for field in SUMMARY_FIELDS if field in startup}
+                self._entries.pop(summary['startup_id'], None)
+                self._entries[summary['startup_id']] = (now, summary)
+            # Dicts keep insertion order, so the first entries are the oldest
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                for startup_id in list(self._entries)[:overflow]:
+                    del self._entries[startup_id]
+
+    def prime(self, startups):
+        """Seed the cache from items the caller already loaded (e.g. a full scan)"""
+        self._store(startups, time.monotonic())
+
+    def get_many(self, startup_ids):
+        """Returns {startup_id: summary} for the ids that exist"""
+        now = time.monotonic()
+        found = {}
+        missing = []
+        with self._lock:
+            for startup_id in startup_ids:
+                entry = self._entries.get(startup_id)
+                if entry and now - entry[0] < self.ttl:
+                    found[startup_id] = entry[1]
+                else:
+                    missing.append(startup_id)
+
+        if missing:
+            names = {f'#{field}': field for field in SUMMARY_FIELDS}
+            items = ddb_batch.batch_get_items(
+                self.dynamodb, self.table_name,
+                [{'startup_id': startup_id} for startup_id in missing],
+                projection_expression=', '.join(names),
+                expression_attribute_names=names
+            )
+            self._store(items, now)
+            for item in items:
+                found[item['startup_id']] = {field: item[field] for field in SUMMARY_FIELDS if field in item}
+        return found
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,156 @@
+"""
+Shared module: compression
+Purpose: Accept-Encoding negotiation and gzip/brotli compression of API
+Gateway proxy responses, plus an incremental gzip writer for NDJSON exports
+
+compress_response() takes a finished response (JSON body as a string). When
+the client accepts br or gzip and the body is at least COMPRESS_MIN_BYTES,
+it returns the compressed body base64-encoded (isBase64Encoded) with
+Content-Encoding and Vary headers. Smaller bodies stay plain: below about
+one packet, compressing costs more time than it saves on the wire.
+
+A REST API only turns a base64 body back into bytes when the first media
+type of the request's Accept header is in its binaryMediaTypes; otherwise
+the client gets the base64 text. BINARY_MEDIA_TYPES must list the same
+types, and responses are compressed only for requests that match them.
+The same setting makes API Gateway base64-encode request bodies whose
+Content-Type is listed, so handlers call decode_request_body() first.
+
+brotli is an optional dependency (Lambda layer). Without it only gzip is
+offered.
+"""
+
+import base64
+import gzip
+import io
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1400'))
+# Fast settings: the win is bandwidth, so CPU spent past these levels buys little
+GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', '4'))
+# Upper bound on compressed output still buffered inside zlib (one deflate block)
+PENDING_BYTES = 64 * 1024
+# Mirror of the REST API's binaryMediaTypes ('*/*' matches any Accept type)
+BINARY_MEDIA_TYPES = tuple(media_type.strip().lower() for media_type in os.environ.get(
+    'BINARY_MEDIA_TYPES', 'application/json,application/x-ndjson').split(',') if media_type.strip())
+
+
+def supported():
+    """Encodings this container can produce, preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def header(headers, name):
+    """Case-insensitive header lookup on an API Gateway event's headers"""
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def decode_request_body(event):
+    """Replace a base64-encoded proxy request body with its UTF-8 text; raises ValueError if it is not"""
+    if event.get('isBase64Encoded') and isinstance(event.get('body'), str):
+        event['body'] = base64.b64decode(event['body'], validate=True).decode('utf-8')
+        event['isBase64Encoded'] = False
+    return event
+
+
+def binary_accepted(request_headers):
+    """True when API Gateway will deliver a base64 response body to this client as bytes"""
+    if '*/*' in BINARY_MEDIA_TYPES:
+        return True
+    accept = header(request_headers, 'accept') or ''
+    # API Gateway only looks at the first media type
+    first = accept.split(',')[0].split(';')[0].strip().lower()
+    return first in BINARY_MEDIA_TYPES
+
+
+def negotiate(accept_encoding, offered=None):
+    """
+    Best encoding for an Accept-Encoding value among offered (default:
+    supported()), or None for identity. q-values are honoured; at equal q
+    the server's order wins.
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in offered or supported():
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response, request_headers):
+    """The response with its body compressed for the client, or unchanged"""
+    body = response.get('body')
+    if not isinstance(body, str) or response.get('isBase64Encoded'):
+        return response
+    headers = response.setdefault('headers', {})
+    # Whether a response is compressed depends on Accept too, unless every type is binary
+    headers['Vary'] = 'Accept-Encoding' if '*/*' in BINARY_MEDIA_TYPES else 'Accept, Accept-Encoding'
+    if len(body) < COMPRESS_MIN_BYTES or not binary_accepted(request_headers):
+        return response
+    encoding = negotiate(header(request_headers, 'accept-encoding'))
+    if encoding is None:
+        return response
+    compressed = compress(body.encode('utf-8'), encoding)
+    headers['Content-Encoding'] = encoding
+    response['body'] = base64.b64encode(compressed).decode('ascii')
+    response['isBase64Encoded'] = True
+    return response
+
+
+class GzipWriter:
+    """
+    Incremental gzip (or plain) writer that knows its output size, so an
+    export can stop adding lines before the response size limit.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.buffer = io.BytesIO()
+        # wbits 31: gzip container
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31) if enabled else None
+        self.raw_bytes = 0
+
+    def write(self, data):
+        self.raw_bytes += len(data)
+        self.buffer.write(self._compressor.compress(data) if self.enabled else data)
+
+    def size(self):
+        """
+        Output bytes so far. With gzip, one deflate block may still be
+        pending inside zlib; it compresses to well under PENDING_BYTES.
+        """
+        return self.buffer.tell()
+
+    def close(self):
+        if self.enabled:
+            self.buffer.write(self._compressor.flush())
+        return self.buffer.getvalue()
@@ -0,0 +1,164 @@
+"""
+Shared module: counters
+Purpose: View and contact counters per startup, written as write-sharded
+atomic increments off the request path
+
+Each increment goes to one of COUNTER_SHARDS items per startup and time
+window (counter_id = '<startup_id>#<shard>', window_start = the start of the
+COUNTER_WINDOW_SECONDS bucket), so a burst on one popular startup spreads
+over several partition keys instead of hammering one. Readers sum the shards
+(see trending.py).
+
+Requests only bump an in-memory tally. Increments to the same startup and
+window are coalesced, and the tally is written with one UpdateItem ADD per
+key once COUNTER_BATCH_SIZE keys are pending or the oldest is
+COUNTER_FLUSH_SECONDS old, at the end of the request that finds it due
+(like events.EventBuffer). Most requests write nothing; the one that
+flushes issues its (up to COUNTER_BATCH_SIZE) small writes concurrently
+on COUNTER_FLUSH_WORKERS threads, so it costs about one round-trip. The
+flush finishes before the handler returns, so it is never frozen half-way
+with the container and its capacity is attributed to the caller set
+around it.
+Failed increments are merged back and retried; counts still buffered when
+a container is reclaimed are lost, which is acceptable for a popularity
+signal.
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+COUNTERS_TABLE = os.environ.get('COUNTERS_TABLE', 'startup-investor-platform-dev-startup-counters')
+COUNTER_SHARDS = int(os.environ.get('COUNTER_SHARDS', '8'))
+COUNTER_WINDOW_SECONDS = int(os.environ.get('COUNTER_WINDOW_SECONDS', '3600'))
+COUNTER_BATCH_SIZE = int(os.environ.get('COUNTER_BATCH_SIZE', '25'))
+COUNTER_FLUSH_SECONDS = float(os.environ.get('COUNTER_FLUSH_SECONDS', '10'))
+COUNTER_FLUSH_WORKERS = int(os.environ.get('COUNTER_FLUSH_WORKERS', '8'))
+COUNTER_TTL_DAYS = int(os.environ.get('COUNTER_TTL_DAYS', '8'))
+
+VIEWS = 'views'
+CONTACTS = 'contacts'
+COUNTER_FIELDS = (VIEWS, CONTACTS)
+
+# Keep memory bounded if writes keep failing
+MAX_PENDING_KEYS = 5000
+
+
+def window_start(now=None):
+    now = time.time() if now is None else now
+    return int(now) // COUNTER_WINDOW_SECONDS * COUNTER_WINDOW_SECONDS
+
+
+def counter_id(startup_id, shard):
+    return f'{startup_id}#{shard:02d}'
+
+
+class CounterBuffer:
+    """Per-container tally of (startup_id, window_start) -> {field: count}, flushed in batches"""
+
+    def __init__(self, dynamodb, table_name=None, shards=None, batch_size=None, flush_seconds=None,
+                 workers=None):
+        self.dynamodb = dynamodb
+        self.table_name = table_name or COUNTERS_TABLE
+        self.shards = shards or COUNTER_SHARDS
+        self.batch_size = batch_size or COUNTER_BATCH_SIZE
+        self.flush_seconds = COUNTER_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.workers = workers or COUNTER_FLUSH_WORKERS
+        # Created on the first flush and kept, so later flushes do not pay for new threads
+        self._pool = None
+        self._pending = {}
+        self._oldest = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, startup_id, field, count=1):
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f'Unknown counter: {field}')
+        key = (startup_id, window_start())
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            counts = self._pending.get(key)
+            if counts is None:
+                if len(self._pending) >= MAX_PENDING_KEYS:
+                    return
+                counts = self._pending[key] = {}
+            counts[field] = counts.get(field, 0) + count
+
+    def _merge_back(self, entries):
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            for key, counts in entries:
+                merged = self._pending.setdefault(key, {})
+                for field, count in counts.items():
+                    merged[field] = merged.get(field, 0) + count
+
+    def _write(self, startup_id, window, counts):
+        names = {'#startup_id': 'startup_id', '#expiration_time': 'expiration_time'}
+        values = {':startup_id': startup_id,
+                  ':expiration_time': Decimal(window + COUNTER_TTL_DAYS * 24 * 3600)}
+        additions = []
+        for field, count in counts.items():
+            names[f'#{field}'] = field
+            values[f':{field}'] = Decimal(count)
+            additions.append(f'#{field} :{field}')
+        self.dynamodb.Table(self.table_name).update_item(
+            Key={'counter_id': counter_id(startup_id, random.randrange(self.shards)),
+                 'window_start': Decimal(window)},
+            UpdateExpression=(f"SET #startup_id = :startup_id, #expiration_time = :expiration_time "
+                              f"ADD {', '.join(additions)}"),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+
+    def flush(self):
+        """
+        Write everything pending now, one concurrent UpdateItem per key;
+        returns the number of keys written. Raises the first error after
+        every write has finished.
+        """
+        with self._lock:
+            pending, self._pending = list(self._pending.items()), {}
+        if not pending:
+            return 0
+
+        def write(entry):
+            (startup_id, window), counts = entry
+            try:
+                self._write(startup_id, window, counts)
+                return None
+            except Exception as e:
+                return e
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='counters')
+        # map returns once every write has finished: nothing is left running after the flush
+        errors = list(self._pool.map(write, pending))
+        failed = [(entry, error) for entry, error in zip(pending, errors) if error is not None]
+        if failed:
+            # ADD is not idempotent, so only the increments that were not written go back
+            self._merge_back([entry for entry, _ in failed])
+            raise failed[0][1]
+        return len(pending)
+
+    def due(self):
+        if not self._pending:
+            return False
+        return (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.flush_seconds)
+
+    def flush_if_due(self):
+        """Flush when a batch is full or old enough; never raises (counts are kept for the next try)"""
+        if not self.due():
+            return 0
+        try:
+            return self.flush()
+        except Exception as e:
+            print(f"⚠️ Could not write {len(self._pending)} counter(s), will retry: {str(e)}")
+            return 0
@@ -0,0 +1,209 @@
+"""
+Shared module: ddb_batch
+Purpose: Chunked DynamoDB BatchGetItem / BatchWriteItem helpers that retry
+unprocessed keys with exponential backoff
+
+batch_get_items / batch_write_items raise when keys stay unprocessed (jobs
+and imports). The *_partial variants report them per key instead, for
+request handlers that answer with a per-item status.
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# DynamoDB hard limits per request
+MAX_BATCH_GET = 100
+MAX_BATCH_WRITE = 25
+
+MAX_RETRIES = 8
+DEFAULT_WRITE_WORKERS = 8
+BASE_BACKOFF_SECONDS = 0.05
+MAX_BACKOFF_SECONDS = 2.0
+
+
+def _backoff(attempt):
+    """Full-jitter exponential backoff"""
+    delay = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * (2 ** attempt))
+    time.sleep(random.uniform(0, delay))
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _unique_keys(keys):
+    unique = []
+    seen = set()
+    for key in keys:
+        marker = tuple(sorted(key.items()))
+        if marker not in seen:
+            seen.add(marker)
+            unique.append(key)
+    return unique
+
+
+def _get_chunk(dynamodb, table_name, spec, max_retries):
+    """One BatchGetItem call plus retries; returns (items, keys still unprocessed)"""
+    request = {table_name: spec}
+    items = []
+    attempt = 0
+    while True:
+        response = dynamodb.batch_get_item(RequestItems=request)
+        items.extend(response.get('Responses', {}).get(table_name, []))
+        request = response.get('UnprocessedKeys') or {}
+        if not request:
+            return items, []
+        if attempt >= max_retries:
+            return items, request[table_name]['Keys']
+        _backoff(attempt)
+        attempt += 1
+
+
+def _get_spec(chunk, projection_expression, expression_attribute_names):
+    spec = {'Keys': chunk}
+    if projection_expression:
+        spec['ProjectionExpression'] = projection_expression
+    if expression_attribute_names:
+        spec['ExpressionAttributeNames'] = expression_attribute_names
+    return spec
+
+
+def batch_get_items(dynamodb, table_name, keys, projection_expression=None,
+                    expression_attribute_names=None):
+    """
+    Fetch items by primary key with BatchGetItem.
+
+    keys is a list of key dicts (duplicates are dropped). Returns the found
+    items in no particular order; missing keys are simply absent. Raises
+    RuntimeError if keys are still unprocessed after MAX_RETRIES.
+    """
+    items = []
+    for chunk in chunked(_unique_keys(keys), MAX_BATCH_GET):
+        spec = _get_spec(chunk, projection_expression, expression_attribute_names)
+        found, unprocessed = _get_chunk(dynamodb, table_name, spec, MAX_RETRIES)
+        if unprocessed:
+            raise RuntimeError(f'{len(unprocessed)} keys still unprocessed after {MAX_RETRIES} retries')
+        items.extend(found)
+    return items
+
+
+def batch_get_items_partial(dynamodb, table_name, keys, projection_expression=None,
+                            expression_attribute_names=None, max_retries=MAX_RETRIES):
+    """
+    batch_get_items that never gives up on the whole request: returns
+    (items, failed), where failed lists (key, reason) for keys still
+    unprocessed after max_retries or in a chunk that raised.
+    """
+    items, failed = [], []
+    for chunk in chunked(_unique_keys(keys), MAX_BATCH_GET):
+        spec = _get_spec(chunk, projection_expression, expression_attribute_names)
+        try:
+            found, unprocessed = _get_chunk(dynamodb, table_name, spec, max_retries)
+        except Exception as e:
+            failed.extend((key, str(e)) for key in chunk)
+            continue
+        items.extend(found)
+        failed.extend((key, 'unprocessed') for key in unprocessed)
+    return items, failed
+
+
+def _write_requests(dynamodb, table_name, requests, max_retries):
+    """One BatchWriteItem call plus retries; returns (retry count, requests still unprocessed)"""
+    request = {table_name: requests}
+    attempt = 0
+    while True:
+        response = dynamodb.batch_write_item(RequestItems=request)
+        request = response.get('UnprocessedItems') or {}
+        if not request:
+            return attempt, []
+        if attempt >= max_retries:
+            return attempt, request[table_name]
+        _backoff(attempt)
+        attempt += 1
+
+
+def _write_chunk(dynamodb, table_name, requests):
+    """One BatchWriteItem call plus retries of its unprocessed items; returns retry count"""
+    attempt, unprocessed = _write_requests(dynamodb, table_name, requests, MAX_RETRIES)
+    if unprocessed:
+        raise RuntimeError(f'{len(unprocessed)} items still unprocessed after {MAX_RETRIES} retries')
+    return attempt
+
+
+def batch_put_items_partial(dynamodb, table_name, items, max_retries=MAX_RETRIES):
+    """
+    Put a list of items (unique keys) in chunks of 25 on the calling thread.
+    Returns failed: (item, reason) for items still unprocessed after
+    max_retries or in a chunk that raised; everything else was written.
+    """
+    failed = []
+    for chunk in chunked(items, MAX_BATCH_WRITE):
+        try:
+            _, unprocessed = _write_requests(dynamodb, table_name,
+                                             [{'PutRequest': {'Item': item}} for item in chunk], max_retries)
+        except Exception as e:
+            failed.extend((item, str(e)) for item in chunk)
+            continue
+        failed.extend((request['PutRequest']['Item'], 'unprocessed') for request in unprocessed)
+    return failed
+
+
+def batch_write_items(dynamodb, table_name, items, key_attributes, workers=None, on_chunk=None):
+    """
+    Put items with parallel BatchWriteItem calls (25 items each).
+
+    items may be any iterable (it is consumed lazily, with at most a few
+    chunks per worker in flight). Items sharing a key within one chunk are
+    collapsed to the last one, since DynamoDB rejects duplicate keys in a
+    request. workers=1 writes the chunks sequentially on the calling thread.
+    on_chunk(written, retries) is called after each chunk. Returns
+    (written, retries). Raises RuntimeError if items stay unprocessed after
+    MAX_RETRIES.
+    """
+    workers = workers or DEFAULT_WRITE_WORKERS
+    written = retries = 0
+    pending = []
+
+    def chunks():
+        chunk = {}
+        for item in items:
+            key = tuple(item[attr] for attr in key_attributes)
+            chunk.pop(key, None)
+            chunk[key] = item
+            if len(chunk) == MAX_BATCH_WRITE:
+                yield list(chunk.values())
+                chunk = {}
+        if chunk:
+            yield list(chunk.values())
+
+    def collect(future, size):
+        nonlocal written, retries
+        chunk_retries = future.result()
+        written += size
+        retries += chunk_retries
+        if on_chunk:
+            on_chunk(size, chunk_retries)
+
+    if workers == 1:
+        # Inline, no thread pool: cheapest for the small batches request handlers flush
+        for chunk in chunks():
+            requests = [{'PutRequest': {'Item': item}} for item in chunk]
+            chunk_retries = _write_chunk(dynamodb, table_name, requests)
+            written += len(chunk)
+            retries += chunk_retries
+            if on_chunk:
+                on_chunk(len(chunk), chunk_retries)
+        return written, retries
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks():
+            requests = [{'PutRequest': {'Item': item}} for item in chunk]
+            pending.append((pool.submit(_write_chunk, dynamodb, table_name, requests), len(chunk)))
+            # Bound memory: wait for the oldest chunk once enough are in flight
+            while len(pending) >= workers * 2:
+                collect(*pending.pop(0))
+        for future, size in pending:
+            collect(future, size)
+    return written, retries
@@ -0,0 +1,106 @@
+"""
+Shared module: events
+Purpose: Append-only log of investor interactions with startups (bookmarks,
+contact requests), written in batches
+
+Events are buffered per container and written with BatchWriteItem once
+EVENT_BATCH_SIZE have queued up or the oldest has waited EVENT_FLUSH_SECONDS.
+Callers flush at the end of each invocation (flush_if_due), so a quiet
+container still writes within one request of the deadline. Events still
+buffered when a container is reclaimed are lost; that is acceptable for a
+ranking signal. EVENT_FLUSH_SECONDS=0 writes every event immediately.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import ddb_batch
+
+EVENTS_TABLE = os.environ.get('EVENTS_TABLE', 'startup-investor-platform-dev-events')
+EVENT_BATCH_SIZE = int(os.environ.get('EVENT_BATCH_SIZE', '25'))
+EVENT_FLUSH_SECONDS = float(os.environ.get('EVENT_FLUSH_SECONDS', '5'))
+EVENT_TTL_DAYS = int(os.environ.get('EVENT_TTL_DAYS', '180'))
+
+BOOKMARK = 'bookmark'
+UNBOOKMARK = 'unbookmark'
+CONTACT = 'contact'
+EVENT_TYPES = (BOOKMARK, UNBOOKMARK, CONTACT)
+
+# Keep memory bounded if writes keep failing
+MAX_BUFFERED = 1000
+
+
+def event_item(investor_id, event_type, startup_id, now=None):
+    now = time.time() if now is None else now
+    return {
+        'investor_id': investor_id,
+        'event_key': f'{int(now * 1000):013d}#{os.urandom(4).hex()}',
+        'event_type': event_type,
+        'startup_id': startup_id,
+        'created_at': datetime.utcfromtimestamp(now).isoformat(),
+        'expiration_time': Decimal(int(now) + EVENT_TTL_DAYS * 24 * 3600),
+    }
+
+
+class EventBuffer:
+    """Per-container queue of event items, written with BatchWriteItem"""
+
+    def __init__(self, dynamodb, table_name=None, batch_size=None, flush_seconds=None):
+        self.dynamodb = dynamodb
+        self.table_name = table_name or EVENTS_TABLE
+        self.batch_size = batch_size or EVENT_BATCH_SIZE
+        self.flush_seconds = EVENT_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._pending = []
+        self._oldest = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, investor_id, event_type, startup_id):
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f'Unknown event type: {event_type}')
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(event_item(investor_id, event_type, startup_id))
+            if len(self._pending) > MAX_BUFFERED:
+                dropped = len(self._pending) - MAX_BUFFERED
+                del self._pending[:dropped]
+                print(f"⚠️ Event buffer full, dropped {dropped} oldest event(s)")
+
+    def due(self):
+        if not self._pending:
+            return False
+        return (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.flush_seconds)
+
+    def flush(self):
+        """Write everything buffered; returns the number of events written"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            # Keys are unique per event, so nothing is merged; usually one chunk, so no thread pool
+            written, _ = ddb_batch.batch_write_items(
+                self.dynamodb, self.table_name, pending, ['investor_id', 'event_key'], workers=1
+            )
+        except Exception:
+            with self._lock:
+                self._pending[:0] = pending
+            raise
+        return written
+
+    def flush_if_due(self):
+        """Flush when a batch is full or the oldest event is old enough; never raises"""
+        if not self.due():
+            return 0
+        try:
+            return self.flush()
+        except Exception as e:
+            print(f"⚠️ Could not write {len(self._pending)} event(s), will retry: {str(e)}")
+            return 0
@@ -0,0 +1,164 @@
+"""
+Shared module: funding
+Purpose: Parse free-form funding amounts ("$2.5M", "€800K", "1.2 billion
+GBP", "N/A") into a normalized USD value when startups are written, and
+answer investment-range lookups over a catalogue with a sorted array and
+bisect
+
+The normalized value is stored as funding_amount_usd (with the source
+currency in funding_currency). It is the sort key of FundingAmountIndex
+(hash key funding_stage), so GET /startups range filters are one key-range
+query per stage. Matching uses FundingIndex, built once per run, to keep
+only the startups inside an investor's min_investment..max_investment
+before scoring. Startups whose amount is unknown are never excluded.
+"""
+
+import bisect
+import os
+import re
+from decimal import Decimal
+
+# Approximate USD rates: the value ranks and filters, it is not accounting
+USD_RATES = {
+    'USD': 1.0, 'EUR': 1.08, 'GBP': 1.27, 'CHF': 1.12, 'CAD': 0.73, 'AUD': 0.66, 'NZD': 0.61,
+    'SEK': 0.095, 'NOK': 0.094, 'DKK': 0.145, 'PLN': 0.25, 'JPY': 0.0067, 'CNY': 0.14,
+    'INR': 0.012, 'SGD': 0.74, 'HKD': 0.128, 'ILS': 0.27, 'BRL': 0.18, 'MXN': 0.058, 'AED': 0.27,
+}
+CURRENCY_SYMBOLS = {
+    '$': 'USD', 'us$': 'USD', '€': 'EUR', '£': 'GBP', '¥': 'JPY', '₹': 'INR', '₪': 'ILS',
+    'c$': 'CAD', 'ca$': 'CAD', 'a$': 'AUD', 'au$': 'AUD', 's$': 'SGD', 'r$': 'BRL', 'hk$': 'HKD',
+    'kr': 'SEK', 'fr': 'CHF',
+}
+MAGNITUDES = {
+    'k': 10 ** 3, 'thousand': 10 ** 3,
+    'm': 10 ** 6, 'mm': 10 ** 6, 'mn': 10 ** 6, 'mio': 10 ** 6, 'million': 10 ** 6, 'millions': 10 ** 6,
+    'b': 10 ** 9, 'bn': 10 ** 9, 'billion': 10 ** 9, 'billions': 10 ** 9,
+}
+
+# FundingAmountIndex partitions that an unfiltered range query fans out over
+FUNDING_STAGES = tuple(stage.strip() for stage in os.environ.get(
+    'FUNDING_STAGES', 'Pre-Seed,Seed,Series A,Series B,Series C,Growth').split(','))
+
+# Matching keeps only startups inside the investor's investment range (0 disables)
+RANGE_FILTER = os.environ.get('MATCH_FUNDING_RANGE', '1') != '0'
+
+NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+WORD_RE = re.compile(r'[a-z]+\$?|[$€£¥₹₪]')
+THOUSANDS_RE = re.compile(r'\d{1,3}(?:,\d{3})+(?:\.\d+)?')
+
+
+def _number(text):
+    if THOUSANDS_RE.fullmatch(text):
+        return float(text.replace(',', ''))
+    # '2,5' is a decimal comma
+    return float(text.replace(',', '.', 1).replace(',', ''))
+
+
+def parse_amount(text, default_currency='USD'):
+    """
+    (usd, currency) for a free-form amount, or None when there is no single
+    amount in it ('N/A', 'Undisclosed', ranges like '$1-2M') or when it is
+    negative. usd is a whole-dollar Decimal.
+    """
+    if isinstance(text, (int, float, Decimal)) and not isinstance(text, bool):
+        number = Decimal(str(text)) if isinstance(text, float) else Decimal(text)
+        if not number.is_finite() or number < 0:
+            return None
+        return Decimal(int(number)), default_currency
+    cleaned = str(text or '').strip().lower()
+    numbers = NUMBER_RE.findall(cleaned)
+    if len(numbers) != 1:
+        return None
+    start = cleaned.index(numbers[0])
+    before, after = cleaned[:start], cleaned[start + len(numbers[0]):]
+    # NUMBER_RE and WORD_RE skip signs, so '-5M' or '$-5M' would read as 5M
+    if '-' in before or '\u2212' in before:
+        return None
+
+    currency, magnitude = None, 1
+    for word in WORD_RE.findall(before) + WORD_RE.findall(after):
+        if word in MAGNITUDES and magnitude == 1:
+            magnitude = MAGNITUDES[word]
+        elif word in CURRENCY_SYMBOLS and currency is None:
+            currency = CURRENCY_SYMBOLS[word]
+        elif word.upper() in USD_RATES and currency is None:
+            currency = word.upper()
+        elif word not in ('approx', 'about', 'over', 'raised', 'total'):
+            return None
+    currency = currency or default_currency
+    usd = _number(numbers[0]) * magnitude * USD_RATES[currency]
+    return Decimal(int(round(usd))), currency
+
+
+def amount_usd(startup):
+    """Normalized amount of a catalogue item; legacy items are parsed on the fly"""
+    if 'funding_amount_usd' in startup:
+        return float(startup['funding_amount_usd'])
+    parsed = parse_amount(startup.get('funding_amount', ''))
+    return float(parsed[0]) if parsed else None
+
+
+def investor_range(investor):
+    """
+    (low, high) in USD from min_investment/max_investment, or None if
+    neither is set. Bounds are parsed like funding amounts, so legacy values
+    such as '500K' or '1,000,000' still work; one that does not parse
+    ('', 'N/A') counts as unset.
+    """
+    low, high = (_bound(investor.get(field)) for field in ('min_investment', 'max_investment'))
+    if low is None and high is None:
+        return None
+    return (low if low is not None else 0.0,
+            high if high is not None else float('inf'))
+
+
+def _bound(value):
+    parsed = parse_amount(value) if value is not None else None
+    return float(parsed[0]) if parsed else None
+
+
+class FundingIndex:
+    """Catalogue positions sorted by funding amount, for range lookups with bisect"""
+
+    def __init__(self, startups):
+        self.startups = startups
+        known, self.unknown = [], []
+        for position, startup in enumerate(startups):
+            amount = amount_usd(startup)
+            if amount is None:
+                self.unknown.append(position)
+            else:
+                known.append((amount, position))
+        known.sort()
+        self.amounts = [amount for amount, _ in known]
+        self.positions = [position for _, position in known]
+
+    def within(self, low, high):
+        """
+        Startups with an amount in [low, high], plus those with no known
+        amount, in catalogue order (so ties still rank the way the full
+        list would).
+        """
+        start = bisect.bisect_left(self.amounts, low)
+        end = bisect.bisect_right(self.amounts, high)
+        if start == 0 and end == len(self.amounts):
+            return self.startups
+        positions = self.positions[start:end] + self.unknown
+        positions.sort()
+        startups = self.startups
+        return [startups[position] for position in positions]
+
+
+def index_for_matching(startups):
+    """FundingIndex over the catalogue, or None when range filtering is off"""
+    return FundingIndex(startups) if RANGE_FILTER else None
+
+
+def investor_candidates(index, investor, startups):
+    """The startups worth scoring for this investor (all of them without an index or range)"""
+    if index is None:
+        return startups
+    bounds = investor_range(investor)
+    if bounds is None:
+        return startups
+    return index.within(*bounds)
@@ -0,0 +1,298 @@
+"""
+Shared module: geo
+Purpose: Location normalization and geohash-based proximity lookups for the
+near=/radius_km= filter in GET /startups and the optional proximity term in
+matching
+
+Free-text locations ("Berlin, Germany", "SF", "52.52,13.40") are resolved
+at write time against gazetteer.csv, an offline list of startup hubs
+bundled with the shared modules, so nothing is geocoded at query time.
+Resolved items carry latitude/longitude plus a geohash. geohash_cell (its
+first CELL_PRECISION characters, ~156 km cells) is the hash key of the
+GeohashIndex GSI, with the full geohash as its sort key. A radius query
+covers the circle with the few geohash cells it touches (prefixes at the
+finest precision that keeps them under MAX_QUERY_CELLS), queries only
+those, and filters the results by exact distance.
+"""
+
+import csv
+import functools
+import math
+import os
+import threading
+from decimal import Decimal
+
+import matching
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gazetteer.csv')
+
+GEOHASH_PRECISION = 9
+# Hash key precision of the GeohashIndex GSI (cells of ~156 x 156 km at the equator)
+CELL_PRECISION = 3
+# Finest prefix used for index queries, and how many prefixes one radius query may use
+MAX_QUERY_PRECISION = 6
+MAX_QUERY_CELLS = int(os.environ.get('GEO_MAX_QUERY_CELLS', '12'))
+MAX_RADIUS_KM = float(os.environ.get('GEO_MAX_RADIUS_KM', '200'))
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Country spellings that are not the gazetteer's own name or ISO code
+COUNTRY_ALIASES = {
+    'usa': 'US', 'u.s.': 'US', 'u.s.a.': 'US', 'america': 'US', 'united states of america': 'US',
+    'uk': 'GB', 'u.k.': 'GB', 'england': 'GB', 'scotland': 'GB', 'wales': 'GB', 'great britain': 'GB',
+    'the netherlands': 'NL', 'holland': 'NL', 'czechia': 'CZ', 'korea': 'KR', 'uae': 'AE',
+    'deutschland': 'DE', 'españa': 'ES', 'espana': 'ES', 'brasil': 'BR', 'méxico': 'MX',
+}
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def _load_gazetteer():
+    """({lower-case name or alias: [place, ...]}, {lower-case country spelling: code}), loaded once"""
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            places, countries = {}, dict(COUNTRY_ALIASES)
+            with open(GAZETTEER_FILE, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    place = {
+                        'name': row['name'],
+                        'country': row['country'],
+                        'country_code': row['country_code'],
+                        'latitude': float(row['latitude']),
+                        'longitude': float(row['longitude']),
+                    }
+                    names = [row['name']] + [alias for alias in row['aliases'].split('|') if alias]
+                    for name in names:
+                        # File order decides ambiguous names without a country (Cambridge -> UK)
+                        places.setdefault(name.lower(), []).append(place)
+                    countries[row['country'].lower()] = row['country_code']
+                    countries[row['country_code'].lower()] = row['country_code']
+            _gazetteer = (places, countries)
+        return _gazetteer
+
+
+def _coordinates(text):
+    """'52.52, 13.40' -> (52.52, 13.40), or None"""
+    parts = text.split(',')
+    if len(parts) != 2:
+        return None
+    try:
+        latitude, longitude = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+        return latitude, longitude
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def locate(text):
+    """
+    Resolve a free-text location to {'label', 'latitude', 'longitude'}, or
+    None ('Remote', unknown places). Accepts 'City', 'City, Country',
+    'City, Region, Country' and 'lat,lon'. Results are cached (catalogues
+    repeat a few hundred locations), so the returned dict must not be changed.
+    """
+    text = ' '.join(str(text or '').split())
+    if not text:
+        return None
+    point = _coordinates(text)
+    if point:
+        return {'label': text, 'latitude': point[0], 'longitude': point[1]}
+
+    places, countries = _load_gazetteer()
+    parts = [part.strip() for part in text.split(',') if part.strip()]
+    if len(parts) == 1 and parts[0].lower() in countries:
+        # A country on its own (or 'Singapore', which is both)
+        candidates = places.get(parts[0].lower())
+        return _resolved(candidates[0]) if candidates else None
+    candidates = places.get(parts[0].lower())
+    if not candidates:
+        return None
+    if len(parts) > 1:
+        code = countries.get(parts[-1].lower())
+        if code:
+            in_country = [place for place in candidates if place['country_code'] == code]
+            if not in_country:
+                return None
+            return _resolved(in_country[0])
+    # Unknown trailing parts (US states, regions) fall back to the first place with that name
+    return _resolved(candidates[0])
+
+
+def _resolved(place):
+    return {'label': f"{place['name']}, {place['country']}",
+            'latitude': place['latitude'], 'longitude': place['longitude']}
+
+
+def _spread(value):
+    """Moves bit k of value to bit 2k (for interleaving)"""
+    result, shift = 0, 0
+    while value:
+        result |= _SPREAD_BYTE[value & 0xff] << shift
+        value >>= 8
+        shift += 16
+    return result
+
+
+_SPREAD_BYTE = [sum(((byte >> k) & 1) << (2 * k) for k in range(8)) for byte in range(256)]
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    bits = precision * 5
+    lat_bits, lon_bits = bits // 2, (bits + 1) // 2
+    lat = min(int((latitude + 90.0) * (1 << lat_bits) / 180.0), (1 << lat_bits) - 1)
+    lon = min(int((longitude + 180.0) * (1 << lon_bits) / 360.0), (1 << lon_bits) - 1)
+    # Longitude takes the first (most significant) bit of each pair
+    if bits % 2:
+        value = _spread(lon) | _spread(lat) << 1
+    else:
+        value = _spread(lon) << 1 | _spread(lat)
+    return ''.join(BASE32[(value >> shift) & 31] for shift in range(bits - 5, -1, -5))
+
+
+def bounds(geohash):
+    """(lat_min, lat_max, lon_min, lon_max) of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def cell_size(precision):
+    """(height, width) of a cell in degrees"""
+    bits = precision * 5
+    return 180.0 / (1 << (bits // 2)), 360.0 / (1 << ((bits + 1) // 2))
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _distance_to_cell(latitude, longitude, geohash):
+    """Distance from a point to the nearest point of a cell (0 inside it)"""
+    lat_min, lat_max, lon_min, lon_max = bounds(geohash)
+    nearest_lat = min(max(latitude, lat_min), lat_max)
+    center = (lon_min + lon_max) / 2
+    # Longitude offset taken the short way round (cells across the antimeridian)
+    offset = (longitude - center + 180.0) % 360.0 - 180.0
+    nearest_lon = center + min(max(offset, (lon_min - lon_max) / 2), (lon_max - lon_min) / 2)
+    return distance_km(latitude, longitude, nearest_lat, nearest_lon)
+
+
+def cells_within(latitude, longitude, radius_km, precision):
+    """Geohash cells of the given precision that intersect the circle"""
+    height, width = cell_size(precision)
+    d_lat = radius_km / KM_PER_DEGREE
+    d_lon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    lat_min, lat_max = max(-90.0, latitude - d_lat), min(90.0, latitude + d_lat)
+    lon_span = min(360.0, 2 * d_lon)
+
+    cells = set()
+    row = math.floor((lat_min + 90.0) / height)
+    while row * height - 90.0 <= lat_max and row * height < 180.0:
+        cell_lat = row * height - 90.0 + height / 2
+        steps = int(math.ceil(lon_span / width)) + 1
+        for step in range(steps + 1):
+            cell_lon = (longitude - lon_span / 2 + step * width + 180.0) % 360.0 - 180.0
+            cells.add(encode(cell_lat, cell_lon, precision))
+        row += 1
+    # Clamping to the cell's lat/lon box slightly overestimates the distance at high
+    # latitudes, so cells are only dropped with a 10% margin
+    return sorted(cell for cell in cells if _distance_to_cell(latitude, longitude, cell) <= radius_km * 1.1)
+
+
+def query_prefixes(latitude, longitude, radius_km):
+    """
+    Prefixes to query GeohashIndex with: the finest precision (at least
+    CELL_PRECISION) whose covering cells stay within MAX_QUERY_CELLS.
+    """
+    best = cells_within(latitude, longitude, radius_km, CELL_PRECISION)
+    for precision in range(CELL_PRECISION + 1, MAX_QUERY_PRECISION + 1):
+        finer = cells_within(latitude, longitude, radius_km, precision)
+        if len(finer) > MAX_QUERY_CELLS:
+            break
+        best = finer
+    return best
+
+
+@functools.lru_cache(maxsize=4096)
+def location_fields(latitude, longitude):
+    """Attributes stored on a located startup (GeohashIndex keys included); cached like locate()"""
+    geohash = encode(latitude, longitude)
+    return {
+        'latitude': Decimal(str(round(latitude, 6))),
+        'longitude': Decimal(str(round(longitude, 6))),
+        'geohash': geohash,
+        'geohash_cell': geohash[:CELL_PRECISION],
+    }
+
+
+def precision_for_radius(radius_km):
+    """Coarsest cells that are still at least half the radius wide (few cells per lookup)"""
+    precision = 1
+    while precision < MAX_QUERY_PRECISION:
+        height, width = cell_size(precision + 1)
+        if min(height, width) * KM_PER_DEGREE < radius_km / 2:
+            break
+        precision += 1
+    return precision
+
+
+class GeoIndex:
+    """In-memory geohash prefix index over located startups (used by matching)"""
+
+    def __init__(self, startups, precision):
+        self.precision = precision
+        self.cells = {}
+        for startup in startups:
+            if 'latitude' not in startup or 'longitude' not in startup:
+                continue
+            latitude, longitude = float(startup['latitude']), float(startup['longitude'])
+            self.cells.setdefault(encode(latitude, longitude, precision), []).append(
+                (startup.get('startup_id', ''), latitude, longitude))
+
+    def within(self, latitude, longitude, radius_km):
+        """{startup_id: distance_km} for startups within the radius; only the covering cells are read"""
+        found = {}
+        for cell in cells_within(latitude, longitude, radius_km, self.precision):
+            for startup_id, lat, lon in self.cells.get(cell, ()):
+                distance = distance_km(latitude, longitude, lat, lon)
+                if distance <= radius_km:
+                    found[startup_id] = distance
+        return found
+
+
+def index_for_matching(startups):
+    """GeoIndex over the catalogue when the proximity term is enabled (matching.PROXIMITY_POINTS)"""
+    if not matching.PROXIMITY_POINTS:
+        return None
+    return GeoIndex(startups, precision_for_radius(matching.PROXIMITY_RADIUS_KM))
+
+
+def investor_scorer(index, investor):
+    """startup_id -> distance_km (None when farther than the radius) for matching, or None"""
+    if index is None or 'latitude' not in investor or 'longitude' not in investor:
+        return None
+    distances = index.within(float(investor['latitude']), float(investor['longitude']),
+                             matching.PROXIMITY_RADIUS_KM)
+    return distances.get
@@ -0,0 +1,165 @@
+"""
+Shared module: matching
+Purpose: Investor/startup scoring rules used by the matcher Lambda and the
+daily digest in batch-processor
+"""
+
+import heapq
+import os
+
+INDUSTRY_POINTS = 50
+STAGE_POINTS = 50
+
+# Extra points for description similarity (see similarity.py); 0 disables the term
+SIMILARITY_POINTS = float(os.environ.get('SIMILARITY_POINTS', '0'))
+
+# Extra points for startups near the investor (see geo.py), fading linearly to 0 at the radius
+PROXIMITY_POINTS = float(os.environ.get('PROXIMITY_POINTS', '0'))
+PROXIMITY_RADIUS_KM = float(os.environ.get('PROXIMITY_RADIUS_KM', '100'))
+
+# How many matches go into a notification email
+EMAIL_TOP_N = 5
+
+# How many matches are kept (stored as recommendations) per investor
+MATCH_TOP_K = int(os.environ.get('MATCH_TOP_K', '100'))
+
+
+def has_preferences(investor):
+    return bool(investor.get('preferred_industries') or investor.get('preferred_funding_stages'))
+
+
+def industry_matches(preferred_industries_lower, startup_industry):
+    """Exact or substring match in either direction (case-insensitive)"""
+    industry = startup_industry.lower()
+    for pref in preferred_industries_lower:
+        if pref in industry or industry in pref:
+            return True
+    return False
+
+
+def _candidates(investor, startups, similarity=None, affinity=None, proximity=None):
+    """
+    Yields (sort key, startup, industry_match, stage_match, score, cosine,
+    affinity, distance) for every startup that passes strict matching. Only small
+    tuples referencing the startup are produced; match dicts are built later
+    for the matches that are kept.
+    """
+    preferred_industries = investor.get('preferred_industries', [])
+    preferred_stages = investor.get('preferred_funding_stages', [])
+    industries_lower = [pref.lower() for pref in preferred_industries]
+    stages = set(preferred_stages)
+    has_industry_pref = len(preferred_industries) > 0
+    has_stage_pref = len(preferred_stages) > 0
+    use_similarity = similarity is not None and SIMILARITY_POINTS
+    use_proximity = proximity is not None and PROXIMITY_POINTS
+
+    for startup in startups:
+        startup_industry = startup.get('industry', '')
+        startup_stage = startup.get('funding_stage', '')
+
+        industry_match = has_industry_pref and industry_matches(industries_lower, startup_industry)
+        stage_match = has_stage_pref and startup_stage in stages
+
+        if has_industry_pref and has_stage_pref:
+            if not (industry_match and stage_match):
+                continue
+        elif has_industry_pref:
+            if not industry_match:
+                continue
+        elif has_stage_pref:
+            if not stage_match:
+                continue
+        else:
+            continue
+
+        score = (INDUSTRY_POINTS if industry_match else 0) + (STAGE_POINTS if stage_match else 0)
+        cosine = None
+        if use_similarity:
+            cosine = max(0.0, similarity(startup.get('startup_id', '')))
+            score = round(score + SIMILARITY_POINTS * cosine, 1)
+        distance = None
+        if use_proximity:
+            distance = proximity(startup.get('startup_id', ''))
+            if distance is not None:
+                score = round(score + PROXIMITY_POINTS * max(0.0, 1.0 - distance / PROXIMITY_RADIUS_KM), 1)
+        startup_affinity = None
+        if affinity is not None:
+            startup_affinity = round(affinity(startup.get('startup_id', '')), 3)
+            key = (score, startup_affinity)
+        else:
+            key = score
+        yield key, startup, industry_match, stage_match, score, cosine, startup_affinity, distance
+
+
+def _match(candidate):
+    _, startup, industry_match, stage_match, score, cosine, startup_affinity, distance = candidate
+    match = {
+        'startup_id': startup.get('startup_id', ''),
+        'name': startup.get('name', 'Unknown'),
+        'industry': startup.get('industry', ''),
+        'funding_stage': startup.get('funding_stage', ''),
+        'description': startup.get('description', ''),
+        'location': startup.get('location', ''),
+        'website': startup.get('website', ''),
+        'funding_amount': startup.get('funding_amount', 'N/A'),
+        'match_score': score,
+        'industry_match': industry_match,
+        'stage_match': stage_match
+    }
+    if cosine is not None:
+        match['similarity'] = round(cosine, 3)
+    if startup_affinity is not None:
+        match['affinity'] = startup_affinity
+    if distance is not None:
+        match['distance_km'] = round(distance, 1)
+    return match
+
+
+def _sort_key(candidate):
+    return candidate[0]
+
+
+def match_investor(investor, startups, similarity=None, affinity=None, proximity=None):
+    """
+    Score every startup for one investor.
+
+    STRICT MATCHING: if the investor set both industries and stages, both
+    must match; if only one is set, that one must match. Returns the match
+    dicts sorted by score (highest first).
+
+    similarity is an optional startup_id -> cosine scorer for this investor
+    (similarity.investor_scorer); it only reorders startups that already
+    match, adding up to SIMILARITY_POINTS.
+
+    affinity is an optional startup_id -> behavioural affinity scorer
+    (affinity.investor_scorer). It re-ranks without changing scores:
+    among equally scored matches, startups that investors with similar
+    bookmarks also engaged with come first.
+
+    proximity is an optional startup_id -> distance_km lookup (None beyond
+    PROXIMITY_RADIUS_KM, see geo.investor_scorer). Like similarity, it only
+    reorders startups that already match, adding up to PROXIMITY_POINTS.
+    """
+    candidates = sorted(_candidates(investor, startups, similarity, affinity, proximity),
+                        key=_sort_key, reverse=True)
+    return [_match(candidate) for candidate in candidates]
+
+
+def top_matches(investor, startups, k=None, similarity=None, affinity=None, proximity=None):
+    """
+    The k best matches (same rules and order as match_investor(...)[:k])
+    plus the total number of matches, keeping only a k-sized heap in memory.
+    Returns (matches, total).
+    """
+    k = k or MATCH_TOP_K
+    total = 0
+
+    def counted():
+        nonlocal total
+        for candidate in _candidates(investor, startups, similarity, affinity, proximity):
+            total += 1
+            yield candidate
+
+    # nlargest is stable (ties keep catalogue order), like the full sort
+    best = heapq.nlargest(k, counted(), key=_sort_key)
+    return [_match(candidate) for candidate in best], total
@@ -0,0 +1,165 @@
+"""
+Shared module: notifications
+Purpose: Render match notification emails and send many of them through SES
+with a bounded, rate-limited worker pool
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from matching import EMAIL_TOP_N
+
+DASHBOARD_URL = os.environ.get('DASHBOARD_URL', 'https://your-vercel-url.vercel.app')
+
+# SES account send rate (messages/second) and sender pool size
+SES_MAX_SEND_RATE = float(os.environ.get('SES_MAX_SEND_RATE', '14'))
+SES_SEND_WORKERS = int(os.environ.get('SES_SEND_WORKERS', '8'))
+SES_MAX_RETRIES = 4
+
+
+def render_match_email(investor_name, matches, preferred_industries, preferred_stages):
+    """Build subject, HTML and plain-text bodies for a match notification"""
+    html_message = f"""<html>
+<head></head>
+<body>
+<h2>Hello {investor_name}!</h2>
+<p>We found <strong>{len(matches)}</strong> startup(s) matching your investment preferences.</p>
+
+<h3>Top Matches:</h3>
+"""
+
+    # Add top matches with details
+    for i, match in enumerate(matches[:EMAIL_TOP_N], 1):
+        match_icons = []
+        if match['industry_match']:
+            match_icons.append('🎯 Industry Match')
+        if match['stage_match']:
+            match_icons.append('📊 Stage Match')
+
+        html_message += f"""
+<div style="border: 1px solid #ddd; padding: 15px; margin: 10px 0; border-radius: 8px;">
+<h4>{i}. {match['name']} - {match['industry']}</h4>
+<p><strong>Stage:</strong> {match['funding_stage']} | <strong>Funding:</strong> {match['funding_amount']}</p>
+<p><strong>Location:</strong> {match['location']}</p>
+<p><strong>Match Score:</strong> {match['match_score']}% | <strong>Why matched:</strong> {' | '.join(match_icons)}</p>
+<p>{match['description'][:150]}...</p>
+<p><a href="{match['website']}" target="_blank">Visit Website</a></p>
+</div>
+"""
+
+    if len(matches) > EMAIL_TOP_N:
+        html_message += f"<p><em>... and {len(matches) - EMAIL_TOP_N} more matches!</em></p>"
+
+    html_message += f"""
+<hr>
+<p><strong>Your preferences:</strong></p>
+<ul>
+<li><strong>Industries:</strong> {', '.join(preferred_industries) if preferred_industries else 'Not set'}</li>
+<li><strong>Stages:</strong> {', '.join(preferred_stages) if preferred_stages else 'Not set'}</li>
+</ul>
+
+<p>Visit the <a href="{DASHBOARD_URL}">Startup Investor Platform</a> to explore all your matches!</p>
+
+<p style="color: #666; font-size: 12px;">This is an automated notification from Startup Investor Platform.</p>
+</body>
+</html>"""
+
+    # Plain text version
+    text_message = f"""Hello {investor_name}!
+
+We found {len(matches)} startup(s) matching your investment preferences.
+
+TOP MATCHES:
+
+"""
+    for i, match in enumerate(matches[:EMAIL_TOP_N], 1):
+        text_message += f"""{i}. {match['name']} - {match['industry']}
+   Stage: {match['funding_stage']} | Funding: {match['funding_amount']}
+   Match Score: {match['match_score']}%
+   Location: {match['location']}
+   {match['description'][:120]}...
+   Website: {match['website']}
+
+"""
+
+    return {
+        'subject': f'🚀 {len(matches)} Startup Matches Found!',
+        'text': text_message,
+        'html': html_message
+    }
+
+
+def send_email(ses_client, sender, recipient, message):
+    """Send one rendered message; returns the SES MessageId"""
+    response = ses_client.send_email(
+        Source=sender,
+        Destination={'ToAddresses': [recipient]},
+        Message={
+            'Subject': {'Data': message['subject']},
+            'Body': {
+                'Text': {'Data': message['text']},
+                'Html': {'Data': message['html']}
+            }
+        }
+    )
+    return response['MessageId']
+
+
+class RateLimiter:
+    """Thread-safe pacing so a pool of senders stays under the SES send rate"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _is_throttle(error):
+    code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+    return code in ('Throttling', 'ThrottlingException', 'TooManyRequestsException')
+
+
+def send_bulk(ses_client, sender, deliveries, max_send_rate=None, workers=None):
+    """
+    Send many rendered emails concurrently.
+
+    deliveries: list of {'recipient': ..., 'message': {...}, ...extra keys}
+    Returns one status dict per delivery (same order), each with 'status'
+    ('sent' or 'failed') plus 'message_id' or 'error'.
+    """
+    limiter = RateLimiter(SES_MAX_SEND_RATE if max_send_rate is None else max_send_rate)
+
+    def deliver(delivery):
+        status = {k: v for k, v in delivery.items() if k != 'message'}
+        for attempt in range(SES_MAX_RETRIES + 1):
+            limiter.wait()
+            try:
+                status['message_id'] = send_email(ses_client, sender, delivery['recipient'],
+                                                  delivery['message'])
+                status['status'] = 'sent'
+                return status
+            except Exception as e:
+                if _is_throttle(e) and attempt < SES_MAX_RETRIES:
+                    time.sleep(random.uniform(0, 0.1 * (2 ** attempt)))
+                    continue
+                status['status'] = 'failed'
+                status['error'] = str(e)
+                return status
+
+    if not deliveries:
+        return []
+    with ThreadPoolExecutor(max_workers=min(workers or SES_SEND_WORKERS, len(deliveries))) as pool:
+        return list(pool.map(deliver, deliveries))
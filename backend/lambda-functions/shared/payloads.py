@@ -0,0 +1,43 @@
+"""
+Shared module: payloads
+Purpose: Pass large workflow data (match lists) between states by reference:
+the producer stores it as a JSON object in S3 and hands on only the key
+
+Step Functions copies every state's input and output, and a state's data is
+capped at 256 KB. Keys keep the interactive workflow's payloads small no
+matter how many matches an investor has. Objects live under PAYLOAD_PREFIX,
+which the assets bucket expires after a day.
+"""
+
+import json
+import os
+import uuid
+from decimal import Decimal
+
+import aws_clients
+
+PAYLOAD_BUCKET = os.environ.get('PAYLOAD_BUCKET', os.environ.get('SNAPSHOT_BUCKET', ''))
+PAYLOAD_PREFIX = os.environ.get('PAYLOAD_PREFIX', 'workflow-payloads/')
+
+s3 = aws_clients.lazy_client('s3')
+
+
+def _decimal_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def store(name, value):
+    """Upload value as JSON under PAYLOAD_PREFIX/name/; returns the object key"""
+    key = f'{PAYLOAD_PREFIX}{name}/{uuid.uuid4().hex}.json'
+    body = json.dumps(value, default=_decimal_default, separators=(',', ':'))
+    s3.put_object(Bucket=PAYLOAD_BUCKET, Key=key, Body=body.encode('utf-8'), ContentType='application/json')
+    return key
+
+
+def load(key):
+    """The value stored under key"""
+    if not key.startswith(PAYLOAD_PREFIX):
+        raise ValueError(f'Not a workflow payload key: {key}')
+    return json.loads(s3.get_object(Bucket=PAYLOAD_BUCKET, Key=key)['Body'].read())
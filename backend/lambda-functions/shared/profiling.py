@@ -0,0 +1,240 @@
+"""
+Shared module: profiling
+Purpose: Opt-in profiling of single Lambda invocations (cProfile +
+tracemalloc + per-stage wall times), so a slow matcher run or API call in
+production can be looked at afterwards
+
+profiled(function_name) wraps a lambda_handler. An invocation is profiled
+when PROFILE=1, when a PROFILE_SAMPLE_RATE draw hits, or when an API
+Gateway request carries an X-Profile header equal to PROFILE_HEADER_TOKEN.
+The header is ignored unless that token is set. Each profiled invocation
+writes a directory under PROFILE_DIR:
+
+- profile.pstats: cProfile data (python -m pstats, snakeviz)
+- summary.json: trigger, wall/CPU time, the top functions by cumulative
+  time, the top allocation sites, peak traced memory and the stage timings
+
+The directory is uploaded to PROFILE_BUCKET under PROFILE_PREFIX and then
+deleted when a bucket is configured. Without one, only the newest
+PROFILE_KEEP_LOCAL directories are kept, so /tmp does not fill up. stage('name') marks a section of the handler (the
+matcher's catalogue scan, scoring, emails, ...). It is timed only while a
+profile is running.
+
+When no trigger is configured, profiled() returns the handler unchanged
+and stage() returns a shared no-op context, so disabled profiling costs one
+global lookup per stage. cProfile, pstats and tracemalloc are imported by
+the first profiled invocation, not at cold start. cProfile sees only the
+handler's own thread.
+"""
+
+import contextlib
+import functools
+import io
+import json
+import os
+import random
+import shutil
+import threading
+import time
+from datetime import datetime
+
+import aws_clients
+
+ENABLED = os.environ.get('PROFILE', '0') == '1'
+SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+HEADER_TOKEN = os.environ.get('PROFILE_HEADER_TOKEN', '')
+HEADER_NAME = 'x-profile'
+# tracemalloc slows allocation-heavy code down several times; 0 keeps only cProfile
+TRACE_MEMORY = os.environ.get('PROFILE_MEMORY', '1') != '0'
+TRACE_FRAMES = int(os.environ.get('PROFILE_TRACE_FRAMES', '1'))
+TOP_N = int(os.environ.get('PROFILE_TOP_N', '25'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/profiles')
+PROFILE_BUCKET = os.environ.get('PROFILE_BUCKET', '')
+PROFILE_PREFIX = os.environ.get('PROFILE_PREFIX', 'profiles/')
+# Profiles kept in PROFILE_DIR per function when there is no bucket to upload them to
+PROFILE_KEEP_LOCAL = int(os.environ.get('PROFILE_KEEP_LOCAL', '5'))
+
+s3 = aws_clients.lazy_client('s3')
+
+_NO_STAGE = contextlib.nullcontext()
+# The running Profile, or None (one invocation at a time per container)
+_active = None
+
+
+class Profile:
+    """Stage timings of one profiled invocation"""
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            with self._lock:
+                entry = self.stages.setdefault(name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+                entry['count'] += 1
+                entry['total_ms'] += elapsed
+                entry['max_ms'] = max(entry['max_ms'], elapsed)
+
+    def stage_report(self):
+        return {name: {'count': entry['count'], 'total_ms': round(entry['total_ms'], 3),
+                       'max_ms': round(entry['max_ms'], 3)}
+                for name, entry in sorted(self.stages.items(), key=lambda item: -item[1]['total_ms'])}
+
+
+def stage(name):
+    """Context manager timing a section of the handler while a profile runs (no-op otherwise)"""
+    profile = _active
+    if profile is None:
+        return _NO_STAGE
+    return profile.stage(name)
+
+
+def _header(event, name):
+    headers = event.get('headers') if isinstance(event, dict) else None
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def trigger(event):
+    """Why this invocation is profiled ('env', 'header', 'sample'), or None"""
+    if ENABLED:
+        return 'env'
+    if HEADER_TOKEN and _header(event, HEADER_NAME) == HEADER_TOKEN:
+        return 'header'
+    if SAMPLE_RATE and random.random() < SAMPLE_RATE:
+        return 'sample'
+    return None
+
+
+def _top_functions(profiler):
+    import pstats
+
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({'function': f'{os.path.basename(filename)}:{line}({function})', 'calls': calls,
+                     'tottime_ms': round(tottime * 1000, 3), 'cumtime_ms': round(cumtime * 1000, 3)})
+    rows.sort(key=lambda row: -row['cumtime_ms'])
+    return rows[:TOP_N]
+
+
+def _top_allocations(snapshot):
+    import tracemalloc
+
+    statistics = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ]).statistics('lineno')
+    return [{'location': f'{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}',
+             'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+            for stat in statistics[:TOP_N]]
+
+
+def _upload(directory, name):
+    for filename in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, filename), 'rb') as f:
+            s3.put_object(Bucket=PROFILE_BUCKET, Key=f'{PROFILE_PREFIX}{name}/{filename}', Body=f.read())
+
+
+def _prune(parent, keep):
+    """Delete all but the newest keep (at least 1) profile directories under parent; names start with a timestamp"""
+    for old in sorted(os.listdir(parent))[:-max(keep, 1)]:
+        shutil.rmtree(os.path.join(parent, old), ignore_errors=True)
+
+
+def _run_profiled(handler, event, context, function_name, reason):
+    # Imported here, not at module level: they add ~20 ms to every cold start
+    # and only profiled invocations use them
+    import cProfile
+    import tracemalloc
+
+    global _active
+    profile = Profile()
+    profiler = cProfile.Profile()
+    tracing = TRACE_MEMORY and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    _active = profile
+    started, cpu_started = time.perf_counter(), time.process_time()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already attached (e.g. a local debugger)
+        profiler = None
+    try:
+        return handler(event, context)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall_ms = (time.perf_counter() - started) * 1000
+        cpu_ms = (time.process_time() - cpu_started) * 1000
+        _active = None
+        snapshot, peak = None, 0
+        if tracing:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        try:
+            _write(function_name, context, reason, profile, profiler, snapshot, peak, wall_ms, cpu_ms, event)
+        except Exception as e:
+            # Profiling must never fail the invocation it observes
+            print(f"⚠️ Could not write profile: {str(e)}")
+
+
+def _write(function_name, context, reason, profile, profiler, snapshot, peak, wall_ms, cpu_ms, event):
+    request_id = getattr(context, 'aws_request_id', None) or f'{os.getpid()}-{int(time.time() * 1000)}'
+    name = f"{function_name}/{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{request_id}"
+    directory = os.path.join(PROFILE_DIR, name)
+    os.makedirs(directory, exist_ok=True)
+
+    summary = {
+        'function': function_name,
+        'request_id': request_id,
+        'trigger': reason,
+        'wall_ms': round(wall_ms, 3),
+        'cpu_ms': round(cpu_ms, 3),
+        'stages': profile.stage_report(),
+    }
+    if isinstance(event, dict) and 'httpMethod' in event:
+        summary['route'] = f"{event.get('httpMethod')} {event.get('resource') or event.get('path')}"
+    if profiler is not None:
+        profiler.dump_stats(os.path.join(directory, 'profile.pstats'))
+        summary['top_functions'] = _top_functions(profiler)
+    if snapshot is not None:
+        summary['peak_traced_kb'] = round(peak / 1024, 1)
+        summary['top_allocations'] = _top_allocations(snapshot)
+    with open(os.path.join(directory, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=1)
+
+    location = directory
+    if PROFILE_BUCKET:
+        _upload(directory, name)
+        shutil.rmtree(directory, ignore_errors=True)
+        location = f's3://{PROFILE_BUCKET}/{PROFILE_PREFIX}{name}/'
+    else:
+        _prune(os.path.dirname(directory), PROFILE_KEEP_LOCAL)
+    print(f"🔬 Profiled {function_name} ({reason}): {wall_ms:.0f}ms wall, {cpu_ms:.0f}ms CPU -> {location}")
+
+
+def profiled(function_name):
+    """Decorator for lambda_handler: profile the invocations selected by trigger()"""
+    def decorate(handler):
+        if not (ENABLED or SAMPLE_RATE or HEADER_TOKEN):
+            return handler
+
+        @functools.wraps(handler)
+        def run(event, context):
+            reason = trigger(event)
+            if reason is None or _active is not None:
+                return handler(event, context)
+            return _run_profiled(handler, event, context, function_name, reason)
+        return run
+    return decorate
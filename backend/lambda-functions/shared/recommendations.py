@@ -0,0 +1,112 @@
+"""
+Shared module: recommendations
+Purpose: Compact encoding of the recommendations stored on investor items
+
+Only (startup_id, match_score) pairs are stored, packed into one Binary
+attribute and zlib-compressed when that is smaller. Names, industries and
+stages are looked up in the startup catalogue when the recommendations are
+read (see catalogue.py), so a renamed startup never needs a fan-out update.
+
+Layout (before compression):
+    varint count, then per entry: varint id length, id (UTF-8),
+    uint16 score in tenths of a point (big-endian)
+The first byte of the attribute is the format: 1 = raw, 2 = zlib.
+"""
+
+import struct
+import zlib
+
+FORMAT_RAW = 1
+FORMAT_ZLIB = 2
+
+MAX_SCORE_TENTHS = 0xFFFF
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode(matches):
+    """Pack match dicts (highest score first) into the stored Binary form"""
+    raw = bytearray()
+    _write_varint(raw, len(matches))
+    for match in matches:
+        startup_id = match['startup_id'].encode('utf-8')
+        _write_varint(raw, len(startup_id))
+        raw += startup_id
+        tenths = int(round(float(match['match_score']) * 10))
+        raw += struct.pack('>H', max(0, min(MAX_SCORE_TENTHS, tenths)))
+
+    compressed = zlib.compress(bytes(raw), 9)
+    if len(compressed) < len(raw):
+        return bytes([FORMAT_ZLIB]) + compressed
+    return bytes([FORMAT_RAW]) + bytes(raw)
+
+
+def decode(stored):
+    """
+    Stored recommendations -> list of (startup_id, match_score).
+
+    Accepts the Binary form (bytes or boto3 Binary) and the legacy list of
+    maps, so items written before the compact encoding still read correctly.
+    """
+    if not stored:
+        return []
+    if isinstance(stored, list):
+        return [(r['startup_id'], r.get('match_score', 0)) for r in stored]
+
+    data = bytes(getattr(stored, 'value', stored))
+    if data[0] == FORMAT_ZLIB:
+        data = zlib.decompress(data[1:])
+    elif data[0] == FORMAT_RAW:
+        data = data[1:]
+    else:
+        raise ValueError(f'Unknown recommendations format {data[0]}')
+
+    count, offset = _read_varint(data, 0)
+    pairs = []
+    for _ in range(count):
+        length, offset = _read_varint(data, offset)
+        startup_id = data[offset:offset + length].decode('utf-8')
+        offset += length
+        tenths = struct.unpack_from('>H', data, offset)[0]
+        offset += 2
+        score = tenths // 10 if tenths % 10 == 0 else tenths / 10.0
+        pairs.append((startup_id, score))
+    return pairs
+
+
+def hydrate(stored, catalogue):
+    """
+    Expand stored recommendations into the API shape using current catalogue
+    data. Startups that no longer exist are dropped.
+    """
+    pairs = decode(stored)
+    startups = catalogue.get_many([startup_id for startup_id, _ in pairs])
+    hydrated = []
+    for startup_id, score in pairs:
+        startup = startups.get(startup_id)
+        if not startup:
+            continue
+        hydrated.append({
+            'startup_id': startup_id,
+            'name': startup.get('name', 'Unknown'),
+            'industry': startup.get('industry', ''),
+            'funding_stage': startup.get('funding_stage', ''),
+            'match_score': score
+        })
+    return hydrated
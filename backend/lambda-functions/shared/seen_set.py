@@ -0,0 +1,81 @@
+"""
+Shared module: seen_set
+Purpose: Compact per-investor record of startups already reported in a
+notification, so emails only contain startups the investor hasn't seen
+
+Every new match counted in a sent email is recorded (the top ones are listed,
+the rest are linked through the dashboard), so an unchanged catalogue means
+no email the next day.
+
+Each startup id is reduced to a 32-bit BLAKE2b fingerprint and the
+fingerprints are packed (oldest first) into one Binary attribute,
+`seen_startups`, on the investor item: 4 bytes per startup instead of the
+full id. With 5,000 entries the false-positive chance for a new startup is
+about 1 in 850,000, and the oldest entries are dropped past the cap.
+"""
+
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+SEEN_ATTRIBUTE = 'seen_startups'
+MAX_ENTRIES = int(os.environ.get('SEEN_SET_MAX_ENTRIES', '5000'))
+
+
+def fingerprint(startup_id):
+    digest = hashlib.blake2b(startup_id.encode('utf-8'), digest_size=4).digest()
+    return struct.unpack('>I', digest)[0]
+
+
+class SeenSet:
+    """Insertion-ordered set of startup fingerprints"""
+
+    def __init__(self, fingerprints=()):
+        self._order = array('I', fingerprints)
+        self._members = set(self._order)
+
+    @classmethod
+    def from_item(cls, item):
+        """Decode the seen-set stored on an investor item (missing -> empty)"""
+        blob = item.get(SEEN_ATTRIBUTE)
+        if not blob:
+            return cls()
+        # boto3 returns Binary attributes wrapped in boto3.dynamodb.types.Binary
+        raw = bytes(getattr(blob, 'value', blob))
+        values = array('I')
+        values.frombytes(raw)
+        if sys.byteorder == 'little':
+            values.byteswap()
+        return cls(values)
+
+    def __contains__(self, startup_id):
+        return fingerprint(startup_id) in self._members
+
+    def __len__(self):
+        return len(self._order)
+
+    def add(self, startup_ids):
+        for startup_id in startup_ids:
+            value = fingerprint(startup_id)
+            if value not in self._members:
+                self._members.add(value)
+                self._order.append(value)
+        overflow = len(self._order) - MAX_ENTRIES
+        if overflow > 0:
+            for value in self._order[:overflow]:
+                self._members.discard(value)
+            del self._order[:overflow]
+
+    def to_bytes(self):
+        """Big-endian packed fingerprints, ready to store as a Binary attribute"""
+        values = array('I', self._order)
+        if sys.byteorder == 'little':
+            values.byteswap()
+        return values.tobytes()
+
+
+def unseen(matches, seen):
+    """Matches whose startup is not in the seen-set (order preserved)"""
+    return [m for m in matches if m['startup_id'] not in seen]
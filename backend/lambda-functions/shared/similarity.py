@@ -0,0 +1,238 @@
+"""
+Shared module: similarity
+Purpose: Description-based startup similarity for GET /startups/{id}/similar
+and the optional similarity term in matching
+
+Each startup's description (plus its industry) becomes a TF-IDF vector over
+hashed token features, folded into a small dense space with signed feature
+hashing and L2-normalised. All vectors are stacked into one float32 matrix
+that snapshot-builder publishes as a snapshot (see snapshots.py). Cosine
+similarity against every startup is then a single matrix-vector product:
+about 5 ms for 100k startups at the default 128 dimensions (~50 MB).
+
+numpy is an optional dependency (Lambda layer); without it available()
+is False and callers skip similarity. It is imported on first use, not at
+module load: importing numpy takes ~80 ms, and every api-handler, matcher
+and batch-processor cold start would pay it even with the term disabled.
+"""
+
+import hashlib
+import io
+import os
+import re
+import time
+from collections import Counter
+
+import matching
+import snapshots
+
+SNAPSHOT_NAME = 'similarity.npz'
+DIMENSIONS = int(os.environ.get('SIMILARITY_DIMENSIONS', '128'))
+
+# Document frequencies are kept per hashed token bucket
+IDF_BITS = 18
+IDF_BUCKETS = 1 << IDF_BITS
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:-[a-z0-9]+)*')
+STOPWORDS = frozenset('''
+    a about an and are as at be by for from has have in is it its of on or our that the their this
+    to we with you your startup startups company companies platform help helps using use based
+    '''.split())
+
+_hashes = {}
+
+# numpy, once available() has imported it
+np = None
+_numpy_missing = False
+
+
+def available():
+    """True when numpy can be imported; the import happens on the first call"""
+    global np, _numpy_missing
+    if np is None and not _numpy_missing:
+        try:
+            import numpy
+        except ImportError:
+            _numpy_missing = True
+        else:
+            np = numpy
+    return np is not None
+
+
+def _require_numpy():
+    if not available():
+        raise RuntimeError('numpy is not available (attach the numpy layer)')
+
+
+def tokens(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def startup_text(startup):
+    """Text a startup is compared on; the industry counts twice"""
+    industry = startup.get('industry', '')
+    return f"{startup.get('description', '')} {industry} {industry}"
+
+
+def _token_hash(token):
+    value = _hashes.get(token)
+    if value is None:
+        value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+        if len(_hashes) < 500000:
+            _hashes[token] = value
+    return value
+
+
+def _hashed_terms(texts):
+    """(document index, token hash, term frequency) arrays for a list of texts"""
+    docs, hashes, counts = [], [], []
+    for doc, text in enumerate(texts):
+        for token, count in Counter(tokens(text)).items():
+            docs.append(doc)
+            hashes.append(_token_hash(token))
+            counts.append(count)
+    return (np.asarray(docs, dtype=np.int64), np.asarray(hashes, dtype=np.uint64),
+            np.asarray(counts, dtype=np.float32))
+
+
+def _fold(docs, hashes, counts, idf, rows, dims):
+    """Signed-hash the weighted terms into a (rows x dims) matrix with unit-length rows"""
+    weights = (1.0 + np.log(counts)) * idf[(hashes & np.uint64(IDF_BUCKETS - 1)).astype(np.int64)]
+    columns = ((hashes >> np.uint64(IDF_BITS)) % np.uint64(dims)).astype(np.int64)
+    signs = np.where((hashes >> np.uint64(63)) == 1, -1.0, 1.0).astype(np.float32)
+    matrix = np.zeros((rows, dims), dtype=np.float32)
+    np.add.at(matrix, (docs, columns), weights * signs)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class SimilarityIndex:
+    """Startup vectors (one row per startup) plus the IDF table to embed new text"""
+
+    def __init__(self, ids, vectors, idf, built_at=0):
+        self.ids = ids
+        self.vectors = vectors
+        self.idf = idf
+        self.built_at = int(built_at)
+        self.row = {startup_id: i for i, startup_id in enumerate(ids.tolist())}
+
+    @classmethod
+    def build(cls, startups, dims=None):
+        """Vectorise an iterable of startup items (needs startup_id, description, industry)"""
+        _require_numpy()
+        dims = dims or DIMENSIONS
+        ids, texts = [], []
+        for startup in startups:
+            ids.append(startup['startup_id'])
+            texts.append(startup_text(startup))
+        docs, hashes, counts = _hashed_terms(texts)
+
+        # Smoothed IDF over hashed buckets: each (doc, token) pair counts once
+        buckets = (hashes & np.uint64(IDF_BUCKETS - 1)).astype(np.int64)
+        df = np.bincount(buckets, minlength=IDF_BUCKETS).astype(np.float32)
+        idf = (np.log((1.0 + len(ids)) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        vectors = _fold(docs, hashes, counts, idf, len(ids), dims)
+        return cls(np.asarray(ids), vectors, idf, time.time())
+
+    @classmethod
+    def from_bytes(cls, data):
+        _require_numpy()
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            return cls(npz['ids'], npz['vectors'], npz['idf'], int(npz['built_at']))
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        # Uncompressed: float vectors barely compress and loading stays a plain memcpy
+        np.savez(buffer, ids=self.ids, vectors=self.vectors, idf=self.idf,
+                 built_at=np.asarray(self.built_at, dtype=np.int64))
+        return buffer.getvalue()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def vector_for_text(self, text):
+        docs, hashes, counts = _hashed_terms([text])
+        return _fold(docs, hashes, counts, self.idf, 1, self.vectors.shape[1])[0]
+
+    def vector_for(self, startup):
+        """Stored vector for a startup, or one computed from its text if it is newer than the snapshot"""
+        row = self.row.get(startup['startup_id'])
+        if row is not None:
+            return self.vectors[row]
+        return self.vector_for_text(startup_text(startup))
+
+    def top_k(self, vector, k=10, exclude=()):
+        """[(startup_id, cosine)] for the k most similar startups, best first"""
+        scores = self.vectors @ vector
+        wanted = min(len(scores), k + len(exclude))
+        if wanted <= 0:
+            return []
+        candidates = np.argpartition(-scores, wanted - 1)[:wanted]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        results = []
+        for row in candidates:
+            startup_id = str(self.ids[row])
+            if startup_id in exclude:
+                continue
+            results.append((startup_id, float(scores[row])))
+            if len(results) == k:
+                break
+        return results
+
+    def investor_vector(self, investor):
+        """
+        Taste vector for an investor: the mean of their bookmarked startups
+        plus their preferred industries as text. None when there is nothing
+        to go on.
+        """
+        parts = [self.vectors[self.row[b]] for b in investor.get('bookmarks') or () if b in self.row]
+        industries = ' '.join(investor.get('preferred_industries') or [])
+        if industries:
+            parts.append(self.vector_for_text(industries))
+        if not parts:
+            return None
+        vector = np.mean(parts, axis=0)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def scorer(self, vector):
+        """startup_id -> cosine against vector (0.0 for startups not in the snapshot)"""
+        scores = self.vectors @ vector
+        row = self.row
+
+        def score(startup_id):
+            index = row.get(startup_id)
+            return float(scores[index]) if index is not None else 0.0
+        return score
+
+
+def current_index():
+    """The published similarity snapshot for this container, or None"""
+    if not available():
+        return None
+    return snapshots.load(SNAPSHOT_NAME, SimilarityIndex.from_bytes)
+
+
+def investor_scorer(index, investor):
+    """Similarity scorer for matching.match_investor, or None"""
+    if index is None:
+        return None
+    vector = index.investor_vector(investor)
+    return index.scorer(vector) if vector is not None else None
+
+
+def index_for_matching():
+    """
+    The snapshot to score with when the similarity term is enabled
+    (matching.SIMILARITY_POINTS). Matching must not fail because of it, so
+    load errors are logged and matching carries on without the term.
+    """
+    if not matching.SIMILARITY_POINTS or not snapshots.SNAPSHOT_BUCKET:
+        return None
+    try:
+        return current_index()
+    except Exception as e:
+        print(f"⚠️ Similarity snapshot unavailable, matching without it: {str(e)}")
+        return None
@@ -0,0 +1,85 @@
+"""
+Shared module: snapshots
+Purpose: Read-mostly artifacts (e.g. the startup similarity matrix) that a
+periodic job builds and publishes to S3, and that Lambdas load once per
+container
+
+A loaded snapshot is reused for SNAPSHOT_REFRESH_SECONDS, then revalidated
+with a HEAD request and only downloaded again when its ETag changed. If S3
+is unreachable the last good copy keeps being served.
+"""
+
+import os
+import threading
+import time
+
+import aws_clients
+
+SNAPSHOT_BUCKET = os.environ.get('SNAPSHOT_BUCKET', '')
+SNAPSHOT_PREFIX = os.environ.get('SNAPSHOT_PREFIX', 'snapshots/')
+SNAPSHOT_REFRESH_SECONDS = float(os.environ.get('SNAPSHOT_REFRESH_SECONDS', '300'))
+
+s3 = aws_clients.lazy_client('s3')
+
+# name -> {'checked': monotonic time, 'etag': str, 'value': parsed snapshot}
+_cache = {}
+_lock = threading.Lock()
+
+
+def _key(name):
+    return f'{SNAPSHOT_PREFIX}{name}'
+
+
+def _missing(error):
+    code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+    return code in ('404', 'NoSuchKey', 'NotFound')
+
+
+def publish(name, data, content_type='application/octet-stream'):
+    """Upload a snapshot; returns its ETag"""
+    response = s3.put_object(Bucket=SNAPSHOT_BUCKET, Key=_key(name), Body=data, ContentType=content_type)
+    return response['ETag']
+
+
+def load(name, parse):
+    """
+    Return parse(bytes) for the current snapshot, or None if it has never
+    been published. parse runs once per downloaded version.
+    """
+    now = time.monotonic()
+    entry = _cache.get(name)
+    if entry and now - entry['checked'] < SNAPSHOT_REFRESH_SECONDS:
+        return entry['value']
+
+    with _lock:
+        entry = _cache.get(name)
+        if entry and now - entry['checked'] < SNAPSHOT_REFRESH_SECONDS:
+            return entry['value']
+        try:
+            if entry and entry['etag']:
+                etag = s3.head_object(Bucket=SNAPSHOT_BUCKET, Key=_key(name))['ETag']
+                if etag == entry['etag']:
+                    entry['checked'] = now
+                    return entry['value']
+            response = s3.get_object(Bucket=SNAPSHOT_BUCKET, Key=_key(name))
+            started = time.perf_counter()
+            value = parse(response['Body'].read())
+            print(f"📦 Loaded snapshot {name} ({response.get('ContentLength', 0)} bytes) "
+                  f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+            _cache[name] = {'checked': now, 'etag': response['ETag'], 'value': value}
+            return value
+        except Exception as e:
+            if _missing(e):
+                # Remember the miss too, so unpublished snapshots cost one request per refresh window
+                _cache[name] = {'checked': now, 'etag': None, 'value': None}
+                return None
+            if entry and entry['etag']:
+                print(f"⚠️ Could not refresh snapshot {name}, serving cached copy: {str(e)}")
+                entry['checked'] = now
+                return entry['value']
+            raise
+
+
+def clear():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,217 @@
+"""
+Shared module: startup_records
+Purpose: Validate raw startup records against the startups table schema and
+derive the fields every write should carry (normalized industry, logo URL,
+coordinates and geohash, USD funding amount, TTL), so imports and API writes
+store the same shape
+
+Schema field types come from dynamodb-schemas/startups-table.json
+(CommonAttributes): "String" and "Number" are supported.
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from decimal import Decimal, InvalidOperation
+
+import funding
+import geo
+
+STARTUP_TTL_DAYS = int(os.environ.get('STARTUP_TTL_DAYS', '90'))
+
+# Deterministic startup ids for records that arrive without one
+STARTUP_ID_NAMESPACE = uuid.UUID('5f0c8c1e-3b7a-4a58-9d57-0b7d3f2c6a11')
+
+MAX_ITEM_BYTES = 400 * 1024
+
+# Canonical industry names, keyed by lower-case aliases
+INDUSTRY_ALIASES = {
+    'fintech': 'FinTech', 'fin tech': 'FinTech', 'financial technology': 'FinTech',
+    'healthtech': 'HealthTech', 'health tech': 'HealthTech', 'healthcare': 'HealthTech',
+    'digital health': 'HealthTech', 'medtech': 'HealthTech',
+    'ai': 'AI', 'a.i.': 'AI', 'artificial intelligence': 'AI', 'machine learning': 'AI', 'ml': 'AI',
+    'edtech': 'EdTech', 'ed tech': 'EdTech', 'education': 'EdTech',
+    'cleantech': 'CleanTech', 'clean tech': 'CleanTech', 'climate': 'CleanTech',
+    'climatetech': 'CleanTech', 'climate tech': 'CleanTech', 'greentech': 'CleanTech',
+    'e-commerce': 'E-commerce', 'ecommerce': 'E-commerce', 'e commerce': 'E-commerce',
+    'retail': 'E-commerce',
+    'saas': 'SaaS', 'software': 'SaaS', 'b2b saas': 'SaaS',
+    'cybersecurity': 'Cybersecurity', 'cyber security': 'Cybersecurity', 'security': 'Cybersecurity',
+    'biotech': 'BioTech', 'bio tech': 'BioTech', 'biotechnology': 'BioTech', 'life sciences': 'BioTech',
+    'agritech': 'AgriTech', 'agtech': 'AgriTech', 'agriculture': 'AgriTech',
+    'proptech': 'PropTech', 'real estate': 'PropTech',
+    'mobility': 'Mobility', 'transportation': 'Mobility', 'automotive': 'Mobility',
+    'gaming': 'Gaming', 'games': 'Gaming',
+    'foodtech': 'FoodTech', 'food tech': 'FoodTech', 'food': 'FoodTech',
+    'insurtech': 'InsurTech', 'insurance': 'InsurTech',
+    'logistics': 'Logistics', 'supply chain': 'Logistics',
+    'media': 'Media', 'entertainment': 'Media',
+    'robotics': 'Robotics',
+    'spacetech': 'SpaceTech', 'space': 'SpaceTech', 'aerospace': 'SpaceTech',
+    'web3': 'Web3', 'crypto': 'Web3', 'blockchain': 'Web3',
+}
+
+
+class ValidationError(ValueError):
+    """A record that cannot be written; the message says which field and why"""
+
+
+def load_schema(path):
+    """{field: {'type': 'String'|'Number', 'required': bool}} from a table schema file"""
+    with open(path) as f:
+        schema = json.load(f)
+    return {
+        name: {'type': spec.get('Type', 'String'), 'required': bool(spec.get('Required'))}
+        for name, spec in schema.get('CommonAttributes', {}).items()
+    }
+
+
+def normalize_industry(value):
+    """Map free-form industry labels onto the canonical names used for matching"""
+    cleaned = ' '.join(str(value).split())
+    if not cleaned:
+        return ''
+    canonical = INDUSTRY_ALIASES.get(cleaned.lower())
+    if canonical:
+        return canonical
+    # Unknown labels keep their wording, with consistent capitalisation
+    return cleaned if any(c.isupper() for c in cleaned[1:]) else cleaned.title()
+
+
+def normalize_website(value):
+    website = str(value).strip()
+    if website and not re.match(r'^https?://', website, re.IGNORECASE):
+        website = 'https://' + website
+    return website
+
+
+def website_domain(website):
+    """Bare lower-case domain of a website URL ('' if there is none)"""
+    domain = re.sub(r'^https?://', '', website.strip(), flags=re.IGNORECASE)
+    domain = re.sub(r'^www\.', '', domain, flags=re.IGNORECASE)
+    return domain.split('/')[0].split('?')[0].split(':')[0].lower()
+
+
+def logo_url_for(website):
+    """Clearbit logo URL for a website (same rule as scripts/add-missing-logos.sh)"""
+    domain = website_domain(website)
+    return f'https://logo.clearbit.com/{domain}' if domain else ''
+
+
+def startup_id_for(record):
+    """Stable id from the website domain (or name), so re-imports overwrite instead of duplicating"""
+    basis = website_domain(record.get('website', '')) or str(record.get('name', '')).strip().lower()
+    return str(uuid.uuid5(STARTUP_ID_NAMESPACE, basis))
+
+
+def _to_number(name, value):
+    if isinstance(value, bool):
+        raise ValidationError(f'{name}: expected a number, got {value!r}')
+    if isinstance(value, Decimal):
+        return value
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValidationError(f'{name}: expected a number, got {value!r}')
+    if not number.is_finite():
+        raise ValidationError(f'{name}: expected a finite number, got {value!r}')
+    return number
+
+
+def _point(item):
+    """(latitude, longitude) from explicit coordinates or the gazetteer, or None"""
+    if 'latitude' in item or 'longitude' in item:
+        if 'latitude' not in item or 'longitude' not in item:
+            raise ValidationError('latitude/longitude: both are required together')
+        try:
+            latitude, longitude = float(item['latitude']), float(item['longitude'])
+        except (TypeError, ValueError):
+            raise ValidationError(f"latitude/longitude: expected numbers, got "
+                                  f"({item['latitude']!r}, {item['longitude']!r})")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError(f'latitude/longitude: out of range ({latitude}, {longitude})')
+        return latitude, longitude
+    located = geo.locate(item.get('location', ''))
+    return (located['latitude'], located['longitude']) if located else None
+
+
+def location_fields_for(item):
+    """latitude/longitude/geohash/geohash_cell for an item, {} when it cannot be located"""
+    point = _point(item)
+    return geo.location_fields(*point) if point else {}
+
+
+def funding_fields_for(item):
+    """funding_amount_usd/funding_currency for an item, {} when funding_amount has no single amount"""
+    parsed = funding.parse_amount(item['funding_amount']) if 'funding_amount' in item else None
+    return {'funding_amount_usd': parsed[0], 'funding_currency': parsed[1]} if parsed else {}
+
+
+def _item_bytes(item):
+    return sum(len(k.encode('utf-8')) + len(str(v).encode('utf-8')) for k, v in item.items())
+
+
+def prepare(record, fields, now=None, ttl_days=None):
+    """
+    Validate one raw record (dict of strings/numbers, e.g. a CSV row) and
+    return the item to write. Raises ValidationError.
+
+    Empty values are dropped. Derived fields: startup_id (when missing),
+    industry (normalized), website (scheme added), logo_url (from the
+    website when missing), latitude/longitude/geohash (from the location),
+    funding_amount_usd/funding_currency (parsed from funding_amount; absent
+    when it has no single amount), expiration_time (now + STARTUP_TTL_DAYS
+    when missing).
+    """
+    now = int(time.time() if now is None else now)
+    ttl_days = STARTUP_TTL_DAYS if ttl_days is None else ttl_days
+
+    item = {}
+    for name, value in record.items():
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        spec = fields.get(name)
+        if spec and spec['type'] == 'Number':
+            item[name] = _to_number(name, value)
+        elif isinstance(value, (dict, list)):
+            raise ValidationError(f'{name}: nested values are not supported')
+        elif isinstance(value, float):
+            item[name] = Decimal(str(value))
+        else:
+            item[name] = value.strip() if isinstance(value, str) else value
+
+    if 'name' in item:
+        item['name'] = ' '.join(str(item['name']).split())
+    if 'website' in item:
+        item['website'] = normalize_website(item['website'])
+    if 'industry' in item:
+        item['industry'] = normalize_industry(item['industry'])
+    if 'startup_id' not in item and (item.get('name') or item.get('website')):
+        item['startup_id'] = startup_id_for(item)
+    if 'logo_url' not in item and item.get('website'):
+        item['logo_url'] = logo_url_for(item['website'])
+    # Derived fields are never taken from the record
+    item.pop('geohash', None)
+    item.pop('geohash_cell', None)
+    item.update(location_fields_for(item))
+    item.pop('funding_amount_usd', None)
+    item.pop('funding_currency', None)
+    item.update(funding_fields_for(item))
+    if 'expiration_time' not in item and ttl_days:
+        item['expiration_time'] = Decimal(now + ttl_days * 24 * 3600)
+
+    for name, spec in fields.items():
+        if spec['required'] and name not in item:
+            raise ValidationError(f'{name}: required')
+
+    if 'founded_year' in item:
+        year = item['founded_year']
+        if year != year.to_integral_value() or not 1800 <= year <= time.gmtime(now).tm_year + 1:
+            raise ValidationError(f"founded_year: implausible value {year}")
+    if 'expiration_time' in item and item['expiration_time'] <= now:
+        raise ValidationError('expiration_time: already in the past')
+    if _item_bytes(item) > MAX_ITEM_BYTES:
+        raise ValidationError('record exceeds the 400 KB DynamoDB item limit')
+    return item
@@ -0,0 +1,83 @@
+"""
+Shared module: trending
+Purpose: Time-decayed leaderboard of the most viewed and contacted startups,
+aggregated from the sharded counters (see counters.py)
+
+snapshot-builder scans the counters table and sums every startup's shards
+and windows. A window's views and contacts (contacts weigh
+TRENDING_CONTACT_WEIGHT views) decay by half every TRENDING_HALF_LIFE_HOURS,
+measured from the middle of the window, and windows older than
+TRENDING_LOOKBACK_HOURS are ignored. The top TRENDING_SIZE startups are
+published as a small JSON snapshot that the API serves from its
+per-container snapshot cache. No counter is read on the request path.
+"""
+
+import heapq
+import json
+import os
+import time
+from collections import defaultdict
+
+import counters
+import snapshots
+
+SNAPSHOT_NAME = 'trending.json'
+TRENDING_SIZE = int(os.environ.get('TRENDING_SIZE', '100'))
+TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', '12'))
+TRENDING_LOOKBACK_HOURS = float(os.environ.get('TRENDING_LOOKBACK_HOURS', '72'))
+TRENDING_CONTACT_WEIGHT = float(os.environ.get('TRENDING_CONTACT_WEIGHT', '5'))
+
+
+def decay(age_seconds):
+    """Weight of a count age_seconds old"""
+    return 0.5 ** (max(age_seconds, 0.0) / (TRENDING_HALF_LIFE_HOURS * 3600))
+
+
+def build(counter_items, now=None, size=None):
+    """
+    Leaderboard dict from counter items (startup_id, window_start, views,
+    contacts): startups best first, each with its decayed score and the
+    raw views/contacts inside the lookback
+    """
+    now = time.time() if now is None else now
+    size = size or TRENDING_SIZE
+    cutoff = now - TRENDING_LOOKBACK_HOURS * 3600
+    half_window = counters.COUNTER_WINDOW_SECONDS / 2
+    scores = defaultdict(float)
+    totals = defaultdict(lambda: [0, 0])
+    weights = {}
+    for item in counter_items:
+        window = int(item['window_start'])
+        if window + counters.COUNTER_WINDOW_SECONDS <= cutoff:
+            continue
+        views = int(item.get(counters.VIEWS, 0))
+        contacts = int(item.get(counters.CONTACTS, 0))
+        # Many shards share a window, so each weight is computed once
+        weight = weights.get(window)
+        if weight is None:
+            weight = weights[window] = decay(now - window - half_window)
+        startup_id = item['startup_id']
+        scores[startup_id] += (views + TRENDING_CONTACT_WEIGHT * contacts) * weight
+        totals[startup_id][0] += views
+        totals[startup_id][1] += contacts
+
+    ranked = heapq.nlargest(size, scores.items(), key=lambda entry: (entry[1], entry[0]))
+    return {
+        'built_at': int(now),
+        'half_life_hours': TRENDING_HALF_LIFE_HOURS,
+        'lookback_hours': TRENDING_LOOKBACK_HOURS,
+        'startups': [
+            {'startup_id': startup_id, 'score': round(score, 4),
+             counters.VIEWS: totals[startup_id][0], counters.CONTACTS: totals[startup_id][1]}
+            for startup_id, score in ranked if score > 0
+        ],
+    }
+
+
+def to_bytes(leaderboard):
+    return json.dumps(leaderboard, separators=(',', ':')).encode('utf-8')
+
+
+def current_leaderboard():
+    """The published trending snapshot for this container, or None"""
+    return snapshots.load(SNAPSHOT_NAME, json.loads)
@@ -0,0 +1,109 @@
+"""
+Lambda Function: startup-investor-platform-snapshot-builder
+Purpose: Rebuild the read-mostly snapshots that other Lambdas load from S3
+(see shared/snapshots.py)
+Triggered by: EventBridge (every 15 minutes)
+
+Snapshots:
+  similarity - TF-IDF description vectors for every startup
+               (GET /startups/{id}/similar, similarity term in matching)
+  affinity   - sparse startup co-occurrence from bookmark/contact events
+               (re-ranking in matching)
+  trending   - time-decayed leaderboard from the sharded view/contact
+               counters (GET /startups/trending)
+
+Pass {"snapshots": ["similarity"]} to rebuild a subset.
+"""
+
+import json
+import os
+import sys
+import time
+
+# Shared modules are bundled next to index.py at deploy time; fall back to the source tree locally
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+import affinity
+import aws_clients
+import capacity
+import counters
+import events
+import profiling
+import similarity
+import snapshots
+import trending
+
+# Full-table scans: paced by the container's capacity budget so API traffic keeps priority
+dynamodb = capacity.tracked(aws_clients.lazy_resource('dynamodb'), capacity.BACKGROUND, 'snapshot-builder')
+
+STARTUPS_TABLE = os.environ['STARTUPS_TABLE']
+
+
+def scan_all(table_name, fields):
+    """Every item in a table (all pages), projected to fields"""
+    table = dynamodb.Table(table_name)
+    names = {f'#{field}': field for field in fields}
+    params = {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+    response = table.scan(**params)
+    items = response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **params)
+        items.extend(response.get('Items', []))
+    return items
+
+
+def build_similarity():
+    if not similarity.available():
+        raise RuntimeError('numpy is not available (attach the numpy layer)')
+    startups = scan_all(STARTUPS_TABLE, ('startup_id', 'description', 'industry'))
+    index = similarity.SimilarityIndex.build(startups)
+    data = index.to_bytes()
+    snapshots.publish(similarity.SNAPSHOT_NAME, data)
+    return {'startups': len(index), 'dimensions': int(index.vectors.shape[1]), 'bytes': len(data)}
+
+
+def build_affinity():
+    log = scan_all(events.EVENTS_TABLE, ('investor_id', 'event_key', 'event_type', 'startup_id'))
+    matrix = affinity.AffinityMatrix.build(log, built_at=time.time())
+    data = matrix.to_bytes()
+    snapshots.publish(affinity.SNAPSHOT_NAME, data)
+    return {'events': len(log), 'startups': len(matrix), 'pairs': len(matrix.indices), 'bytes': len(data)}
+
+
+def build_trending():
+    items = scan_all(counters.COUNTERS_TABLE, ('startup_id', 'window_start', counters.VIEWS, counters.CONTACTS))
+    leaderboard = trending.build(items)
+    data = trending.to_bytes(leaderboard)
+    snapshots.publish(trending.SNAPSHOT_NAME, data, content_type='application/json')
+    return {'counters': len(items), 'startups': len(leaderboard['startups']), 'bytes': len(data)}
+
+
+BUILDERS = {
+    'similarity': build_similarity,
+    'affinity': build_affinity,
+    'trending': build_trending,
+}
+
+
+@profiling.profiled('snapshot-builder')
+@capacity.metered('snapshot-builder')
+def lambda_handler(event, context):
+    requested = (event or {}).get('snapshots') or list(BUILDERS)
+    unknown = [name for name in requested if name not in BUILDERS]
+    if unknown:
+        return {'statusCode': 400, 'body': json.dumps({'error': f'Unknown snapshots: {unknown}'})}
+
+    results = {}
+    failed = False
+    for name in requested:
+        started = time.perf_counter()
+        try:
+            with capacity.caller(f'snapshot.{name}'), profiling.stage(f'snapshot.{name}'):
+                results[name] = BUILDERS[name]()
+            results[name]['seconds'] = round(time.perf_counter() - started, 3)
+            print(f"✅ Published {name} snapshot: {results[name]}")
+        except Exception as e:
+            failed = True
+            results[name] = {'error': str(e)}
+            print(f"❌ Failed to build {name} snapshot: {str(e)}")
+
+    return {'statusCode': 500 if failed else 200, 'body': json.dumps(results)}
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Startup backfill.
+Purpose: Add the derived fields newer code expects to startups that were
+written before it existed, in place: latitude/longitude/geohash/geohash_cell
+(GeohashIndex, GET /startups?near=) and funding_amount_usd/funding_currency
+(FundingAmountIndex, GET /startups?min_investment=&max_investment=)
+
+Each derived field is recomputed with the rules imports use
+(shared/startup_records.py) from the fields stored on the item. Only items
+whose stored values differ are updated, with an UpdateItem that sets (or
+removes) just those fields, so the rest of each item is left alone and the
+script can be re-run safely. Items deleted while the scan runs are skipped
+rather than re-created. Writes are paced as a background job (capacity.py).
+
+Run it after deploying each index and before clients start using the
+feature: items without the index keys are missing from the index, so
+queries against it silently return fewer results.
+
+Usage:
+    python scripts/backfill_startups.py --dry-run
+    python scripts/backfill_startups.py --only funding
+    python scripts/backfill_startups.py --segments 8 --workers 16
+    python scripts/backfill_startups.py --local           # in-memory stand-in table with sample data
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda-functions', 'shared'))
+
+import aws_clients  # noqa: E402
+import capacity  # noqa: E402
+import startup_records  # noqa: E402
+
+DEFAULT_TABLE = 'startup-investor-platform-dev-startups'
+
+# name: (fields the derivation reads, fields it writes, derivation)
+DERIVATIONS = {
+    'location': (('location', 'latitude', 'longitude'),
+                 ('latitude', 'longitude', 'geohash', 'geohash_cell'),
+                 startup_records.location_fields_for),
+    'funding': (('funding_amount',),
+                ('funding_amount_usd', 'funding_currency'),
+                startup_records.funding_fields_for),
+}
+
+
+def changes(item, derivations):
+    """({field: new value}, [fields to remove]) to bring an item's derived fields up to date"""
+    updates, removals = {}, []
+    for name in derivations:
+        reads, derived, derive = DERIVATIONS[name]
+        expected = derive(item)
+        for field in derived:
+            if field in expected:
+                if item.get(field) != expected[field]:
+                    updates[field] = expected[field]
+            elif field in item and field not in reads:
+                # Stale derived value (fields the derivation reads are never removed)
+                removals.append(field)
+    return updates, removals
+
+
+class Backfill:
+    def __init__(self, table, derivations, dry_run=False):
+        self.table = table
+        self.derivations = derivations
+        self.dry_run = dry_run
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    def update(self, item):
+        try:
+            updates, removals = changes(item, self.derivations)
+        except startup_records.ValidationError as e:
+            self.count('invalid')
+            print(f"  ⚠️ {item['startup_id']}: {str(e)}")
+            return
+        if not updates and not removals:
+            self.count('current')
+            return
+        if self.dry_run:
+            self.count('updated')
+            return
+
+        names = {'#startup_id': 'startup_id'}
+        values = {}
+        clauses = []
+        for field, value in updates.items():
+            names[f'#{field}'] = field
+            values[f':{field}'] = value
+            clauses.append(f'#{field} = :{field}')
+        expression = f"SET {', '.join(clauses)}" if clauses else ''
+        if removals:
+            names.update({f'#{field}': field for field in removals})
+            expression += f" REMOVE {', '.join(f'#{field}' for field in removals)}"
+        params = {
+            'Key': {'startup_id': item['startup_id']},
+            'UpdateExpression': expression.strip(),
+            'ConditionExpression': 'attribute_exists(#startup_id)',
+            'ExpressionAttributeNames': names,
+        }
+        if values:
+            params['ExpressionAttributeValues'] = values
+        try:
+            self.table.update_item(**params)
+            self.count('updated')
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                self.count('deleted')
+            else:
+                self.count('failed')
+                print(f"  ❌ {item['startup_id']}: {str(e)}")
+
+    def scan_segment(self, segment, total_segments, pool):
+        fields = {'startup_id'}
+        for name in self.derivations:
+            reads, derived, _ = DERIVATIONS[name]
+            fields.update(reads)
+            fields.update(derived)
+        names = {f'#{field}': field for field in sorted(fields)}
+        params = {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names,
+                  'Segment': segment, 'TotalSegments': total_segments}
+        while True:
+            response = self.table.scan(**params)
+            items = response.get('Items', [])
+            self.count('scanned', len(items))
+            for future in [pool.submit(self.update, item) for item in items]:
+                future.result()
+            if 'LastEvaluatedKey' not in response:
+                return
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def local_table(table_name):
+    """In-memory stand-in table holding the benchmark sample startups, stripped of derived fields"""
+    sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+    from local_aws import LocalAWS
+    import synthetic_data
+
+    aws = LocalAWS()
+    table = aws.dynamodb.create_table_from_schema('startups-table.json', table_name)
+    derived = {field for _, fields, _ in DERIVATIONS.values() for field in fields}
+    legacy = ({k: v for k, v in item.items() if k not in derived} for item in synthetic_data.iter_startups(500))
+    table.load(legacy)
+    aws_clients.set_factory(aws)
+    return aws
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add derived fields to existing startups in place')
+    parser.add_argument('--table', default=os.environ.get('STARTUPS_TABLE', DEFAULT_TABLE))
+    parser.add_argument('--region', default=os.environ.get('AWS_REGION', 'eu-north-1'))
+    parser.add_argument('--only', choices=sorted(DERIVATIONS), action='append',
+                        help='backfill only these derived fields (repeatable; default: all)')
+    parser.add_argument('--segments', type=int, default=4, help='parallel scan segments')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent UpdateItem calls per segment')
+    parser.add_argument('--dry-run', action='store_true', help='report what would change, write nothing')
+    parser.add_argument('--local', action='store_true', help='run against an in-memory stand-in table')
+    args = parser.parse_args()
+
+    derivations = args.only or sorted(DERIVATIONS)
+    local = local_table(args.table) if args.local else None
+    dynamodb = capacity.tracked(aws_clients.resource('dynamodb', region_name=args.region),
+                                capacity.BACKGROUND, 'backfill-startups')
+    backfill = Backfill(dynamodb.Table(args.table), derivations, args.dry_run)
+    target = 'dry run' if args.dry_run else ('local stand-in' if local else f'{args.table} ({args.region})')
+    print(f"🔧 Backfilling {', '.join(derivations)} -> {target}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.segments) as scanners, \
+            ThreadPoolExecutor(max_workers=args.segments * args.workers) as writers:
+        for future in [scanners.submit(backfill.scan_segment, segment, args.segments, writers)
+                       for segment in range(args.segments)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    stats = backfill.stats
+    print(f"\n✨ Done in {elapsed:.1f}s")
+    print(f"   Scanned:  {stats['scanned']}")
+    print(f"   {'To update:' if args.dry_run else 'Updated: '} {stats['updated']}")
+    print(f"   Current:  {stats['current']}")
+    print(f"   Invalid:  {stats['invalid']} (left unchanged)")
+    if not args.dry_run:
+        print(f"   Deleted:  {stats['deleted']} (removed during the scan, skipped)")
+        print(f"   Failed:   {stats['failed']}")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
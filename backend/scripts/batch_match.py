@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Offline batch matching.
+Purpose: Score every investor in a snapshot against the whole catalogue on
+all cores, with the rules dev-startup-matcher uses (shared/matching.py with
+the investment-range and proximity terms), for backfills, re-scoring after a
+matching-rule change and capacity planning
+
+Snapshots are directories holding startups.jsonl and investors.jsonl
+(optionally .gz), one table item per line. `export` writes them from the
+live tables; benchmarks/synthetic_data.py writes synthetic ones. The
+catalogue is cut down to the fields scoring reads and handed to each worker
+process once, through the pool initializer (inherited on fork, pickled once
+per worker where processes are spawned). Each worker builds its indexes
+once and then scores chunks of investors, so afterwards only investor
+chunks and (startup_id, score) pairs cross process boundaries.
+
+Results go to a JSONL file (--out) and/or to the investors table
+(--write-dynamodb), stored the way the matcher stores them. Terms that need
+S3 snapshots (similarity, affinity) are not applied.
+
+Usage:
+    python scripts/batch_match.py export --out-dir /tmp/snapshot
+    python scripts/batch_match.py run /tmp/snapshot --out recommendations.jsonl
+    python scripts/batch_match.py run /tmp/snapshot --workers 8 --write-dynamodb
+    python benchmarks/synthetic_data.py --startups 100000 --investors 20000 --out /tmp/synthetic
+    python scripts/batch_match.py run /tmp/synthetic --out /dev/null
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda-functions', 'shared'))
+
+import aws_clients  # noqa: E402
+import capacity  # noqa: E402
+import funding  # noqa: E402
+import geo  # noqa: E402
+import matching  # noqa: E402
+import recommendations  # noqa: E402
+
+DEFAULT_STARTUPS_TABLE = 'startup-investor-platform-dev-startups'
+DEFAULT_INVESTORS_TABLE = 'startup-investor-platform-dev-investors'
+
+# Everything scoring reads (match dicts are never built here, only (startup_id, score) pairs)
+STARTUP_FIELDS = ('startup_id', 'industry', 'funding_stage', 'funding_amount', 'funding_amount_usd',
+                  'latitude', 'longitude')
+INVESTOR_FIELDS = ('investor_id', 'preferred_industries', 'preferred_funding_stages',
+                   'min_investment', 'max_investment', 'latitude', 'longitude')
+
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, set):
+        return sorted(obj)
+    raise TypeError
+
+
+def snapshot_file(directory, name):
+    for candidate in (f'{name}.jsonl', f'{name}.jsonl.gz'):
+        path = os.path.join(directory, candidate)
+        if os.path.exists(path):
+            return path
+    raise SystemExit(f"No {name}.jsonl(.gz) in {directory}")
+
+
+def read_snapshot(path, fields, decimals=False):
+    """Items from a JSONL snapshot, projected to fields (numbers as Decimal for boto3 if decimals)"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line, parse_float=Decimal if decimals else float)
+                yield {field: item[field] for field in fields if field in item}
+
+
+# =========================================================================
+# Workers
+# =========================================================================
+
+_worker = {}
+
+
+def init_worker(startups):
+    """Per process: keep the catalogue and build the indexes once"""
+    _worker['startups'] = startups
+    _worker['funding_index'] = funding.index_for_matching(startups)
+    _worker['geo_index'] = geo.index_for_matching(startups)
+
+
+def score_chunk(investors, top_k):
+    """
+    ([(investor_id, [(startup_id, score), ...] or None, total)], pairs
+    scored, CPU seconds) for a chunk; None means no preferences, which the
+    matcher stores as empty recommendations.
+    """
+    started = time.process_time()
+    startups = _worker['startups']
+    results = []
+    pairs = 0
+    for investor in investors:
+        if not matching.has_preferences(investor):
+            results.append((investor['investor_id'], None, 0))
+            continue
+        candidates = funding.investor_candidates(_worker['funding_index'], investor, startups)
+        pairs += len(candidates)
+        matches, total = matching.top_matches(
+            investor, candidates, k=top_k,
+            proximity=geo.investor_scorer(_worker['geo_index'], investor)
+        )
+        results.append((investor['investor_id'], [(m['startup_id'], m['match_score']) for m in matches], total))
+    return results, pairs, time.process_time() - started
+
+
+# =========================================================================
+# Output
+# =========================================================================
+
+class DynamoDBWriter:
+    """
+    Replaces stored recommendations with concurrent UpdateItem calls, paced
+    as a background job (capacity.py). BatchWriteItem can only put whole
+    items, which would wipe the rest of each investor profile. Investors
+    deleted since the snapshot are skipped, not re-created as bare items.
+    """
+
+    def __init__(self, table_name, region, workers):
+        dynamodb = capacity.tracked(aws_clients.resource('dynamodb', region_name=region),
+                                    capacity.BACKGROUND, 'batch-match.persist')
+        self.table = dynamodb.Table(table_name)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.pending = []
+        self.workers = workers
+        self.written = self.skipped = self.failed = 0
+        self.lock = threading.Lock()
+        self.timestamp = datetime.utcnow().isoformat()
+
+    def _write(self, investor_id, pairs):
+        matches = [{'startup_id': startup_id, 'match_score': score} for startup_id, score in pairs or []]
+        try:
+            self.table.update_item(
+                Key={'investor_id': investor_id},
+                UpdateExpression='SET recommendations = :recs, last_matched = :timestamp',
+                ConditionExpression='attribute_exists(investor_id)',
+                ExpressionAttributeValues={':recs': recommendations.encode(matches), ':timestamp': self.timestamp}
+            )
+            with self.lock:
+                self.written += 1
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                with self.lock:
+                    self.skipped += 1
+                return
+            with self.lock:
+                self.failed += 1
+            print(f"  ❌ {investor_id}: {str(e)}")
+
+    def add(self, investor_id, pairs):
+        self.pending.append(self.pool.submit(self._write, investor_id, pairs))
+        # Bound memory: wait for the oldest writes once enough are queued
+        while len(self.pending) >= self.workers * 50:
+            self.pending.pop(0).result()
+
+    def close(self):
+        for future in self.pending:
+            future.result()
+        self.pool.shutdown()
+
+
+def local_tables(args):
+    """In-memory stand-in investors table loaded from the snapshot (no AWS access)"""
+    sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+    from local_aws import LocalAWS
+
+    aws = LocalAWS()
+    table = aws.dynamodb.create_table_from_schema('investors-table.json', args.investors_table)
+    table.load(read_snapshot(snapshot_file(args.snapshot_dir, 'investors'), INVESTOR_FIELDS, decimals=True))
+    aws_clients.set_factory(aws)
+    return aws
+
+
+# =========================================================================
+# Commands
+# =========================================================================
+
+def run(args):
+    startups = list(read_snapshot(snapshot_file(args.snapshot_dir, 'startups'), STARTUP_FIELDS))
+    investors = read_snapshot(snapshot_file(args.snapshot_dir, 'investors'), INVESTOR_FIELDS)
+    workers = args.workers or os.cpu_count() or 1
+    print(f"🎯 Matching investors in {args.snapshot_dir} against {len(startups)} startups "
+          f"({workers} worker processes, chunks of {args.chunk_size})")
+
+    local = local_tables(args) if args.local else None
+    out = open(args.out, 'w') if args.out else None
+    writer = DynamoDBWriter(args.investors_table, args.region, args.write_workers) if args.write_dynamodb else None
+
+    stats = {'investors': 0, 'no_preferences': 0, 'matches': 0, 'pairs': 0, 'cpu_seconds': 0.0}
+
+    def collect(future):
+        results, pairs, cpu_seconds = future.result()
+        stats['pairs'] += pairs
+        stats['cpu_seconds'] += cpu_seconds
+        for investor_id, top, total in results:
+            stats['investors'] += 1
+            stats['no_preferences'] += 1 if top is None else 0
+            stats['matches'] += total
+            if out:
+                out.write(json.dumps({'investor_id': investor_id, 'total_matches': total,
+                                      'recommendations': top or []}, default=_json_default) + '\n')
+            if writer:
+                writer.add(investor_id, top)
+
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(startups,)) as pool:
+            pending = []
+            chunk = []
+            for investor in investors:
+                chunk.append(investor)
+                if len(chunk) == args.chunk_size:
+                    pending.append(pool.submit(score_chunk, chunk, args.top_k))
+                    chunk = []
+                    # Bound memory: a few chunks per worker in flight
+                    while len(pending) >= workers * 4:
+                        collect(pending.pop(0))
+            if chunk:
+                pending.append(pool.submit(score_chunk, chunk, args.top_k))
+            for future in pending:
+                collect(future)
+        scored = time.perf_counter() - started
+        if writer:
+            writer.close()
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - started
+
+    pairs, cpu = stats['pairs'], stats['cpu_seconds']
+    print(f"\n✨ Done in {elapsed:.1f}s (scoring {scored:.1f}s)")
+    print(f"   Investors:    {stats['investors']} ({stats['no_preferences']} without preferences)")
+    print(f"   Matches:      {stats['matches']} (top {args.top_k} kept per investor)")
+    print(f"   Pairs scored: {pairs} ({pairs / scored if scored else 0:,.0f}/s overall, "
+          f"{pairs / cpu if cpu else 0:,.0f}/s per core over {cpu:.1f} worker CPU seconds)")
+    if writer:
+        print(f"   Stored:       {writer.written} investors ({writer.skipped} deleted since the snapshot, "
+              f"{writer.failed} failed)")
+    if local:
+        print(f"   Local table holds {len(local.dynamodb.Table(args.investors_table))} investors")
+    return 1 if writer and writer.failed else 0
+
+
+def export(args):
+    """Parallel scan of both tables into <out-dir>/{startups,investors}.jsonl.gz"""
+    os.makedirs(args.out_dir, exist_ok=True)
+    dynamodb = aws_clients.resource('dynamodb', region_name=args.region)
+    for name, table_name, fields in (('startups', args.startups_table, STARTUP_FIELDS),
+                                     ('investors', args.investors_table, INVESTOR_FIELDS)):
+        path = os.path.join(args.out_dir, f'{name}.jsonl.gz')
+        started = time.perf_counter()
+        count = 0
+        lock = threading.Lock()
+        names = {f'#{field}': field for field in fields}
+
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            def scan_segment(segment):
+                nonlocal count
+                params = {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names,
+                          'Segment': segment, 'TotalSegments': args.segments}
+                table = dynamodb.Table(table_name)
+                while True:
+                    response = table.scan(**params)
+                    lines = [json.dumps(item, default=_json_default) + '\n' for item in response.get('Items', [])]
+                    with lock:
+                        f.writelines(lines)
+                        count += len(lines)
+                    if 'LastEvaluatedKey' not in response:
+                        return
+                    params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+            with ThreadPoolExecutor(max_workers=args.segments) as pool:
+                list(pool.map(scan_segment, range(args.segments)))
+        print(f"✅ {table_name}: {count} items -> {path} ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline multi-core batch matching over table snapshots')
+    parser.add_argument('--region', default=os.environ.get('AWS_REGION', 'eu-north-1'))
+    parser.add_argument('--startups-table', default=os.environ.get('STARTUPS_TABLE', DEFAULT_STARTUPS_TABLE))
+    parser.add_argument('--investors-table', default=os.environ.get('INVESTORS_TABLE', DEFAULT_INVESTORS_TABLE))
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='score a snapshot')
+    run_parser.add_argument('snapshot_dir', help='directory with startups.jsonl(.gz) and investors.jsonl(.gz)')
+    run_parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    run_parser.add_argument('--chunk-size', type=int, default=200, help='investors per task')
+    run_parser.add_argument('--top-k', type=int, default=matching.MATCH_TOP_K)
+    run_parser.add_argument('--out', help='write recommendations to this JSONL file')
+    run_parser.add_argument('--write-dynamodb', action='store_true',
+                            help='replace stored recommendations in the investors table')
+    run_parser.add_argument('--write-workers', type=int, default=16, help='concurrent UpdateItem calls')
+    run_parser.add_argument('--local', action='store_true',
+                            help='with --write-dynamodb: write to an in-memory stand-in table')
+
+    export_parser = commands.add_parser('export', help='snapshot the live tables to JSONL.gz')
+    export_parser.add_argument('--out-dir', required=True)
+    export_parser.add_argument('--segments', type=int, default=8, help='parallel scan segments per table')
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        return export(args)
+    if not args.out and not args.write_dynamodb:
+        parser.error('run: pass --out and/or --write-dynamodb')
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
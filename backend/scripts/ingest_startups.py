@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Bulk startup ingestion.
+Purpose: Stream startups from a CSV or JSONL file into the startups table:
+validate each record against dynamodb-schemas/startups-table.json, derive
+normalized industry / logo URL / expiration_time, and write with parallel
+BatchWriteItem calls that retry unprocessed items
+
+Records are read, validated and written as a stream, so memory stays flat
+regardless of file size. Invalid records are reported (and optionally
+written to --rejects as JSONL with the reason) without stopping the import.
+
+Usage:
+    python scripts/ingest_startups.py startups.csv
+    python scripts/ingest_startups.py startups.jsonl --workers 16 --rejects rejected.jsonl
+    python scripts/ingest_startups.py startups.csv --dry-run
+    python scripts/ingest_startups.py startups.jsonl --local          # in-memory stand-in table
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda-functions', 'shared'))
+
+import aws_clients  # noqa: E402
+import ddb_batch  # noqa: E402
+import startup_records  # noqa: E402
+
+SCHEMA_FILE = os.path.join(BACKEND_DIR, 'dynamodb-schemas', 'startups-table.json')
+DEFAULT_TABLE = 'startup-investor-platform-dev-startups'
+
+
+def open_source(path):
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def detect_format(path, requested):
+    if requested != 'auto':
+        return requested
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    raise SystemExit(f"Cannot tell the format of {path}; pass --format csv or --format jsonl")
+
+
+def read_records(stream, fmt):
+    """Yields (line number, raw record or None, parse error or None)"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line, parse_float=str)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f'invalid JSON: {e.msg}'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'expected a JSON object'
+            continue
+        yield line_number, record, None
+
+
+class Importer:
+    def __init__(self, fields, rejects=None, ttl_days=None):
+        self.fields = fields
+        self.rejects = rejects
+        self.ttl_days = ttl_days
+        self.stats = Counter()
+        self.reasons = Counter()
+        self.lock = threading.Lock()
+        self.now = int(time.time())
+
+    def reject(self, line_number, record, reason):
+        self.stats['rejected'] += 1
+        self.reasons[reason.split(':')[0]] += 1
+        if self.rejects:
+            self.rejects.write(json.dumps({'line': line_number, 'error': reason, 'record': record},
+                                          default=str) + '\n')
+
+    def items(self, records):
+        """Valid, prepared items from the raw record stream"""
+        for line_number, record, error in records:
+            self.stats['read'] += 1
+            if error:
+                self.reject(line_number, None, error)
+                continue
+            try:
+                yield startup_records.prepare(record, self.fields, now=self.now, ttl_days=self.ttl_days)
+            except startup_records.ValidationError as e:
+                self.reject(line_number, record, str(e))
+
+    def on_chunk(self, written, retries):
+        with self.lock:
+            self.stats['written'] += written
+            self.stats['unprocessed_retries'] += retries
+
+
+def local_table(table_name):
+    """In-memory stand-in table from the benchmarks package (no AWS access)"""
+    sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+    from local_aws import LocalAWS, LocalDynamoDB
+
+    aws = LocalAWS(dynamodb=LocalDynamoDB(unprocessed_rate=float(os.environ.get('LOCAL_UNPROCESSED_RATE', '0'))))
+    aws.dynamodb.create_table_from_schema('startups-table.json', table_name)
+    aws_clients.set_factory(aws)
+    return aws
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream startups from CSV/JSONL into DynamoDB')
+    parser.add_argument('source', help="CSV or JSONL file (optionally .gz), or '-' for stdin")
+    parser.add_argument('--format', choices=['auto', 'csv', 'jsonl'], default='auto')
+    parser.add_argument('--table', default=os.environ.get('STARTUPS_TABLE', DEFAULT_TABLE))
+    parser.add_argument('--region', default=os.environ.get('AWS_REGION', 'eu-north-1'))
+    parser.add_argument('--workers', type=int, default=ddb_batch.DEFAULT_WRITE_WORKERS,
+                        help='parallel BatchWriteItem calls')
+    parser.add_argument('--ttl-days', type=int, default=startup_records.STARTUP_TTL_DAYS,
+                        help='expiration_time for records without one (0 = no TTL)')
+    parser.add_argument('--rejects', help='write rejected records with reasons to this JSONL file')
+    parser.add_argument('--dry-run', action='store_true', help='validate only, write nothing')
+    parser.add_argument('--local', action='store_true', help='write to an in-memory stand-in table')
+    args = parser.parse_args()
+
+    fmt = detect_format(args.source, args.format)
+    fields = startup_records.load_schema(SCHEMA_FILE)
+    rejects = open(args.rejects, 'w') if args.rejects else None
+    importer = Importer(fields, rejects, args.ttl_days)
+
+    local = local_table(args.table) if args.local else None
+    target = 'dry run' if args.dry_run else ('local stand-in' if local else f'{args.table} ({args.region})')
+    print(f"📥 Importing {args.source} ({fmt}) -> {target}")
+
+    started = time.perf_counter()
+    try:
+        with open_source(args.source) as stream:
+            items = importer.items(read_records(stream, fmt))
+            if args.dry_run:
+                for _ in items:
+                    importer.stats['valid'] += 1
+            else:
+                dynamodb = aws_clients.resource('dynamodb', region_name=args.region)
+                ddb_batch.batch_write_items(dynamodb, args.table, items, ['startup_id'],
+                                            workers=args.workers, on_chunk=importer.on_chunk)
+    finally:
+        if rejects:
+            rejects.close()
+    elapsed = time.perf_counter() - started
+
+    stats = importer.stats
+    processed = stats['valid'] if args.dry_run else stats['written']
+    print(f"\n✨ Done in {elapsed:.1f}s ({stats['read'] / elapsed if elapsed else 0:.0f} records/s)")
+    print(f"   Read:     {stats['read']}")
+    print(f"   {'Valid:   ' if args.dry_run else 'Written: '} {processed}")
+    if not args.dry_run:
+        duplicates = stats['read'] - stats['rejected'] - stats['written']
+        if duplicates:
+            print(f"   Merged:   {duplicates} (same startup_id in one batch, last record kept)")
+        print(f"   Retries:  {stats['unprocessed_retries']} (unprocessed items)")
+    print(f"   Rejected: {stats['rejected']}")
+    for reason, count in importer.reasons.most_common(10):
+        print(f"     - {reason}: {count}")
+    if local:
+        print(f"   Local table now holds {len(local.dynamodb.Table(args.table))} startups")
+    return 1 if stats['rejected'] and not processed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
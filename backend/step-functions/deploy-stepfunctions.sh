@@ -205,6 +205,14 @@ show_outputs() {
         --region "$REGION" \
         --query 'Stacks[0].Outputs[?OutputKey==`StateMachineArn`].OutputValue' \
         --output text
+    
+    echo ""
+    echo -e "${GREEN}💡 Express State Machine ARN (EXPRESS_STATE_MACHINE_ARN of trigger-workflow):${NC}"
+    aws cloudformation describe-stacks \
+        --stack-name "$STACK_NAME" \
+        --region "$REGION" \
+        --query 'Stacks[0].Outputs[?OutputKey==`ExpressStateMachineArn`].OutputValue' \
+        --output text
 }
 
 case "$ACTION" in
@@ -0,0 +1,51 @@
+"""
+Shared fixtures: handlers loaded in-process against the local AWS stand-ins
+from benchmarks/ (no AWS access)
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+from harness import (COUNTERS_TABLE, EVENTS_TABLE, INVESTORS_TABLE, STARTUPS_TABLE,  # noqa: E402
+                     load_handler)
+from local_aws import LocalAWS  # noqa: E402
+
+
+@pytest.fixture
+def aws():
+    aws = LocalAWS()
+    db = aws.dynamodb
+    db.create_table_from_schema('startups-table.json', STARTUPS_TABLE)
+    db.create_table_from_schema('investors-table.json', INVESTORS_TABLE)
+    db.create_table_from_schema('events-table.json', EVENTS_TABLE)
+    db.create_table_from_schema('startup-counters-table.json', COUNTERS_TABLE)
+    return aws
+
+
+@pytest.fixture
+def api(aws):
+    return load_handler('api-handler', aws)
+
+
+def api_event(method, path, resource=None, path_parameters=None, query=None, body=None, headers=None):
+    return {
+        'httpMethod': method,
+        'path': path,
+        'resource': resource or path,
+        'headers': headers,
+        'pathParameters': path_parameters,
+        'queryStringParameters': query,
+        'body': json.dumps(body) if body is not None else None,
+    }
+
+
+def call(handler, event):
+    """(status code, decoded JSON body) of one handler invocation"""
+    response = handler.lambda_handler(event, None)
+    return response['statusCode'], json.loads(response['body'])
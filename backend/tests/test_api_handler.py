@@ -0,0 +1,104 @@
+import base64
+import gzip
+import json
+
+from conftest import api_event, call
+from harness import COUNTERS_TABLE, INVESTORS_TABLE, STARTUPS_TABLE
+from synthetic_data import iter_startups
+
+
+def test_null_investment_bounds_mean_no_bound(api, aws):
+    body = {'investor_id': 'inv-1', 'email': 'a@example.com',
+            'min_investment': None, 'max_investment': None}
+    status, _ = call(api, api_event('POST', '/investors', body=body))
+
+    assert status == 200
+    item = aws.dynamodb.Table(INVESTORS_TABLE).get_item(Key={'investor_id': 'inv-1'})['Item']
+    assert item['min_investment'] == 0
+    assert item['max_investment'] == 10000000000
+
+
+def test_invalid_investment_bound_is_rejected(api):
+    body = {'investor_id': 'inv-1', 'email': 'a@example.com', 'min_investment': 'lots'}
+    status, response = call(api, api_event('POST', '/investors', body=body))
+
+    assert status == 400
+    assert 'min_investment' in response['error']
+
+
+def test_batch_routes_use_plain_resource_paths(api, aws):
+    aws.dynamodb.Table(STARTUPS_TABLE).put_item(Item={'startup_id': 's-1', 'name': 'Acme'})
+    status, response = call(api, api_event('POST', '/startups/batch-get', body={'startup_ids': ['s-1', 's-2']}))
+
+    assert status == 200
+    assert [result['status'] for result in response['results']] == ['found', 'not_found']
+
+    status, response = call(api, api_event('POST', '/investors/batch', body={'investor_ids': ['inv-1']}))
+    assert status == 200
+    assert response['results'][0]['status'] == 'not_found'
+
+
+def test_base64_encoded_body_is_decoded_before_dispatch(api, aws):
+    event = api_event('POST', '/investors', body={'investor_id': 'inv-1', 'email': 'a@example.com'})
+    event['body'] = base64.b64encode(event['body'].encode('utf-8')).decode('ascii')
+    event['isBase64Encoded'] = True
+    status, _ = call(api, event)
+
+    assert status == 200
+    assert aws.dynamodb.Table(INVESTORS_TABLE).get_item(Key={'investor_id': 'inv-1'})['Item']['email'] == 'a@example.com'
+
+
+def test_invalid_base64_body_is_rejected(api):
+    event = api_event('POST', '/investors', body={'investor_id': 'inv-1', 'email': 'a@example.com'})
+    event['isBase64Encoded'] = True
+    status, response = call(api, event)
+
+    assert status == 400
+    assert 'base64' in response['error']
+
+
+def test_compresses_only_for_binary_accept_types(api, aws):
+    aws.dynamodb.Table(STARTUPS_TABLE).load(iter_startups(100))
+    query = {'limit': '100'}
+
+    response = api.lambda_handler(api_event('GET', '/startups', query=query,
+                                            headers={'Accept': 'application/json', 'Accept-Encoding': 'gzip'}), None)
+    assert response['headers']['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(base64.b64decode(response['body'])))
+
+    # API Gateway would hand the base64 text to a client asking for */*
+    response = api.lambda_handler(api_event('GET', '/startups', query=query,
+                                            headers={'Accept': '*/*', 'Accept-Encoding': 'gzip'}), None)
+    assert 'Content-Encoding' not in response['headers']
+    assert not response.get('isBase64Encoded')
+
+
+def test_export_is_a_static_resource_before_startup_id(api, aws):
+    aws.dynamodb.Table(STARTUPS_TABLE).load(iter_startups(10))
+    response = api.lambda_handler(api_event('GET', '/startups/export'), None)
+
+    assert response['statusCode'] == 200
+    assert len(response['body'].splitlines()) == 10
+
+
+def test_due_counters_are_written_before_the_response(api, aws):
+    aws.dynamodb.Table(STARTUPS_TABLE).load(iter_startups(3))
+    api.counter_buffer.batch_size = 3
+    for startup in iter_startups(3):
+        startup_id = startup['startup_id']
+        call(api, api_event('GET', f'/startups/{startup_id}', '/startups/{id}', {'id': startup_id}))
+
+    assert len(api.counter_buffer) == 0
+    assert len(aws.dynamodb.Table(COUNTERS_TABLE)) == 3
+
+
+def test_batch_save_reports_bad_investor_ids_as_invalid(api, aws):
+    profiles = [{'investor_id': ['inv-1'], 'email': 'a@example.com'},
+                {'investor_id': '', 'email': 'b@example.com'},
+                {'investor_id': 1, 'email': 'c@example.com'},
+                {'investor_id': 'inv-4', 'email': 'd@example.com'}]
+    status, response = call(api, api_event('POST', '/investors/batch', body={'investors': profiles}))
+
+    assert status == 200
+    assert [result['status'] for result in response['results']] == ['invalid', 'invalid', 'invalid', 'created']
+    assert len(aws.dynamodb.Table(INVESTORS_TABLE)) == 1
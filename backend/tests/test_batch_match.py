@@ -0,0 +1,25 @@
+import importlib.util
+import os
+
+import aws_clients
+from conftest import BACKEND_DIR
+from harness import INVESTORS_TABLE
+
+spec = importlib.util.spec_from_file_location('batch_match', os.path.join(BACKEND_DIR, 'scripts', 'batch_match.py'))
+batch_match = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(batch_match)
+
+
+def test_writer_skips_investors_deleted_since_the_snapshot(aws):
+    table = aws.dynamodb.Table(INVESTORS_TABLE)
+    table.put_item(Item={'investor_id': 'inv-1', 'email': 'a@example.com'})
+    aws_clients.set_factory(aws)
+
+    writer = batch_match.DynamoDBWriter(INVESTORS_TABLE, 'eu-north-1', workers=2)
+    writer.add('inv-1', [('s-1', 90)])
+    writer.add('inv-gone', [('s-1', 90)])
+    writer.close()
+
+    assert (writer.written, writer.skipped, writer.failed) == (1, 1, 0)
+    assert table.get_item(Key={'investor_id': 'inv-1'})['Item']['email'] == 'a@example.com'
+    assert 'Item' not in table.get_item(Key={'investor_id': 'inv-gone'})
@@ -0,0 +1,26 @@
+import pytest
+
+import counters
+from harness import COUNTERS_TABLE
+
+
+def test_failed_write_merges_back_only_unwritten_keys(aws, monkeypatch):
+    buffer = counters.CounterBuffer(aws.dynamodb, table_name=COUNTERS_TABLE)
+    for startup_id in ('s-1', 's-2', 's-3'):
+        buffer.record(startup_id, counters.VIEWS, 2)
+    buffer.record('s-2', counters.CONTACTS)
+    write = buffer._write
+
+    def flaky(startup_id, window, counts):
+        if startup_id == 's-2':
+            raise RuntimeError('throttled')
+        write(startup_id, window, counts)
+    monkeypatch.setattr(buffer, '_write', flaky)
+
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+
+    assert {startup_id: counts for (startup_id, _), counts in buffer._pending.items()} == \
+        {'s-2': {counters.VIEWS: 2, counters.CONTACTS: 1}}
+    written = aws.dynamodb.Table(COUNTERS_TABLE).scan()['Items']
+    assert sorted(item['startup_id'] for item in written) == ['s-1', 's-3']
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+
+import funding
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('N/A', None),
+    ('Undisclosed', None),
+    ('', None),
+    (None, None),
+    ('$1-2M', None),
+    ('1 - 2 million', None),
+    ('$3M Series A', None),
+    ('-5M', None),
+    ('$-5M', None),
+    (-1, None),
+    (float('nan'), None),
+    ('0', (Decimal(0), 'USD')),
+    (2500000, (Decimal(2500000), 'USD')),
+    ('$2.5M', (Decimal(2500000), 'USD')),
+    ('approx $3M', (Decimal(3000000), 'USD')),
+    ('1,250,000', (Decimal(1250000), 'USD')),
+    ('2,5M', (Decimal(2500000), 'USD')),
+    ('1,5 mio EUR', (Decimal(1620000), 'EUR')),
+    ('€800K', (Decimal(864000), 'EUR')),
+    ('£1.2 billion', (Decimal(1524000000), 'GBP')),
+    ('CHF 3M', (Decimal(3360000), 'CHF')),
+])
+def test_parse_amount(text, expected):
+    assert funding.parse_amount(text) == expected
+
+
+def test_investor_range_parses_legacy_string_bounds():
+    investor = {'investor_id': 'inv-1', 'min_investment': '500K', 'max_investment': '1,000,000'}
+    assert funding.investor_range(investor) == (500000.0, 1000000.0)
+
+
+def test_investor_range_treats_unparseable_bound_as_unset():
+    assert funding.investor_range({'min_investment': '', 'max_investment': '2M'}) == (0.0, 2000000.0)
+    assert funding.investor_range({'min_investment': '1M', 'max_investment': 'N/A'}) == (1000000.0, float('inf'))
+    assert funding.investor_range({'min_investment': '', 'max_investment': 'N/A'}) is None
+
+
+def test_candidates_with_legacy_bounds():
+    startups = [{'startup_id': 'a', 'funding_amount': '$200K'},
+                {'startup_id': 'b', 'funding_amount': '$750K'},
+                {'startup_id': 'c', 'funding_amount': 'Undisclosed'},
+                {'startup_id': 'd', 'funding_amount': '$5M'}]
+    investor = {'min_investment': '500K', 'max_investment': '1,000,000'}
+    candidates = funding.investor_candidates(funding.FundingIndex(startups), investor, startups)
+    assert [startup['startup_id'] for startup in candidates] == ['b', 'c']
+
+
+def test_within_bounds_are_inclusive():
+    startups = [{'startup_id': 'a', 'funding_amount_usd': Decimal(200)},
+                {'startup_id': 'b', 'funding_amount_usd': Decimal(100)},
+                {'startup_id': 'c', 'funding_amount': 'Undisclosed'},
+                {'startup_id': 'd', 'funding_amount_usd': Decimal(200)},
+                {'startup_id': 'e', 'funding_amount_usd': Decimal(300)}]
+    index = funding.FundingIndex(startups)
+
+    def ids(low, high):
+        return [startup['startup_id'] for startup in index.within(low, high)]
+    assert ids(200, 200) == ['a', 'c', 'd']
+    assert ids(100, 199) == ['b', 'c']
+    assert ids(101, 199) == ['c']
+    assert ids(201, 300) == ['c', 'e']
+    assert ids(301, float('inf')) == ['c']
+    # A range covering every known amount returns the catalogue itself
+    assert index.within(100, 300) is startups
+    assert index.within(0.0, float('inf')) is startups
@@ -0,0 +1,9 @@
+import memory_scaling
+
+
+def test_matcher_working_set_is_flat_in_investor_count():
+    small = memory_scaling.measure(50, 200, seed=42)
+    large = memory_scaling.measure(200, 200, seed=42)
+
+    growth = (large['working_kb'] - small['working_kb']) / small['working_kb']
+    assert growth < memory_scaling.DEFAULT_MAX_GROWTH, (small, large)
@@ -0,0 +1,46 @@
+import seen_set
+from harness import INVESTORS_TABLE, STARTUPS_TABLE, load_handler
+from synthetic_data import iter_investors, iter_startups
+
+
+def interactive_match(aws):
+    """MatchStartups as the Express workflow runs it: returns the matcher's output"""
+    aws.dynamodb.Table(STARTUPS_TABLE).load(iter_startups(200))
+    investor = next(iter_investors(1))
+    aws.dynamodb.Table(INVESTORS_TABLE).put_item(Item=investor)
+    matcher = load_handler('dev-startup-matcher', aws)
+    output = matcher.lambda_handler({'investor_id': investor['investor_id'], 'email': investor['email'],
+                                     'notify': False, 'result_by_reference': True}, None)
+    assert output['matchesFound']
+    return output
+
+
+def stored_seen(aws, investor_id):
+    item = aws.dynamodb.Table(INVESTORS_TABLE).get_item(Key={'investor_id': investor_id})['Item']
+    return seen_set.SeenSet.from_item(item)
+
+
+def send_notification(aws, output):
+    email = load_handler('send-email-notif', aws)
+    return email.lambda_handler({'investor_id': output['investor_id'], 'email': output['email'],
+                                 'matches_key': output['matches_key']}, None)
+
+
+def test_failed_send_leaves_seen_set_unchanged(aws, monkeypatch):
+    output = interactive_match(aws)
+    assert len(stored_seen(aws, output['investor_id'])) == 0
+
+    def rejected(**kwargs):
+        aws.ses.exceptions.raise_for('MessageRejected', 'Email address is not verified.', 'SendEmail')
+    monkeypatch.setattr(aws.ses, 'send_email', rejected)
+
+    assert send_notification(aws, output)['statusCode'] == 500
+    assert len(stored_seen(aws, output['investor_id'])) == 0
+
+
+def test_successful_send_records_new_matches(aws):
+    output = interactive_match(aws)
+
+    assert send_notification(aws, output)['statusCode'] == 200
+    assert len(aws.ses.sent) == 1
+    assert len(stored_seen(aws, output['investor_id'])) == output['new_match_count']
@@ -0,0 +1,39 @@
+import os
+import types
+
+import pytest
+
+import profiling
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'ENABLED', True)
+    monkeypatch.setattr(profiling, 'TRACE_MEMORY', False)
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def run_profiled(times):
+    handler = profiling.profiled('fn')(lambda event, context: {'statusCode': 200})
+    for i in range(times):
+        handler({}, types.SimpleNamespace(aws_request_id=f'req-{i:03d}'))
+
+
+def test_keeps_only_newest_local_profiles_without_bucket(profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_BUCKET', '')
+    monkeypatch.setattr(profiling, 'PROFILE_KEEP_LOCAL', 2)
+    run_profiled(4)
+
+    kept = sorted(os.listdir(profile_dir / 'fn'))
+    assert [name.rsplit('-', 1)[1] for name in kept] == ['002', '003']
+
+
+def test_uploaded_profiles_are_removed_locally(profile_dir, monkeypatch):
+    uploaded = []
+    monkeypatch.setattr(profiling, 'PROFILE_BUCKET', 'profiles-bucket')
+    monkeypatch.setattr(profiling, 's3', types.SimpleNamespace(put_object=lambda **kwargs: uploaded.append(kwargs['Key'])))
+    run_profiled(1)
+
+    assert any(key.endswith('/summary.json') for key in uploaded)
+    assert os.listdir(profile_dir / 'fn') == []
@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import Binary
+
+import recommendations
+from harness import INVESTORS_TABLE
+
+
+def test_single_match_uses_the_raw_format():
+    stored = recommendations.encode([{'startup_id': 's-1', 'match_score': 87.5}])
+
+    assert stored[0] == recommendations.FORMAT_RAW
+    assert recommendations.decode(stored) == [('s-1', 87.5)]
+
+
+def test_repetitive_matches_use_the_zlib_format(aws):
+    matches = [{'startup_id': f'startup-{i:05d}', 'match_score': Decimal(100 - i % 50)} for i in range(200)]
+    stored = recommendations.encode(matches)
+    assert stored[0] == recommendations.FORMAT_ZLIB
+
+    table = aws.dynamodb.Table(INVESTORS_TABLE)
+    table.put_item(Item={'investor_id': 'inv-1', 'recommendations': stored})
+    item = table.get_item(Key={'investor_id': 'inv-1'})['Item']
+    assert recommendations.decode(item['recommendations']) == \
+        [(match['startup_id'], int(match['match_score'])) for match in matches]
+
+
+@pytest.mark.parametrize('score, decoded', [(-3, 0), (1e9, recommendations.MAX_SCORE_TENTHS / 10.0),
+                                            (42, 42), (42.04, 42), (42.06, 42.1)])
+def test_scores_are_stored_in_clamped_tenths(score, decoded):
+    stored = recommendations.encode([{'startup_id': 's-1', 'match_score': score}])
+    assert recommendations.decode(stored) == [('s-1', decoded)]
+
+
+def test_empty_lists_round_trip():
+    stored = recommendations.encode([])
+    assert recommendations.decode(stored) == []
+    assert recommendations.decode(Binary(stored)) == []
+    assert recommendations.decode(None) == []
+    assert recommendations.decode([]) == []
+
+
+def test_legacy_list_of_maps_still_decodes():
+    legacy = [{'startup_id': 's-1', 'match_score': Decimal(90)}, {'startup_id': 's-2'}]
+    assert recommendations.decode(legacy) == [('s-1', Decimal(90)), ('s-2', 0)]
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match='Unknown recommendations format'):
+        recommendations.decode(b'\x09\x00')
@@ -0,0 +1,48 @@
+import pytest
+from boto3.dynamodb.types import Binary
+
+import seen_set
+from harness import INVESTORS_TABLE
+
+
+def test_round_trip_through_the_investors_table(aws):
+    seen = seen_set.SeenSet()
+    seen.add(['s-1', 's-2', 's-3'])
+    table = aws.dynamodb.Table(INVESTORS_TABLE)
+    table.put_item(Item={'investor_id': 'inv-1', seen_set.SEEN_ATTRIBUTE: seen.to_bytes()})
+
+    stored = seen_set.SeenSet.from_item(table.get_item(Key={'investor_id': 'inv-1'})['Item'])
+    assert len(stored) == 3
+    assert all(startup_id in stored for startup_id in ('s-1', 's-2', 's-3'))
+    assert 's-4' not in stored
+    assert stored.to_bytes() == seen.to_bytes()
+
+
+def test_from_item_unwraps_boto3_binary():
+    seen = seen_set.SeenSet()
+    seen.add(['s-1'])
+    assert 's-1' in seen_set.SeenSet.from_item({seen_set.SEEN_ATTRIBUTE: Binary(seen.to_bytes())})
+
+
+@pytest.mark.parametrize('item', [{}, {seen_set.SEEN_ATTRIBUTE: b''}, {seen_set.SEEN_ATTRIBUTE: None}])
+def test_missing_or_empty_attribute_is_an_empty_set(item):
+    seen = seen_set.SeenSet.from_item(item)
+    assert len(seen) == 0
+    assert seen.to_bytes() == b''
+
+
+def test_unseen_keeps_match_order():
+    seen = seen_set.SeenSet()
+    seen.add(['s-2'])
+    matches = [{'startup_id': startup_id} for startup_id in ('s-3', 's-2', 's-1')]
+    assert [match['startup_id'] for match in seen_set.unseen(matches, seen)] == ['s-3', 's-1']
+
+
+def test_oldest_entries_are_dropped_past_the_cap(monkeypatch):
+    monkeypatch.setattr(seen_set, 'MAX_ENTRIES', 3)
+    seen = seen_set.SeenSet()
+    seen.add(['s-1', 's-2', 's-3', 's-4', 's-1'])
+
+    assert len(seen) == 3
+    assert 's-1' not in seen
+    assert all(startup_id in seen for startup_id in ('s-2', 's-3', 's-4'))
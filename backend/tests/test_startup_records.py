@@ -0,0 +1,14 @@
+import pytest
+
+import startup_records
+
+
+@pytest.mark.parametrize('latitude, longitude', [('abc', '10'), ('59.3', None), ([59.3], 18.0)])
+def test_non_numeric_coordinates_are_a_validation_error(latitude, longitude):
+    with pytest.raises(startup_records.ValidationError, match='latitude/longitude: expected numbers'):
+        startup_records.location_fields_for({'latitude': latitude, 'longitude': longitude})
+
+
+def test_numeric_string_coordinates_are_accepted():
+    fields = startup_records.location_fields_for({'latitude': '59.33', 'longitude': '18.07'})
+    assert (float(fields['latitude']), float(fields['longitude'])) == (59.33, 18.07)
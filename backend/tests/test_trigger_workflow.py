@@ -0,0 +1,48 @@
+import json
+
+from harness import load_handler
+
+STATE_MACHINE_ARN = 'arn:aws:states:eu-north-1:000000000000:stateMachine:matcher'
+
+
+def trigger(aws, investors):
+    module = load_handler('dev-trigger-workflow', aws)
+    module.STATE_MACHINE_ARN = STATE_MACHINE_ARN
+    module.EXPRESS_STATE_MACHINE_ARN = None
+    response = module.lambda_handler({'body': json.dumps({'investors': investors})}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+
+def test_duplicate_investors_start_one_execution_each(aws):
+    investors = [{'investor_id': 'inv-1', 'email': 'a@example.com'},
+                 {'investor_id': 'inv-2', 'email': 'b@example.com'},
+                 {'investor_id': 'inv-1', 'email': 'a@example.com'}]
+    status, body = trigger(aws, investors)
+
+    assert status == 200
+    assert [execution['investor_id'] for execution in body['executions']] == ['inv-1', 'inv-2']
+    assert len(aws.stepfunctions.executions) == 2
+
+
+def test_repeated_requests_get_distinct_execution_names(aws):
+    investors = [{'investor_id': 'inv-1', 'email': 'a@example.com'}]
+    assert trigger(aws, investors)[0] == 200
+    assert trigger(aws, investors)[0] == 200
+    assert len(aws.stepfunctions.executions) == 2
+
+
+def test_failed_start_is_reported_per_investor(aws, monkeypatch):
+    start_execution = aws.stepfunctions.start_execution
+
+    def flaky(**kwargs):
+        if json.loads(kwargs['input'])['investor_id'] == 'inv-2':
+            aws.stepfunctions.exceptions.raise_for('ExecutionLimitExceeded', 'Too many executions', 'StartExecution')
+        return start_execution(**kwargs)
+    monkeypatch.setattr(aws.stepfunctions, 'start_execution', flaky)
+
+    status, body = trigger(aws, [{'investor_id': 'inv-1', 'email': 'a@example.com'},
+                                 {'investor_id': 'inv-2', 'email': 'b@example.com'}])
+
+    assert status == 200
+    assert [execution['status'] for execution in body['executions']] == ['started', 'error']
+    assert 'Too many executions' in body['executions'][1]['error']